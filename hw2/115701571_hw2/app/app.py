@@ -1,3 +1,4 @@
+from collections import OrderedDict
 import copy
 from OpenGL.GL import *
 import glfw
@@ -8,13 +9,23 @@ import glm
 from .window import Window
 from shape import (
     BezierCurve,
+    BSpline,
+    ControlPoints,
     Polyline,
-    PixelData,
-    Pixel,
     C2Spline,
     CatmullRomSpline,
 )
-from util import Shader, SplineIO
+from util import (
+    CurveFit,
+    DrawList,
+    GLResourcePool,
+    IDBuffer,
+    PointStore,
+    PrimitiveCounter,
+    ShaderRegistry,
+    SplineIO,
+    SplineScene,
+)
 
 
 class AppState:
@@ -24,6 +35,10 @@ class AppState:
         self.editing_bezier = False
         self.drawing_catmullrom = False
         self.editing_catmullrom = False
+        self.drawing_bspline = False
+        self.editing_bspline = False
+        self.drawing_freehand = False
+        self.viewing_scene = False
 
         # Input states
         self.mouse_pressed = False
@@ -31,9 +46,33 @@ class AppState:
         # Application states
         self.animation_enabled = True
         self.debug_mouse_pos = False
+        self.adaptive_tessellation = True
 
 
 class App(Window):
+    SCENE_PATH = "etc/scene.spsc"
+
+    # Splines kept on the GPU after they scroll out of view
+    SCENE_CURVE_CACHE = 512
+
+    # Largest distance, in pixels, from a freehand sample to the fitted curve
+    FREEHAND_TOLERANCE = 2.0
+
+    # What P cycles the control polygon through
+    POLYLINE_SIMPLIFICATIONS = ("douglas-peucker", "visvalingam", None)
+
+    # The curve segment within this many pixels of the cursor is highlighted
+    HOVER_DISTANCE = 10.0
+    HOVER_COLOR = glm.vec4(1.0, 0.8, 0.0, 1.0)
+
+    # Arrow keys pan the scene view by this many pixels
+    SCENE_PAN = {
+        GLFW_KEY_LEFT: glm.vec2(-100.0, 0.0),
+        GLFW_KEY_RIGHT: glm.vec2(100.0, 0.0),
+        GLFW_KEY_DOWN: glm.vec2(0.0, -100.0),
+        GLFW_KEY_UP: glm.vec2(0.0, 100.0),
+    }
+
     def __init__(self):
         # Window setup
         self.window_name = "hw2"
@@ -64,32 +103,57 @@ class App(Window):
         glEnable(GL_PROGRAM_POINT_SIZE)
 
     def _init_shaders(self):
-        self.shaders = {
-            "bezier": Shader(
-                vert="shader/bezier.vert.glsl",
-                tesc="shader/bezier.tesc.glsl",
-                tese="shader/bezier.tese.glsl",
-                frag="shader/bezier.frag.glsl",
-            ),
-            "polyline": Shader(
-                vert="shader/polyline.vert.glsl",
-                tesc=None,
-                tese=None,
-                frag="shader/polyline.frag.glsl",
-            ),
-            "pixel": Shader(
-                vert="shader/pixel.vert.glsl",
-                tesc=None,
-                tese=None,
-                frag="shader/pixel.frag.glsl",
-            ),
-            "catmullrom": Shader(
-                vert="shader/catmullrom.vert.glsl",
-                tesc="shader/catmullrom.tesc.glsl",
-                tese="shader/catmullrom.tese.glsl",
-                frag="shader/catmullrom.frag.glsl",
-            ),
-        }
+        # Submit every program first and collect them together, so the driver
+        # compiles them side by side instead of one after the other.
+        registry = ShaderRegistry()
+        registry.add(
+            "bezier",
+            vert="shader/bezier.vert.glsl",
+            tesc="shader/bezier.tesc.glsl",
+            tese="shader/bezier.tese.glsl",
+            frag="shader/bezier.frag.glsl",
+        )
+        registry.add(
+            "polyline",
+            vert="shader/polyline.vert.glsl",
+            tesc=None,
+            tese=None,
+            frag="shader/polyline.frag.glsl",
+        )
+        registry.add(
+            "pixel",
+            vert="shader/pixel.vert.glsl",
+            tesc=None,
+            tese=None,
+            frag="shader/pixel.frag.glsl",
+        )
+        registry.add(
+            "catmullrom",
+            vert="shader/catmullrom.vert.glsl",
+            tesc="shader/catmullrom.tesc.glsl",
+            tese="shader/catmullrom.tese.glsl",
+            frag="shader/catmullrom.frag.glsl",
+        )
+
+        # ID pass for GPU picking: the same geometry, writing point and segment IDs
+        registry.add(
+            "pick-points",
+            vert="shader/pixel.vert.glsl",
+            tesc=None,
+            tese=None,
+            frag="shader/pick.frag.glsl",
+            defines={"PICK_ID": 1},
+        )
+        for kind in ["bezier", "catmullrom"]:
+            registry.add(
+                f"pick-{kind}",
+                vert=f"shader/{kind}.vert.glsl",
+                tesc=f"shader/{kind}.tesc.glsl",
+                tese=f"shader/{kind}.tese.glsl",
+                frag="shader/pick.frag.glsl",
+                defines={"PICK_ID": 1},
+            )
+        self.shaders = registry.finish()
 
     def _init_state(self):
         # Application state
@@ -98,6 +162,13 @@ class App(Window):
         # Control points for different curves
         self.bezier_control_points = []
         self.catmullrom_control_points = []
+        self.bspline_control_points = []
+
+        # Raw cursor samples of the freehand stroke being drawn
+        self.freehand_samples = PointStore()
+
+        # (curve, segment) under the cursor while editing, or None
+        self.hovered_segment = None
 
         # Mouse tracking
         self.mouse_pos = glm.dvec2(0.0, 0.0)
@@ -111,6 +182,16 @@ class App(Window):
         # Render objects
         self.shapes = []
 
+        # Inputs the shader-wide uniforms were last set from
+        self.shader_settings = None
+
+        # Scene viewer: the open scene, GL curves of recently visible splines
+        # (least recently used first) and the pan offset in pixels
+        self.scene = None
+        self.scene_curves = OrderedDict()
+        self.scene_visible = []
+        self.scene_offset = glm.vec2(0.0, 0.0)
+
     def _init_renderers(self):
         # Initialize curve renderers
         self.bezier_curve = BezierCurve(
@@ -120,41 +201,66 @@ class App(Window):
         self.catmullrom = CatmullRomSpline(
             self.shaders["catmullrom"], self.catmullrom_control_points
         )
+        self.bspline = BSpline(self.shaders["bezier"])
+        self._share_control_points()
 
         # Initialize utility renderers
         self.preview_polyline = Polyline(self.shaders["polyline"])
-        self.pixel_renderer = Pixel(self.shaders["pixel"])
+        self.control_point_renderer = ControlPoints(self.shaders["pixel"])
+
+        # Every draw of a frame, grouped by shader and buffer and issued together
+        self.draw_list = DrawList()
+
+        # Primitives generated per frame, to check what the tessellation costs
+        self.primitive_counter = PrimitiveCounter()
+
+        # GPU picking of the edited curve's points and segments (CPU when unavailable)
+        self.id_buffer = IDBuffer(self.window_width, self.window_height)
+        self.id_draw_list = DrawList()
+        self.max_tess_level = float(glGetIntegerv(GL_MAX_TESS_GEN_LEVEL))
 
     def _update_shader_uniforms(self):
-        # Common settings for all shaders
-        common_settings = {
-            "windowWidth": self.window_width,
-            "windowHeight": self.window_height,
-            "model": glm.mat3(1.0),
-        }
-
-        # Update polyline shader
+        # Uniforms keep their values in the program, so they are only sent again when
+        # the window size or the tessellation mode changes; each shape sets its own model
+        settings = (
+            self.window_width,
+            self.window_height,
+            self.state.adaptive_tessellation,
+        )
+        if settings == self.shader_settings:
+            return
+        self.shader_settings = settings
+
+        for shader_name in [
+            "polyline",
+            "pixel",
+            "bezier",
+            "catmullrom",
+            "pick-points",
+            "pick-bezier",
+            "pick-catmullrom",
+        ]:
+            self.shaders[shader_name].use()
+            self.shaders[shader_name].setFloat("windowWidth", self.window_width)
+            self.shaders[shader_name].setFloat("windowHeight", self.window_height)
+
         self.shaders["polyline"].use()
-        for key, value in common_settings.items():
-            if isinstance(value, (int, float)):
-                self.shaders["polyline"].setFloat(key, value)
-            elif isinstance(value, glm.mat3):
-                self.shaders["polyline"].setMat3(key, value)
         self.shaders["polyline"].setVec4("lineColor", glm.vec4(1.0, 0.0, 0.0, 1.0))
 
-        # Update bezier and catmullrom shaders
-        for shader_name in ["bezier", "catmullrom"]:
-            self.shaders[shader_name].use()
-            for key, value in common_settings.items():
-                if isinstance(value, (int, float)):
-                    self.shaders[shader_name].setFloat(key, value)
-                elif isinstance(value, glm.mat3):
-                    self.shaders[shader_name].setMat3(key, value)
-            # Set appropriate color uniform for each shader
-            color_uniform = "bezierColor" if shader_name == "bezier" else "splineColor"
-            self.shaders[shader_name].setVec4(
-                color_uniform, glm.vec4(1.0, 1.0, 1.0, 1.0)
-            )
+        # Tessellation level from the on-screen size of each segment,
+        # or the old fixed 64 for comparison
+        if self.state.adaptive_tessellation:
+            tess_levels = (1.0, self.max_tess_level)
+        else:
+            tess_levels = (64.0, 64.0)
+
+        # Curve colors are per draw (see PatchCurve.submit)
+        for shader_name in ["bezier", "catmullrom", "pick-bezier", "pick-catmullrom"]:
+            shader = self.shaders[shader_name]
+            shader.use()
+            shader.setFloat("minTessLevel", tess_levels[0])
+            shader.setFloat("maxTessLevel", tess_levels[1])
+            shader.setFloat("pixelTolerance", 0.25)
 
     def run(self) -> None:
         while not glfwWindowShouldClose(self.window):
@@ -173,39 +279,57 @@ class App(Window):
             glfwSwapBuffers(self.window)
             glfwPollEvents()
 
+        # Resource counters at exit, to spot leaks and allocation churn
+        print(GLResourcePool.report())
+
+    def _share_control_points(self):
+        # The app, the curves, the preview polyline and the pixel renderer all work
+        # on the curves' own point stores; nothing copies the control points
+        self.bezier_control_points = self.c2_spline.control_points
+        self.catmullrom_control_points = self.catmullrom.control_points
+        self.bspline_control_points = self.bspline.control_points
+
     def reset_bezier_drawing(self):
         self._reset_common()
         self.state.drawing_bezier = True
+        self.c2_spline.release()
         self.c2_spline = C2Spline(self.shaders["bezier"])
+        self._share_control_points()
 
     def reset_catmullrom_drawing(self):
         self._reset_common()
         self.state.drawing_catmullrom = True
-        self.catmullrom = CatmullRomSpline(
-            self.shaders["catmullrom"], self.catmullrom_control_points
-        )
+        self.catmullrom.release()
+        self.catmullrom = CatmullRomSpline(self.shaders["catmullrom"])
+        self._share_control_points()
+
+    def reset_bspline_drawing(self):
+        self._reset_common()
+        self.state.drawing_bspline = True
 
     def _reset_common(self):
         # Clear control points
         self.bezier_control_points.clear()
         self.catmullrom_control_points.clear()
+        # The knots go with the de Boor points
+        self.bspline.update_points([])
+        self.freehand_samples.clear()
         self.preview_polyline.update_points([])
+        self.hovered_segment = None
 
         # Reset state
         self.state = AppState()
         self.shapes.clear()
+        self._close_scene()
 
     def _handle_bezier_mouse_press(self, is_right_click: bool):
         point = copy.deepcopy(self.mouse_pos)
 
         # Add point to spline
-        self.bezier_control_points = copy.deepcopy(
-            self.c2_spline.add_interpolation_point(point, is_right_click)
-        )
+        self.c2_spline.add_interpolation_point(point, is_right_click)
 
         # Update preview
-        preview_points = self.bezier_control_points.copy()
-        self.preview_polyline.update_points(preview_points)
+        self.preview_polyline.update_points(self.bezier_control_points)
 
         # Finalize if right click
         if is_right_click:
@@ -218,79 +342,186 @@ class App(Window):
         point = copy.deepcopy(self.mouse_pos)
 
         # Add point to spline
-        self.catmullrom_control_points.append(point)
-        self.catmullrom.update_points(self.catmullrom_control_points)
+        self.catmullrom.add_control_point(point)
 
         # Update preview
-        preview_points = self.catmullrom_control_points.copy()
-        self.preview_polyline.update_points(preview_points)
+        self.preview_polyline.update_points(self.catmullrom_control_points)
 
         # Finalize if right click
         if is_right_click:
-            self.catmullrom = CatmullRomSpline(
-                self.shaders["catmullrom"], self.catmullrom_control_points
-            )
             self.shapes.append(self.preview_polyline)
             self.shapes.append(self.catmullrom)
             self.state.drawing_catmullrom = False
             self.state.editing_catmullrom = True
 
-    def render_control_points(self):
-        # Setup shader
-        self.shaders["pixel"].use()
-        self.shaders["pixel"].setFloat("windowWidth", self.window_width)
-        self.shaders["pixel"].setFloat("windowHeight", self.window_height)
-
-        pixels = []
-
-        # Add bezier control points
-        if self.bezier_control_points:
-            for i, cp in enumerate(self.bezier_control_points):
-                color = (
-                    glm.vec3(0.0, 0.0, 1.0)
-                    if (self.c2_spline and i == self.c2_spline.selected_node_index)
-                    else glm.vec3(0.0, 1.0, 0.0)
-                )
-                pixels.append(PixelData(glm.vec2(cp.x, cp.y), color))
-
-        # Add Catmull-Rom control points
-        if self.catmullrom_control_points:
-            for i, cp in enumerate(self.catmullrom_control_points):
-                color = (
-                    glm.vec3(0.0, 0.0, 1.0)
-                    if (self.catmullrom and i == self.catmullrom.selected_node_index)
-                    else glm.vec3(0.0, 1.0, 0.0)
-                )
-                pixels.append(PixelData(glm.vec2(cp.x, cp.y), color))
-
-        # Render all control points
-        self.pixel_renderer.update_pixels(pixels)
-        self.pixel_renderer.render(0, False)
+    def start_freehand_drawing(self):
+        self._reset_common()
+        self.state.drawing_freehand = True
 
-    def __render(self) -> None:
-        # Update timing
-        t: float = self.time_elapsed_since_last_frame
+        # The preview follows the samples as they are recorded
+        self.preview_polyline.update_points(self.freehand_samples)
+
+    def _handle_freehand_mouse_event(self, button: int, action: int):
+        if button != GLFW_MOUSE_BUTTON_LEFT:
+            return
+
+        if action == GLFW_PRESS:
+            self.freehand_samples.clear()
+            self.freehand_samples.append(glm.vec2(self.mouse_pos.x, self.mouse_pos.y))
+            self.state.mouse_pressed = True
+        elif action == GLFW_RELEASE and self.state.mouse_pressed:
+            self.state.mouse_pressed = False
+            self._finish_freehand_stroke()
+
+    def _record_freehand_sample(self):
+        point = glm.vec2(self.mouse_pos.x, self.mouse_pos.y)
+        if point != self.freehand_samples[-1]:
+            self.freehand_samples.append(point)
+
+    def _finish_freehand_stroke(self):
+        samples = self.freehand_samples.view()
+        control_points = CurveFit.fit(samples, App.FREEHAND_TOLERANCE)
+        if len(control_points) < 4:
+            # A click without a drag: wait for the next stroke
+            self.freehand_samples.clear()
+            return
+
+        print(
+            f"freehand: {len(samples)} samples fitted with "
+            f"{(len(control_points) - 1) // 3} segments (G1; C makes it C2)"
+        )
+        # The fit is only G1 at its joints: it is edited locally until C interpolates
+        # its nodes with a C2 curve
+        self._load_bezier_spline(
+            [glm.vec2(x, y) for x, y in control_points.tolist()], c2=False
+        )
+
+    def _handle_bspline_mouse_press(self, is_right_click: bool):
+        # Add de Boor point to spline; only the segment it adds is computed
+        self.bspline.add_control_point(self.mouse_pos)
+
+        # Update preview
+        self.preview_polyline.update_points(self.bspline_control_points)
 
+        # Finalize if right click
+        if is_right_click:
+            self.shapes.append(self.preview_polyline)
+            self.shapes.append(self.bspline)
+            self.state.drawing_bspline = False
+            self.state.editing_bspline = True
+
+    def submit_control_points(self, draw_list: DrawList):
+        # Only points written since the last frame are uploaded, and the selection
+        # is a uniform, so an idle frame sends nothing
+        if self.state.drawing_bspline or self.state.editing_bspline:
+            points = self.bspline_control_points
+            selected = self.bspline.selected_node_index
+        elif self.state.drawing_catmullrom or self.state.editing_catmullrom:
+            points = self.catmullrom_control_points
+            selected = self.catmullrom.selected_node_index
+        else:
+            # Bezier control points (none outside the Bezier modes)
+            points = self.bezier_control_points
+            selected = self.c2_spline.selected_node_index
+
+        self.control_point_renderer.update_points(points, selected)
+        self.control_point_renderer.submit(draw_list)
+
+    def __render(self) -> None:
         # Update shader uniforms
         self._update_shader_uniforms()
 
-        # Render active curve preview
+        draw_list = self.draw_list
+
+        # Active curve preview
         if self.state.drawing_bezier:
-            self.preview_polyline.render(0, False)
+            self.preview_polyline.submit(draw_list)
             if len(self.bezier_control_points) > 0:
-                self.c2_spline.render(0, False)
+                self.c2_spline.submit(draw_list)
 
         if self.state.drawing_catmullrom:
-            self.preview_polyline.render(0, False)
+            self.preview_polyline.submit(draw_list)
             if len(self.catmullrom_control_points) > 0:
-                self.catmullrom.render(0, False)
+                self.catmullrom.submit(draw_list)
 
-        # Render control points
-        self.render_control_points()
+        if self.state.drawing_bspline:
+            self.preview_polyline.submit(draw_list)
+            if len(self.bspline_control_points) > 0:
+                self.bspline.submit(draw_list)
 
-        # Render all shapes
+        if self.state.drawing_freehand:
+            self.preview_polyline.submit(draw_list)
+
+        if self.state.viewing_scene:
+            self._submit_scene(draw_list)
+
+        # Control points
+        self.submit_control_points(draw_list)
+
+        # All shapes
         for shape in self.shapes:
-            shape.render(t, self.state.animation_enabled)
+            shape.submit(draw_list)
+
+        # Segment under the cursor, drawn again over the curve
+        if self.hovered_segment is not None:
+            curve, segment = self.hovered_segment
+            if segment < curve.num_segments:
+                curve.submit(draw_list, segment, 1, App.HOVER_COLOR)
+
+        self.primitive_counter.begin()
+        draw_list.submit()
+        self.primitive_counter.end()
+
+        # IDs under the cursor for the next pick; a finished readback updates the hover
+        self._render_ids()
+        if self.id_buffer.poll():
+            self._update_hover()
+
+    def _render_ids(self):
+        curve = self._editing_curve()
+        if curve is None or not self.id_buffer.available or self.state.mouse_pressed:
+            return
+
+        # Only when the cursor or the curve changed since the last pass
+        key = self._pick_key(curve)
+        if key == self.id_buffer.requested:
+            return
+
+        if not self.id_buffer.begin(self.mouse_pos.x, self.mouse_pos.y):
+            return
+
+        # Segments first, so points are drawn over them
+        draw_list = self.id_draw_list
+        curve.submit_ids(
+            draw_list,
+            self.shaders[f"pick-{curve.kind}"],
+            IDBuffer.encode(IDBuffer.SEGMENT, 0),
+        )
+        self.control_point_renderer.submit_ids(
+            draw_list, self.shaders["pick-points"], IDBuffer.encode(IDBuffer.POINT, 0)
+        )
+        draw_list.submit()
+        self.id_buffer.end()
+        self.id_buffer.request(key)
+
+    def _pick_key(self, curve) -> tuple:
+        # What an ID pass shows: the cursor pixel and the points of the curve
+        return (
+            int(self.mouse_pos.x),
+            int(self.mouse_pos.y),
+            id(curve),
+            curve.version,
+            self.control_point_renderer.version,
+        )
+
+    def _picked_node(self, curve):
+        """Node index under the cursor from the ID pass (-1: none), None if not known."""
+        picked = self.id_buffer.pick(self._pick_key(curve))
+        if picked is None:
+            return None
+
+        kind, index = picked
+        return index if kind == IDBuffer.POINT else -1
 
     @staticmethod
     def __cursorPosCallback(window: GLFWwindow, xpos: float, ypos: float) -> None:
@@ -318,6 +549,18 @@ class App(Window):
         ):
             self._update_catmullrom_node_position()
 
+        # Handle B-spline editing
+        if (
+            self.state.editing_bspline
+            and self.state.mouse_pressed
+            and self.bspline.selected_node_index != -1
+        ):
+            self._update_bspline_node_position()
+
+        # Handle freehand stroke capture
+        if self.state.drawing_freehand and self.state.mouse_pressed:
+            self._record_freehand_sample()
+
         # Handle Bezier curve drawing preview
         if self.state.drawing_bezier and len(self.bezier_control_points) > 0:
             self._update_bezier_preview()
@@ -326,31 +569,78 @@ class App(Window):
         if self.state.drawing_catmullrom and len(self.catmullrom_control_points) > 0:
             self._update_catmullrom_preview()
 
+        # Handle B-spline drawing preview
+        if self.state.drawing_bspline and len(self.bspline_control_points) > 0:
+            self._update_bspline_preview()
+
+        # Highlight the segment under the cursor
+        self._update_hover()
+
         # Update last mouse position if pressed
         if self.state.mouse_pressed:
             self.last_mouse_left_press_pos = copy.deepcopy(self.mouse_pos)
 
+    def _editing_curve(self):
+        if self.state.editing_bezier:
+            return self.c2_spline
+        if self.state.editing_catmullrom:
+            return self.catmullrom
+        if self.state.editing_bspline:
+            return self.bspline
+        return None
+
+    def _update_hover(self):
+        # Kept as is during a drag, so the segment being dragged stays lit
+        if self.state.mouse_pressed:
+            return
+
+        curve = self._editing_curve()
+        if curve is None:
+            self.hovered_segment = None
+            return
+
+        # From the ID pass when it has read back this cursor position; while the
+        # readback is in flight the old highlight stays
+        picked = self.id_buffer.pick(self._pick_key(curve))
+        if picked is not None:
+            kind, index = picked
+            self.hovered_segment = (curve, index) if kind == IDBuffer.SEGMENT else None
+            return
+        if self.id_buffer.available:
+            return
+
+        # Segment BVH query: a few boxes and one segment, however long the curve
+        hit = curve.closest_point(self.mouse_pos, App.HOVER_DISTANCE)
+        self.hovered_segment = (curve, hit[0]) if hit is not None else None
+
     def _update_bezier_node_position(self):
-        self.c2_spline.move_selected_node(copy.deepcopy(self.mouse_pos))
-        self.bezier_control_points = copy.deepcopy(self.c2_spline.control_points)
-        self.preview_polyline.update_points(self.bezier_control_points)
+        # The polyline and the control point pixels follow the store by themselves
+        self.c2_spline.move_selected_node(self.mouse_pos)
 
     def _update_catmullrom_node_position(self):
-        self.catmullrom.move_selected_node(copy.deepcopy(self.mouse_pos))
-        self.catmullrom_control_points = copy.deepcopy(self.catmullrom.control_points)
-        self.preview_polyline.update_points(self.catmullrom_control_points)
+        self.catmullrom.move_selected_node(self.mouse_pos)
+
+    def _update_bspline_node_position(self):
+        # Only the dragged de Boor point (and its 4 segments) change
+        self.bspline.move_selected_node(self.mouse_pos)
 
     def _update_bezier_preview(self):
         self.c2_spline.update_preview(copy.deepcopy(self.mouse_pos))
-        preview_points = self.bezier_control_points.copy()
-        preview_points.append(copy.deepcopy(self.mouse_pos))
-        self.preview_polyline.update_points(preview_points)
+        self.preview_polyline.update_points(
+            self.bezier_control_points, [self.mouse_pos]
+        )
 
     def _update_catmullrom_preview(self):
-        preview_points = self.catmullrom_control_points.copy()
-        preview_points.append(copy.deepcopy(self.mouse_pos))
-        self.preview_polyline.update_points(preview_points)
-        self.catmullrom.update_points(preview_points)
+        self.preview_polyline.update_points(
+            self.catmullrom_control_points, [self.mouse_pos]
+        )
+        self.catmullrom.update_preview(self.mouse_pos)
+
+    def _update_bspline_preview(self):
+        self.preview_polyline.update_points(
+            self.bspline_control_points, [self.mouse_pos]
+        )
+        self.bspline.update_preview(self.mouse_pos)
 
     @staticmethod
     def __mouseButtonCallback(
@@ -366,6 +656,11 @@ class App(Window):
         elif app.state.drawing_catmullrom:
             if action == GLFW_PRESS:
                 app._handle_catmullrom_mouse_press(button == GLFW_MOUSE_BUTTON_RIGHT)
+        elif app.state.drawing_bspline:
+            if action == GLFW_PRESS:
+                app._handle_bspline_mouse_press(button == GLFW_MOUSE_BUTTON_RIGHT)
+        elif app.state.drawing_freehand:
+            app._handle_freehand_mouse_event(button, action)
 
         # Handle editing modes
         elif app.state.editing_bezier:
@@ -373,11 +668,7 @@ class App(Window):
                 insert_pressed = glfwGetKey(window, GLFW_KEY_INSERT) == GLFW_PRESS
                 if action == GLFW_PRESS and insert_pressed:
                     new_pos = glm.vec2(app.mouse_pos.x, app.mouse_pos.y)
-                    if app.c2_spline.insert_node(new_pos):
-                        app.bezier_control_points = copy.deepcopy(
-                            app.c2_spline.control_points
-                        )
-                        app.preview_polyline.update_points(app.bezier_control_points)
+                    app.c2_spline.insert_node(new_pos)
                 else:
                     # Normal selection/dragging
                     app._handle_editing_bezier_mouse_event(button, action)
@@ -386,18 +677,24 @@ class App(Window):
                 insert_pressed = glfwGetKey(window, GLFW_KEY_INSERT) == GLFW_PRESS
                 if action == GLFW_PRESS and insert_pressed:
                     app.catmullrom.add_node_at_index(app.mouse_pos)
-                    app.catmullrom_control_points = copy.deepcopy(
-                        app.catmullrom.control_points
-                    )
-                    app.preview_polyline.update_points(app.catmullrom_control_points)
                 else:
                     # Normal selection/dragging
                     app._handle_editing_catmullrom_mouse_event(button, action)
+        elif app.state.editing_bspline:
+            if button == GLFW_MOUSE_BUTTON_LEFT:
+                insert_pressed = glfwGetKey(window, GLFW_KEY_INSERT) == GLFW_PRESS
+                if action == GLFW_PRESS and insert_pressed:
+                    # Knot insertion: adds a de Boor point, the curve keeps its shape
+                    app.bspline.insert_node(app.mouse_pos)
+                else:
+                    # Normal selection/dragging
+                    app._handle_editing_bspline_mouse_event(button, action)
 
     def _handle_editing_bezier_mouse_event(self, button: int, action: int):
         if button == GLFW_MOUSE_BUTTON_LEFT:
             if action == GLFW_PRESS:
-                if self.c2_spline.select_node(copy.deepcopy(self.mouse_pos)):
+                picked = self._picked_node(self.c2_spline)
+                if self.c2_spline.select_node(copy.deepcopy(self.mouse_pos), picked):
                     self.state.mouse_pressed = True
             elif action == GLFW_RELEASE:
                 self.state.mouse_pressed = False
@@ -405,7 +702,17 @@ class App(Window):
     def _handle_editing_catmullrom_mouse_event(self, button: int, action: int):
         if button == GLFW_MOUSE_BUTTON_LEFT:
             if action == GLFW_PRESS:
-                if self.catmullrom.select_node(copy.deepcopy(self.mouse_pos)):
+                picked = self._picked_node(self.catmullrom)
+                if self.catmullrom.select_node(copy.deepcopy(self.mouse_pos), picked):
+                    self.state.mouse_pressed = True
+            elif action == GLFW_RELEASE:
+                self.state.mouse_pressed = False
+
+    def _handle_editing_bspline_mouse_event(self, button: int, action: int):
+        if button == GLFW_MOUSE_BUTTON_LEFT:
+            if action == GLFW_PRESS:
+                picked = self._picked_node(self.bspline)
+                if self.bspline.select_node(copy.deepcopy(self.mouse_pos), picked):
                     self.state.mouse_pressed = True
             elif action == GLFW_RELEASE:
                 self.state.mouse_pressed = False
@@ -441,49 +748,117 @@ class App(Window):
     def _handle_key_press(self, key: int, mods: int):
         if key == GLFW_KEY_1:
             self.reset_bezier_drawing()
+        elif key == GLFW_KEY_2:
+            self.reset_bspline_drawing()
         elif key == GLFW_KEY_3:
             self.reset_catmullrom_drawing()
+        elif key == GLFW_KEY_F:
+            # Freehand: drag a stroke, released into a fitted C2Spline
+            self.start_freehand_drawing()
         elif key == GLFW_KEY_DELETE:
             self._handle_delete_node()
         elif key == GLFW_KEY_S and (mods & GLFW_MOD_CONTROL):
-            self._handle_save()
+            # Shift saves in the binary format; loading detects either
+            self._handle_save(binary=bool(mods & GLFW_MOD_SHIFT))
         elif key == GLFW_KEY_L and (mods & GLFW_MOD_CONTROL):
             self._handle_load()
+        elif key == GLFW_KEY_Z and (mods & GLFW_MOD_CONTROL):
+            # Ctrl+Shift+Z redoes, like Ctrl+Y
+            self._handle_undo(redo=bool(mods & GLFW_MOD_SHIFT))
+        elif key == GLFW_KEY_Y and (mods & GLFW_MOD_CONTROL):
+            self._handle_undo(redo=True)
+        elif key == GLFW_KEY_A and (mods & GLFW_MOD_CONTROL):
+            self._handle_add_to_scene()
+        elif key == GLFW_KEY_O:
+            self._handle_open_scene()
+        elif key in App.SCENE_PAN and self.state.viewing_scene:
+            self.scene_offset += App.SCENE_PAN[key]
+            self._update_scene_view()
+        elif key == GLFW_KEY_T:
+            self.state.adaptive_tessellation = not self.state.adaptive_tessellation
+            mode = "adaptive" if self.state.adaptive_tessellation else "fixed (64)"
+            print(f"tessellation: {mode}")
+        elif key == GLFW_KEY_P:
+            self._cycle_polyline_simplification()
+        elif key == GLFW_KEY_V:
+            print(
+                f"primitives generated last frame: {self.primitive_counter.poll()}"
+            )
+            stats = ", ".join(
+                f"{name}: {count}" for name, count in self.draw_list.stats.items()
+            )
+            print(f"draw list last frame: {stats}")
+        elif key == GLFW_KEY_C:
+            # Global C2 interpolation through the nodes; Shift closes the curve
+            self._handle_interpolate("closed" if mods & GLFW_MOD_SHIFT else "natural")
+
+    def _cycle_polyline_simplification(self):
+        # Long control polygons are drawn simplified to within half a pixel
+        lod = self.preview_polyline.lod
+        methods = App.POLYLINE_SIMPLIFICATIONS
+        current = methods.index(lod.method if lod is not None else None)
+        method = methods[(current + 1) % len(methods)]
+
+        self.preview_polyline.set_simplification(method)
+        print(f"polyline simplification: {method or 'off'}")
 
     def _handle_delete_node(self):
         if self.state.editing_bezier:
-            if self.c2_spline.delete_selected_node():
-                self.bezier_control_points = copy.deepcopy(
-                    self.c2_spline.control_points
-                )
-                self.preview_polyline.update_points(self.bezier_control_points)
+            self.c2_spline.delete_selected_node()
         elif self.state.editing_catmullrom:
             self.catmullrom.delete_selected_node()
-            self.catmullrom_control_points = copy.deepcopy(
-                self.catmullrom.control_points
-            )
-            self.preview_polyline.update_points(self.catmullrom_control_points)
+        elif self.state.editing_bspline:
+            self.bspline.delete_selected_node()
+
+    def _handle_undo(self, redo: bool = False):
+        if self.state.editing_bezier:
+            curve = self.c2_spline
+        elif self.state.editing_catmullrom:
+            curve = self.catmullrom
+        elif self.state.editing_bspline:
+            curve = self.bspline
+        else:
+            return
 
-    def _handle_save(self):
+        # A drag in progress ends here
+        self.state.mouse_pressed = False
+        if redo:
+            curve.redo()
+        else:
+            curve.undo()
+
+    def _handle_interpolate(self, end_condition: str):
+        if not self.state.editing_bezier:
+            return
+
+        # Interpolation points are every third control point
+        nodes = self.bezier_control_points[::3]
+        if end_condition == "closed" and len(nodes) > 1 and nodes[0] == nodes[-1]:
+            nodes = nodes[:-1]
+        if len(nodes) < 3:
+            return
+
+        self.c2_spline.interpolate(nodes, end_condition)
+
+    def _handle_save(self, binary: bool = False):
         CONFIG_PATH = "etc/config.txt"
 
         if self.state.editing_bezier:
             SplineIO.save_spline(
-                CONFIG_PATH, self.bezier_control_points, True
+                CONFIG_PATH, self.bezier_control_points, True, binary
             )  # is_c2=True
         elif self.state.editing_catmullrom:
             SplineIO.save_spline(
-                CONFIG_PATH, self.catmullrom_control_points, False
+                CONFIG_PATH, self.catmullrom_control_points, False, binary
             )  # is_c2=False
 
     def _handle_load(self):
         CONFIG_PATH = "etc/config.txt"
-        result = SplineIO.load_spline(CONFIG_PATH)
+        control_points, is_2d, is_c2 = SplineIO.load_spline(CONFIG_PATH)
 
-        if result is None:
+        if control_points is None:
             return
 
-        control_points, is_2d, is_c2 = result
         self.shapes.clear()
 
         if is_c2:
@@ -491,15 +866,13 @@ class App(Window):
         else:
             self._load_catmullrom_spline(control_points)
 
-    def _load_bezier_spline(self, control_points):
+    def _load_bezier_spline(self, control_points, c2: bool = True):
         # Reset state and initialize new curve
         self.reset_bezier_drawing()
-        self.bezier_control_points = control_points
-        self.c2_spline = C2Spline(self.shaders["bezier"])
 
         # Update curve and preview
-        self.c2_spline.update_points(control_points)
-        self.preview_polyline.update_points(control_points)
+        self.c2_spline.update_points(control_points, c2)
+        self.preview_polyline.update_points(self.bezier_control_points)
 
         # Add to render list
         self.shapes.extend([self.preview_polyline, self.c2_spline])
@@ -511,11 +884,10 @@ class App(Window):
     def _load_catmullrom_spline(self, control_points):
         # Reset state and initialize new curve
         self.reset_catmullrom_drawing()
-        self.catmullrom_control_points = control_points
-        self.catmullrom = CatmullRomSpline(self.shaders["catmullrom"], control_points)
+        self.catmullrom.update_points(control_points)
 
         # Update preview
-        self.preview_polyline.update_points(control_points)
+        self.preview_polyline.update_points(self.catmullrom_control_points)
 
         # Add to render list
         self.shapes.extend([self.preview_polyline, self.catmullrom])
@@ -523,3 +895,68 @@ class App(Window):
         # Update state
         self.state.drawing_catmullrom = False
         self.state.editing_catmullrom = True
+
+    def _handle_add_to_scene(self):
+        if self.state.editing_bezier:
+            SplineScene.append(App.SCENE_PATH, self.bezier_control_points, True)
+        elif self.state.editing_catmullrom:
+            SplineScene.append(App.SCENE_PATH, self.catmullrom_control_points, False)
+
+    def _handle_open_scene(self):
+        scene = SplineScene.open(App.SCENE_PATH)
+        if scene is None:
+            return
+
+        self._reset_common()
+        self.scene = scene
+        self.state.viewing_scene = True
+        self._update_scene_view()
+
+    def _close_scene(self):
+        for curve in self.scene_curves.values():
+            curve.release()
+        self.scene_curves.clear()
+        self.scene_visible = []
+        self.scene_offset = glm.vec2(0.0, 0.0)
+
+        if self.scene is not None:
+            self.scene.close()
+            self.scene = None
+
+    def _update_scene_view(self):
+        # Only splines whose bounding boxes overlap the window are loaded
+        window = glm.vec2(self.window_width, self.window_height)
+        visible = self.scene.query(self.scene_offset, self.scene_offset + window)
+
+        self.scene_visible = []
+        for index in visible.tolist():
+            if index in self.scene_curves:
+                self.scene_curves.move_to_end(index)
+            else:
+                self.scene_curves[index] = self._load_scene_curve(index)
+            self.scene_visible.append(self.scene_curves[index])
+
+        # Curves that stayed out of view longest give their buffers back
+        while len(self.scene_curves) > max(App.SCENE_CURVE_CACHE, len(visible)):
+            _, curve = self.scene_curves.popitem(last=False)
+            curve.release()
+
+        # Scene pixels to window pixels, applied after the NDC conversion
+        model = glm.mat3(1.0)
+        model[2] = glm.vec3(-2.0 * self.scene_offset / window, 1.0)
+        for curve in self.scene_visible:
+            curve.model = model
+
+    def _load_scene_curve(self, index: int):
+        points = self.scene.points(index)
+        control_points = [glm.vec2(x, y) for x, y in points[:, :2].tolist()]
+
+        if self.scene.is_c2(index):
+            curve = C2Spline(self.shaders["bezier"])
+            curve.update_points(control_points)
+            return curve
+        return CatmullRomSpline(self.shaders["catmullrom"], control_points)
+
+    def _submit_scene(self, draw_list: DrawList):
+        for curve in self.scene_visible:
+            curve.submit(draw_list)
@@ -0,0 +1,128 @@
+import time
+from typing import Optional
+
+from OpenGL.GL import *
+import glm
+import numpy as np
+
+from .offscreen import OffscreenWindow
+from shape import C2Spline, CatmullRomSpline, PatchCurve
+from util import DrawList, PNG, ShaderRegistry, SplineIO
+
+
+class SplineExport:
+    """
+    Renders spline files to PNG images without a display (batch thumbnails), through
+    an OffscreenWindow and the app's tessellation shaders. Files are read with
+    SplineIO: C2 files become a C2Spline, the others a CatmullRomSpline, as when the
+    app loads them.
+
+    Each curve is fitted into the image with its model matrix, keeping the aspect ratio,
+    so the adaptive tessellation works at the size the curve is drawn at.
+
+    `timings` adds up the seconds spent loading, rendering (until the pixels are back
+    on the CPU) and writing, and the frames rendered.
+    """
+
+    BACKGROUND = (0.2, 0.3, 0.3, 1.0)
+
+    # Part of the image left empty on each side of the curve
+    MARGIN = 0.05
+
+    def __init__(self, width: int = 256, height: int = 256):
+        self.width = width
+        self.height = height
+        self.window = OffscreenWindow(width, height)
+
+        registry = ShaderRegistry()
+        for kind in ["bezier", "catmullrom"]:
+            registry.add(
+                kind,
+                vert=f"shader/{kind}.vert.glsl",
+                tesc=f"shader/{kind}.tesc.glsl",
+                tese=f"shader/{kind}.tese.glsl",
+                frag=f"shader/{kind}.frag.glsl",
+            )
+        self.shaders = registry.finish()
+
+        # Same settings as the app with adaptive tessellation
+        max_tess_level = float(glGetIntegerv(GL_MAX_TESS_GEN_LEVEL))
+        for shader in self.shaders.values():
+            shader.use()
+            shader.setFloat("windowWidth", width)
+            shader.setFloat("windowHeight", height)
+            shader.setFloat("minTessLevel", 1.0)
+            shader.setFloat("maxTessLevel", max_tess_level)
+            shader.setFloat("pixelTolerance", 0.25)
+
+        self.draw_list = DrawList()
+        self.timings = {"load": 0.0, "render": 0.0, "write": 0.0, "frames": 0}
+
+    def load(self, filepath: str) -> Optional[PatchCurve]:
+        control_points, _, is_c2 = SplineIO.load_spline(filepath)
+        if control_points is None:
+            return None
+
+        if is_c2:
+            curve = C2Spline(self.shaders["bezier"])
+            curve.update_points(control_points)
+        else:
+            curve = CatmullRomSpline(self.shaders["catmullrom"], control_points)
+
+        curve.model = self._fit(curve)
+        return curve
+
+    def _fit(self, curve: PatchCurve) -> glm.mat3:
+        """Model matrix that centers the curve's box in the image and scales it to fit."""
+        if curve.num_segments == 0:
+            return glm.mat3(1.0)
+
+        lower, upper = curve.segment_bvh().bounds()
+        size = np.array([self.width, self.height], dtype=np.float64)
+        extent = np.maximum(upper - lower, 1.0)
+        scale = float(np.min(size * (1.0 - 2.0 * SplineExport.MARGIN) / extent))
+        center = 0.5 * (lower + upper)
+
+        # Applied after the NDC conversion: ndc' = scale * ndc + scale * (1 - 2 c / size)
+        offset = scale * (1.0 - 2.0 * center / size)
+        model = glm.mat3(scale)
+        model[2] = glm.vec3(float(offset[0]), float(offset[1]), 1.0)
+        return model
+
+    def render(self, curve: PatchCurve) -> np.ndarray:
+        """(height, width, 4) uint8 RGBA image of the curve, top row first."""
+        glClearColor(*SplineExport.BACKGROUND)
+        glClear(GL_COLOR_BUFFER_BIT)
+
+        curve.submit(self.draw_list)
+        self.draw_list.submit()
+        return self.window.read_pixels()
+
+    def export(self, filepath: str, output: str, repeat: int = 1) -> bool:
+        """
+        Renders the spline in `filepath` to the PNG `output`. With `repeat` > 1 it is
+        rendered that many times, for steadier render timings.
+        """
+        start = time.perf_counter()
+        curve = self.load(filepath)
+        loaded = time.perf_counter()
+        self.timings["load"] += loaded - start
+        if curve is None:
+            return False
+
+        for _ in range(max(repeat, 1)):
+            pixels = self.render(curve)
+        rendered = time.perf_counter()
+        self.timings["render"] += rendered - loaded
+        self.timings["frames"] += max(repeat, 1)
+
+        written = PNG.write(output, pixels)
+        self.timings["write"] += time.perf_counter() - rendered
+
+        curve.release()
+        return written
+
+    def release(self) -> None:
+        # Programs are deleted while their context is still current
+        self.shaders.clear()
+        self.window.release()
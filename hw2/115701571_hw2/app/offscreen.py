@@ -0,0 +1,171 @@
+import ctypes
+import os
+
+from OpenGL.GL import *
+import numpy as np
+
+
+class OffscreenWindow:
+    """
+    Stand-in for Window when there is no display: an OpenGL 4.1 core context without
+    a window, rendering into a framebuffer object of the requested size.
+
+    The context comes from EGL (Mesa's surfaceless platform, or the default display)
+    or from OSMesa, whichever PyOpenGL was set up for through PYOPENGL_PLATFORM
+    ("egl" or "osmesa"); that variable has to be set before OpenGL is first imported.
+    Both run on Mesa's software rasterizer (llvmpipe), so this works on machines with
+    neither a display nor a GPU.
+    """
+
+    # EGL_PLATFORM_SURFACELESS_MESA: a display that needs no window system
+    EGL_PLATFORM_SURFACELESS = 0x31DD
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.platform = os.environ.get("PYOPENGL_PLATFORM", "")
+
+        if self.platform == "egl":
+            self._create_egl_context()
+        elif self.platform == "osmesa":
+            self._create_osmesa_context()
+        else:
+            raise RuntimeError(
+                "offscreen rendering needs PYOPENGL_PLATFORM=egl or osmesa, "
+                f"got {self.platform!r}"
+            )
+
+        # The default framebuffer of these contexts is absent or tiny: draw into our own
+        self.fbo = glGenFramebuffers(1)
+        self.color = glGenRenderbuffers(1)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.color)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, 0)
+
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glFramebufferRenderbuffer(
+            GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.color
+        )
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            self.release()
+            raise RuntimeError("failed to create offscreen framebuffer")
+
+        glViewport(0, 0, width, height)
+
+    def _create_egl_context(self) -> None:
+        from OpenGL import EGL
+        from OpenGL.EGL.EXT.platform_base import eglGetPlatformDisplayEXT
+
+        display = EGL.EGL_NO_DISPLAY
+        try:
+            display = eglGetPlatformDisplayEXT(
+                OffscreenWindow.EGL_PLATFORM_SURFACELESS, EGL.EGL_DEFAULT_DISPLAY, None
+            )
+        except Exception:
+            pass
+        if display == EGL.EGL_NO_DISPLAY:
+            display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError("failed to initialize EGL")
+
+        config_attributes = (EGL.EGLint * 5)(
+            EGL.EGL_SURFACE_TYPE,
+            EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RENDERABLE_TYPE,
+            EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE,
+        )
+        config, num_configs = EGL.EGLConfig(), EGL.EGLint()
+        EGL.eglChooseConfig(
+            display,
+            config_attributes,
+            ctypes.pointer(config),
+            1,
+            ctypes.pointer(num_configs),
+        )
+        if num_configs.value == 0:
+            raise RuntimeError("no EGL config for desktop OpenGL")
+
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context_attributes = (EGL.EGLint * 7)(
+            EGL.EGL_CONTEXT_MAJOR_VERSION,
+            4,
+            EGL.EGL_CONTEXT_MINOR_VERSION,
+            1,
+            EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK,
+            EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+            EGL.EGL_NONE,
+        )
+        context = EGL.eglCreateContext(
+            display, config, EGL.EGL_NO_CONTEXT, context_attributes
+        )
+        if context == EGL.EGL_NO_CONTEXT:
+            raise RuntimeError("failed to create an OpenGL 4.1 context with EGL")
+
+        # No surface at all: everything is drawn into the framebuffer object
+        EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, context)
+        self.display, self.context = display, context
+
+    def _create_osmesa_context(self) -> None:
+        from OpenGL import osmesa
+
+        attributes = np.array(
+            [
+                osmesa.OSMESA_FORMAT,
+                osmesa.OSMESA_RGBA,
+                osmesa.OSMESA_PROFILE,
+                osmesa.OSMESA_CORE_PROFILE,
+                osmesa.OSMESA_CONTEXT_MAJOR_VERSION,
+                4,
+                osmesa.OSMESA_CONTEXT_MINOR_VERSION,
+                1,
+                0,
+            ],
+            dtype=np.int32,
+        )
+        context = osmesa.OSMesaCreateContextAttribs(attributes, None)
+        if not context:
+            raise RuntimeError("failed to create an OpenGL 4.1 context with OSMesa")
+
+        # OSMesa wants a buffer to make the context current; drawing goes to the FBO
+        self.buffer = np.zeros(4, dtype=np.uint8)
+        if not osmesa.OSMesaMakeCurrent(
+            context, self.buffer.ctypes.data_as(ctypes.c_void_p), GL_UNSIGNED_BYTE, 1, 1
+        ):
+            raise RuntimeError("failed to make the OSMesa context current")
+        self.context = context
+
+    def read_pixels(self) -> np.ndarray:
+        """(height, width, 4) uint8 RGBA of the framebuffer, top row first."""
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.fbo)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        data = glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE)
+        pixels = np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 4)
+        return pixels[::-1]
+
+    def release(self) -> None:
+        if getattr(self, "fbo", 0):
+            glDeleteFramebuffers(1, [self.fbo])
+            self.fbo = 0
+        if getattr(self, "color", 0):
+            glDeleteRenderbuffers(1, [self.color])
+            self.color = 0
+
+        context = getattr(self, "context", None)
+        if context is None:
+            return
+        if self.platform == "egl":
+            from OpenGL import EGL
+
+            EGL.eglMakeCurrent(
+                self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT
+            )
+            EGL.eglDestroyContext(self.display, context)
+            EGL.eglTerminate(self.display)
+        else:
+            from OpenGL import osmesa
+
+            osmesa.OSMesaDestroyContext(context)
+        self.context = None
@@ -0,0 +1,102 @@
+"""
+Accuracy and speed of ArcLengthTable.
+
+Accuracy: total length against a densely sampled polyline, and the round trip
+s -> parameter(s) -> arc_length() for random arc lengths, for a few table sizes.
+Speed: full build, rebuild after moving one point, and vectorized queries.
+
+Run from the project directory:
+    python bench/arclength.py [num_segments]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from util import ArcLengthTable, CubicBasis
+
+
+def random_curve(num_segments: int, kind: str, rng) -> np.ndarray:
+    count = 3 * num_segments + 1 if kind == "bezier" else num_segments + 3
+    return np.cumsum(rng.uniform(-30.0, 40.0, (count, 2)), axis=0)
+
+
+def timed(function, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def accuracy(kind: str, rng) -> None:
+    points = random_curve(1000, kind, rng)
+    dense, _, _ = CubicBasis.sample(points, kind, 4096)
+    reference = np.linalg.norm(np.diff(dense, axis=0), axis=1).sum()
+    queries = rng.uniform(0.0, reference, 100_000)
+
+    print(f"\n{kind}: 1000 segments, {reference:.1f} long")
+    print(
+        f'{"subdiv":>6} {"newton":>6} {"length rel err":>15} '
+        f'{"round trip max":>15} {"p99.9":>10}'
+    )
+
+    for subdivisions in (8, 16, 32):
+        for newton_steps in (2, 3):
+            table = ArcLengthTable(kind, subdivisions, newton_steps=newton_steps)
+            table.update(points)
+            segment, t = table.parameter(queries)
+            error = np.abs(table.arc_length(segment, t) - queries)
+            print(
+                f"{subdivisions:>6} {newton_steps:>6} "
+                f"{abs(table.length - reference) / reference:>15.2e} "
+                f"{error.max():>15.2e} {np.percentile(error, 99.9):>10.2e}"
+            )
+
+
+def speed(kind: str, num_segments: int, rng) -> None:
+    points = random_curve(num_segments, kind, rng)
+    table = ArcLengthTable(kind)
+
+    def build():
+        table.__init__(kind)
+        table.update(points)
+
+    full = timed(build)
+
+    def move_one():
+        points[len(points) // 2] += 1.0
+        table.update(points)
+
+    incremental = timed(move_one)
+    recomputed = table.recomputed
+
+    queries = rng.uniform(0.0, table.length, 1_000_000)
+    query = timed(lambda: table.parameter(queries), repeat=1)
+
+    print(
+        f"{kind}: {num_segments} segments: build {full * 1e3:.1f} ms, "
+        f"after moving one point {incremental * 1e3:.1f} ms ({recomputed} segments), "
+        f"{len(queries) / query / 1e6:.2f}M queries/s"
+    )
+
+
+def main():
+    num_segments = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(0)
+
+    for kind in ("bezier", "catmullrom"):
+        accuracy(kind, rng)
+
+    print()
+    for kind in ("bezier", "catmullrom"):
+        speed(kind, num_segments, rng)
+
+
+if __name__ == "__main__":
+    main()
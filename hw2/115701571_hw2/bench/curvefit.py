@@ -0,0 +1,64 @@
+"""
+Freehand stroke fitting with CurveFit: segments produced, largest deviation from
+the samples and fitting time, for synthetic strokes of growing length and a few
+tolerances. Strokes are a wobbly figure eight sampled the way a mouse drag
+reports it: whole pixels, repeats dropped.
+
+Run from the project directory:
+    python bench/curvefit.py [max_samples]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from util import CurveFit
+
+
+def stroke(num_samples: int) -> np.ndarray:
+    t = np.linspace(0.0, 2.0 * np.pi, num_samples)
+    x = 500.0 + 350.0 * np.sin(t) * (1.0 + 0.1 * np.sin(7.0 * t))
+    y = 500.0 + 250.0 * np.sin(2.0 * t)
+    points = np.round(np.stack([x, y], axis=1))
+
+    moved = np.any(np.diff(points, axis=0) != 0.0, axis=1)
+    return points[np.concatenate([[True], moved])]
+
+
+def timed(function, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    max_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    print(
+        f'{"samples":>8} {"tolerance":>9} {"segments":>8} '
+        f'{"max deviation":>13} {"fit ms":>8}'
+    )
+
+    num_samples = 500
+    while num_samples <= max_samples:
+        samples = stroke(num_samples)
+        for tolerance in (1.0, 2.0, 4.0):
+            seconds, control_points = timed(lambda: CurveFit.fit(samples, tolerance))
+            deviation = CurveFit.max_deviation(samples, control_points)
+            print(
+                f"{len(samples):>8} {tolerance:>9.1f} "
+                f"{(len(control_points) - 1) // 3:>8} {deviation:>13.2f} "
+                f"{seconds * 1e3:>8.1f}"
+            )
+        num_samples *= 4
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Control-point pick latency against point count: the grid-backed PointStore
+versus the linear scan select_node() used to do. Points are spread over a fixed
+1000x1000 window, so the grid pick only slows down as the cells around the cursor fill up.
+
+Run from the project directory:
+    python bench/pick.py [max_points]
+"""
+
+import os
+import random
+import sys
+import time
+
+import glm
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from util import PointStore
+
+WINDOW = 1000.0
+THRESHOLD = 10.0
+
+
+def linear_pick(points: list[glm.vec2], mouse_pos: glm.dvec2) -> int:
+    closest_dist = float("inf")
+    closest_idx = -1
+
+    for i, point in enumerate(points):
+        diff = glm.vec2(point.x, point.y) - glm.vec2(mouse_pos.x, mouse_pos.y)
+        dist = glm.length(diff)
+
+        if dist < THRESHOLD and dist < closest_dist:
+            closest_dist = dist
+            closest_idx = i
+
+    return closest_idx
+
+
+def time_per_call(function, queries: list) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def random_point() -> glm.vec2:
+    return glm.vec2(random.uniform(0.0, WINDOW), random.uniform(0.0, WINDOW))
+
+
+def main():
+    max_points = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    random.seed(0)
+
+    print(
+        f'{"points":>8} {"build ms":>9} {"grid pick us":>13} {"move us":>8} '
+        f'{"scan pick us":>13} {"speedup":>8}'
+    )
+
+    counts = [count for count in (1_000, 10_000, 100_000) if count < max_points]
+    for count in counts + [max_points]:
+        points = [random_point() for _ in range(count)]
+        queries = [glm.dvec2(*random_point()) for _ in range(2000)]
+
+        start = time.perf_counter()
+        indexed = PointStore(points)
+        build = time.perf_counter() - start
+
+        grid_pick = time_per_call(lambda q: indexed.pick(q, THRESHOLD), queries)
+
+        def move(q):
+            indexed[random.randrange(count)] = glm.vec2(q.x, q.y)
+
+        grid_move = time_per_call(move, queries)
+
+        # The scan gets slow quickly; a few queries are enough to time it
+        scan_queries = queries[: max(3, 20_000 // count)]
+        scan_pick = time_per_call(lambda q: linear_pick(points, q), scan_queries)
+
+        print(
+            f"{count:>8} {build * 1e3:>9.1f} {grid_pick * 1e6:>13.1f} "
+            f"{grid_move * 1e6:>8.1f} {scan_pick * 1e6:>13.1f} "
+            f"{scan_pick / grid_pick:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Closest-point queries with SegmentBVH against dense sampling of every segment (what
+picking on the curve used to cost): query time, nodes visited, distance error, and
+the cost of refitting after one control point moves, for long curves of both kinds.
+
+Run from the project directory:
+    python bench/segmentbvh.py [max_segments]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from util import CubicBasis, SegmentBVH
+
+QUERIES = 200
+BRUTE_FORCE_SAMPLES = 64
+
+
+def control_points(num_points: int, rng) -> np.ndarray:
+    # A wandering curve over a 1000 x 1000 window
+    steps = rng.normal(0.0, 1.0, (num_points, 2))
+    walk = np.cumsum(steps, axis=0)
+    walk -= walk.min(axis=0)
+    return 1000.0 * walk / np.maximum(walk.max(axis=0), 1e-9)
+
+
+def brute_force(coefficients: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    tau = np.linspace(0.0, 1.0, BRUTE_FORCE_SAMPLES + 1)
+    samples = CubicBasis.evaluate(coefficients, tau).reshape(-1, 2)
+
+    distances = np.empty(len(queries))
+    for i, query in enumerate(queries):
+        offset = samples - query
+        distances[i] = np.sqrt((offset * offset).sum(axis=1).min())
+    return distances
+
+
+def main():
+    max_segments = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(0)
+    queries = rng.uniform(0.0, 1000.0, (QUERIES, 2))
+
+    print(
+        f'{"kind":>10} {"segments":>9} {"build ms":>9} {"refit ms":>9} '
+        f'{"query ms":>9} {"visited":>8} {"brute ms":>9} {"max error":>10}'
+    )
+
+    for kind in ("bezier", "catmullrom"):
+        stride = 3 if kind == "bezier" else 1
+        num_segments = 1000
+        while num_segments <= max_segments:
+            points = control_points(stride * num_segments + 4 - stride, rng)
+            bvh = SegmentBVH(kind)
+
+            start = time.perf_counter()
+            bvh.update(points)
+            build = time.perf_counter() - start
+
+            moved = points.copy()
+            moved[len(moved) // 2] += 5.0
+            start = time.perf_counter()
+            bvh.update(moved)
+            refit = time.perf_counter() - start
+
+            visited = 0
+            start = time.perf_counter()
+            distances = []
+            for query in queries:
+                distances.append(bvh.closest(query)[2])
+                visited += bvh.visited
+            query_time = (time.perf_counter() - start) / QUERIES
+
+            coefficients = CubicBasis.coefficients(
+                CubicBasis.segments(moved, kind), kind
+            )
+            start = time.perf_counter()
+            expected = brute_force(coefficients, queries)
+            brute = (time.perf_counter() - start) / QUERIES
+
+            # Positive: the BVH answer is farther than the best dense sample
+            error = float(np.max(np.array(distances) - expected))
+            print(
+                f"{kind:>10} {num_segments:>9} {build * 1e3:>9.1f} "
+                f"{refit * 1e3:>9.2f} {query_time * 1e3:>9.3f} "
+                f"{visited / QUERIES:>8.1f} {brute * 1e3:>9.2f} {error:>10.4f}"
+            )
+            num_segments *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Polyline simplification: time to rank every vertex with Douglas-Peucker and
+Visvalingam, and the vertices each keeps at a few pixel tolerances, for long
+control polygons (a noisy wave, the kind a traced or fitted outline produces).
+
+Run from the project directory:
+    python bench/simplify.py [max_points]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from util import PolylineLOD, PolylineSimplify
+
+TOLERANCES = (0.25, 0.5, 1.0, 2.0)
+
+
+def polygon(num_points: int, rng) -> np.ndarray:
+    t = np.linspace(0.0, 1.0, num_points)
+    x = 1000.0 * t
+    y = 500.0 + 300.0 * np.sin(12.0 * t) + rng.normal(0.0, 0.2, num_points)
+    return np.stack([x, y], axis=1)
+
+
+def main():
+    max_points = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(0)
+
+    print(
+        f'{"points":>8} {"method":>16} {"rank ms":>8} '
+        + " ".join(f"{f'kept@{tolerance}':>10}" for tolerance in TOLERANCES)
+    )
+
+    num_points = 1000
+    while num_points <= max_points:
+        points = polygon(num_points, rng)
+        for method in PolylineSimplify.METHODS:
+            lod = PolylineLOD(method)
+            start = time.perf_counter()
+            lod.update(points)
+            seconds = time.perf_counter() - start
+
+            kept = " ".join(
+                f"{len(lod.indices(tolerance)):>10}" for tolerance in TOLERANCES
+            )
+            print(f"{num_points:>8} {method:>16} {seconds * 1e3:>8.1f} {kept}")
+        num_points *= 10
+
+
+if __name__ == "__main__":
+    main()
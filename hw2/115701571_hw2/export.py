@@ -0,0 +1,57 @@
+"""
+Headless batch export: renders spline files (any format SplineIO reads) to PNG
+images without a display or GPU, and reports the render throughput.
+
+    python export.py [--size 256] [--out thumbnails] [--repeat 1]
+                     [--platform egl|osmesa] spline_file...
+
+The context comes from EGL or OSMesa on Mesa's software rasterizer (see
+app/offscreen.py); PYOPENGL_PLATFORM, when set, takes precedence over --platform.
+"""
+
+import argparse
+import os
+import sys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render spline files to PNG.")
+    parser.add_argument("files", nargs="+", help="spline files to render")
+    parser.add_argument("--size", type=int, default=256, help="image size in pixels")
+    parser.add_argument("--out", default="thumbnails", help="output directory")
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="renders per file, for timing"
+    )
+    parser.add_argument("--platform", choices=["egl", "osmesa"], default="egl")
+    args = parser.parse_args()
+
+    # PyOpenGL picks its platform when OpenGL is first imported
+    os.environ.setdefault("PYOPENGL_PLATFORM", args.platform)
+    from app.export import SplineExport
+
+    exporter = SplineExport(args.size, args.size)
+    exported = 0
+    for filepath in args.files:
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        output = os.path.join(args.out, f"{name}.png")
+        if exporter.export(filepath, output, args.repeat):
+            exported += 1
+            print(f"{filepath} -> {output}")
+
+    timings = exporter.timings
+    frames = max(timings["frames"], 1)
+    print(
+        f"{exported}/{len(args.files)} files, {timings['frames']} frames at "
+        f"{args.size}x{args.size}: load {timings['load'] * 1e3:.1f} ms, "
+        f"render {timings['render'] / frames * 1e3:.2f} ms/frame "
+        f"({frames / max(timings['render'], 1e-9):.1f} frames/s), "
+        f"write {timings['write'] * 1e3:.1f} ms"
+    )
+    exporter.release()
+
+    if exported < len(args.files):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,46 @@
 
 layout (vertices = 4) out;
 
+uniform mat3 model;
+uniform float windowWidth;
+uniform float windowHeight;
+
+// Largest allowed distance (pixels) between the curve and the line strip drawn for it
+uniform float pixelTolerance = 0.25;
+uniform float minTessLevel = 1.0;
+uniform float maxTessLevel = 64.0;
+
+vec2 to_screen(vec2 p)
+{
+    vec3 ndc = model * vec3(2.0 * p.x / windowWidth - 1.0,
+                            2.0 * p.y / windowHeight - 1.0,
+                            1.0);
+    return (ndc.xy + 1.0) * 0.5 * vec2(windowWidth, windowHeight);
+}
+
 void main()
 {
     gl_out[gl_InvocationID].gl_Position = gl_in[gl_InvocationID].gl_Position;
     
     if (gl_InvocationID == 0)
     {
+        vec2 c0 = to_screen(gl_in[0].gl_Position.xy);
+        vec2 c1 = to_screen(gl_in[1].gl_Position.xy);
+        vec2 c2 = to_screen(gl_in[2].gl_Position.xy);
+        vec2 c3 = to_screen(gl_in[3].gl_Position.xy);
+
+        // Same segment in Bezier form
+        vec2 p0 = c1;
+        vec2 p1 = c1 + (c2 - c0) / 6.0;
+        vec2 p2 = c2 - (c3 - c1) / 6.0;
+        vec2 p3 = c2;
+
+        // Wang's formula: n uniform steps keep a cubic within the tolerance of its
+        // line strip when n >= sqrt(3 / 4 * max |second difference| / tolerance)
+        float m = max(length(p0 - 2.0 * p1 + p2), length(p1 - 2.0 * p2 + p3));
+        float level = ceil(sqrt(0.75 * m / pixelTolerance));
+
         gl_TessLevelOuter[0] = 1.0;
-        gl_TessLevelOuter[1] = 64.0; // Adjust this value to change curve resolution
+        gl_TessLevelOuter[1] = clamp(level, minTessLevel, maxTessLevel);
     }
 }
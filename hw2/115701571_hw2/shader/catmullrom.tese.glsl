@@ -6,6 +6,11 @@ uniform mat3 model;
 uniform float windowWidth;
 uniform float windowHeight;
 
+#ifdef PICK_ID
+// Segment number, for the ID pass (see shader/pick.frag.glsl)
+flat out uint pickId;
+#endif
+
 vec2 catmull_rom(vec2 p0, vec2 p1, vec2 p2, vec2 p3, float t)
 {
     float t2 = t * t;
@@ -33,4 +38,8 @@ void main()
                                     1.0);
 
     gl_Position = vec4(transformed.xy, 0.0, 1.0);
+
+#ifdef PICK_ID
+    pickId = uint(gl_PrimitiveID);
+#endif
 }
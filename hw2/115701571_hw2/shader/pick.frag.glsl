@@ -0,0 +1,14 @@
+#version 410 core
+
+// ID pass for GPU picking (see util/idbuffer.py): every covered pixel gets the ID of
+// what covers it, idBase (kind and first index) plus the point or segment number
+flat in uint pickId;
+
+uniform int idBase;
+
+out uint fragId;
+
+void main()
+{
+    fragId = uint(idBase) + pickId;
+}
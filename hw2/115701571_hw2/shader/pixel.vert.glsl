@@ -5,10 +5,19 @@ layout (location = 1) in vec3 aColor;
 
 out vec3 ourColor;
 
+#ifdef PICK_ID
+// Point number, for the ID pass (see shader/pick.frag.glsl)
+flat out uint pickId;
+#endif
+
 uniform float windowWidth;
 uniform float windowHeight;
 uniform float pixelSize;  // New uniform for pixel size
 
+// Point drawn in selectedColor instead of aColor (-1: none)
+uniform int selectedIndex;
+uniform vec3 selectedColor;
+
 void main()
 {
     vec2 transformedPosition = vec2(2.0f * aPosition.x / windowWidth - 1.0f,
@@ -16,5 +25,9 @@ void main()
     
     gl_Position = vec4(transformedPosition, 0.0f, 1.0f);
     gl_PointSize = pixelSize;  // Set the size of the point
-    ourColor = aColor;
+    ourColor = gl_VertexID == selectedIndex ? selectedColor : aColor;
+
+#ifdef PICK_ID
+    pickId = uint(gl_VertexID);
+#endif
 }
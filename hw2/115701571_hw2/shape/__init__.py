@@ -3,7 +3,10 @@ from .glshape import GLShape
 from .renderable import Renderable
 from .triangle import Triangle
 from .bezier_curve import BezierCurve
+from .pointbuffer import PointBuffer
+from .patchcurve import PatchCurve
 from .polyline import Polyline
-from .pixel import Pixel, PixelData
+from .controlpoints import ControlPoints
 from .c2spline import C2Spline
 from .catmullrom import CatmullRomSpline
+from .bspline import BSpline
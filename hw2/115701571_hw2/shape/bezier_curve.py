@@ -3,7 +3,7 @@ from OpenGL.GL import *
 import glm
 from .glshape import GLShape
 from .renderable import Renderable
-from util import Shader
+from util import GLResourcePool, Shader
 
 
 class BezierCurve(GLShape, Renderable):
@@ -30,7 +30,9 @@ class BezierCurve(GLShape, Renderable):
             glm.float32,
             *[coord for point in self.control_points for coord in (point.x, point.y)]
         )
-        glBufferData(GL_ARRAY_BUFFER, data.nbytes, data.ptr, GL_DYNAMIC_DRAW)
+        GLResourcePool.bufferData(
+            self.vbo, GL_ARRAY_BUFFER, data.nbytes, data.ptr, GL_DYNAMIC_DRAW
+        )
         glBindBuffer(GL_ARRAY_BUFFER, 0)
 
     def render(self, timeElapsedSinceLastFrame: int, animate: bool) -> None:
@@ -0,0 +1,263 @@
+from typing import Optional
+from OpenGL.GL import *
+import glm
+import numpy as np
+from .patchcurve import PatchCurve
+from .renderable import Renderable
+from util import PointStore, Shader, UndoLog
+
+
+class BSpline(PatchCurve, Renderable):
+    """
+    Cubic B-spline edited through its de Boor points.
+
+    Segment s lives on the knot span [t_{s+3}, t_{s+4}] and depends only on de Boor points
+    s..s+3, so moving one point changes at most 4 segments. Each segment is drawn as a cubic
+    Bezier whose control points are the blossoms f(a,a,a), f(a,a,b), f(a,b,b), f(b,b,b) of its
+    span; edits only recompute (and re-upload) the Bezier points of the segments they touch.
+
+    The knot vector starts out uniform; insert_node() adds knots with Boehm's algorithm,
+    which adds a de Boor point without changing the shape of the curve.
+
+    The de Boor points live in a PointStore, like the other curves' control points; the
+    knots are kept beside it, and edits record the knot vector they replace in the same
+    undo entry as their point writes.
+    """
+
+    def __init__(self, shader: Shader, control_points: list[glm.vec2] = []):
+        # Bezier segments share their end points
+        super().__init__(shader, stride=3)
+        # Shared with the app and the shapes drawing the control polygon
+        self.control_points = PointStore()
+        self.history = UndoLog(self.control_points)
+        self.selected_node_index = -1
+
+        # Bezier points of the segment the point under the cursor adds while drawing
+        self.preview_tail = np.empty((0, 2))
+        self.knots = np.arange(4, dtype=np.float64)
+        self.update_points(control_points)
+
+    @property
+    def points(self) -> np.ndarray:
+        """Read-only (n, 2) view of the de Boor points."""
+        return self.control_points.view()
+
+    def update_points(self, points: list[glm.vec2]):
+        """Replaces all de Boor points and resets the knot vector to a uniform one."""
+        self.control_points.assign(points)
+        self._set_knots(np.arange(len(self.control_points) + 4, dtype=np.float64))
+        self._rebuild()
+
+    def add_control_point(self, point: glm.vec2):
+        self.control_points.append(glm.vec2(point.x, point.y))
+        self._set_knots(np.append(self.knots, self.knots[-1] + 1.0))
+
+        # The new point and knot only add the last segment
+        num_segments = self._span_count()
+        if num_segments > 0:
+            rows = 4 if num_segments == 1 else 3
+            self.bezier = np.concatenate([self.bezier, np.zeros((rows, 2))])
+            self._refresh_segments(num_segments - 1, num_segments - 1, upload=False)
+
+        self.preview_tail = np.empty((0, 2))
+        self.upload_points(self.bezier)
+
+    def update_preview(self, preview_point: glm.dvec2):
+        """Draws the curve as if `preview_point` were appended to the de Boor points."""
+        n = len(self.control_points)
+        if n < 3:
+            return
+
+        # The extra segment uses the last 3 points, the new one and the knots already
+        # there (the knot a new point appends is not one of them)
+        points = np.empty((4, 2))
+        points[:3] = self.points[n - 3 :]
+        points[3] = (preview_point.x, preview_point.y)
+        knots = self.knots[n - 3 :]
+
+        segment = np.zeros(1, dtype=int)
+        a, b = knots[3:4], knots[4:5]
+        params = [(a, a, b), (a, b, b), (b, b, b)]
+        if n == 3:
+            params.insert(0, (a, a, a))
+        tail = np.concatenate(
+            [BSpline._blossom(points, knots, segment, *u) for u in params]
+        )
+
+        # Only the tail is sent while the number of points stays the same
+        self.preview_tail = tail
+        if len(self.bezier) + len(tail) != len(self.uploaded):
+            self.upload_points(np.concatenate([self.bezier, tail]))
+        elif np.any(self.uploaded[len(self.bezier) :] != tail.astype(np.float32)):
+            self.upload_range(len(self.bezier), tail)
+
+    def select_node(self, mouse_pos: glm.dvec2, picked: Optional[int] = None) -> bool:
+        THRESHOLD = 10.0  # pixels
+
+        # `picked` comes from the GPU ID pass (-1: nothing there); without it, a grid
+        # lookup: only the points in the cells around the cursor are tested
+        if picked is None:
+            picked = self.control_points.pick(mouse_pos, THRESHOLD)
+        self.selected_node_index = picked
+
+        # A new selection starts a new undo step even for the same node
+        self.history.seal()
+        return self.selected_node_index != -1
+
+    def move_selected_node(self, new_pos: glm.dvec2):
+        # All moves of the same node until the next selection (a drag) undo together
+        with self.history.edit(("move", self.selected_node_index)):
+            self._move_selected_node(new_pos)
+
+    def _move_selected_node(self, new_pos: glm.dvec2):
+        if self.selected_node_index == -1:
+            return
+
+        j = self.selected_node_index
+        self.control_points[j] = glm.vec2(new_pos.x, new_pos.y)
+
+        # Only segments j - 3 .. j use this point
+        self._refresh_segments(j - 3, j)
+
+    def insert_node(self, pos: glm.dvec2) -> bool:
+        """Inserts a knot at the curve parameter closest to `pos` (Boehm's algorithm)."""
+        with self.history.edit():
+            return self._insert_node(pos)
+
+    def _insert_node(self, pos: glm.dvec2) -> bool:
+        if self.num_segments == 0:
+            return False
+
+        segment, tau = self._closest_parameter(pos)
+        k = segment + 3
+        t = self.knots
+        u = t[k] + tau * (t[k + 1] - t[k])
+
+        # d'_i = (1 - alpha_i) d_{i-1} + alpha_i d_i for i = k-2 .. k,
+        # replacing d_{k-2} and d_{k-1}
+        i = np.arange(k - 2, k + 1)
+        alpha = ((u - t[i]) / (t[i + 3] - t[i]))[:, None]
+        points = self.points
+        new_points = (1.0 - alpha) * points[i - 1] + alpha * points[i]
+
+        self.control_points[k - 2] = glm.vec2(*new_points[0])
+        self.control_points[k - 1] = glm.vec2(*new_points[1])
+        self.control_points.insert_points(k, new_points[2:])
+        self._set_knots(np.insert(self.knots, k + 1, u))
+
+        # Segments after the new knot keep their Bezier points, one index further;
+        # make room for the new segment and recompute the ones around it
+        self.bezier = np.insert(self.bezier, 3 * segment + 1, np.zeros((3, 2)), axis=0)
+        self._refresh_segments(segment - 2, segment + 3, upload=False)
+        self.upload_points(self.bezier)
+
+        self.selected_node_index = -1
+        return True
+
+    def delete_selected_node(self):
+        with self.history.edit():
+            self._delete_selected_node()
+
+    def _delete_selected_node(self):
+        if self.selected_node_index == -1:
+            return
+
+        j = self.selected_node_index
+        self.selected_node_index = -1
+
+        if len(self.control_points) <= 4:
+            self.update_points([])
+            return
+
+        self.control_points.pop(j)
+        self._set_knots(np.delete(self.knots, j + 2))
+
+        # Segments past j keep their Bezier points, one index earlier
+        first_removed = min(3 * j + 1, len(self.bezier) - 3)
+        self.bezier = np.delete(
+            self.bezier, np.s_[first_removed : first_removed + 3], axis=0
+        )
+        self._refresh_segments(j - 4, j, upload=False)
+        self.upload_points(self.bezier)
+
+    def undo(self) -> bool:
+        """Reverts the last edit, de Boor points and knots together."""
+        if not self.history.undo():
+            return False
+
+        self.selected_node_index = -1
+        self._rebuild()
+        return True
+
+    def redo(self) -> bool:
+        if not self.history.redo():
+            return False
+
+        self.selected_node_index = -1
+        self._rebuild()
+        return True
+
+    def _set_knots(self, knots: np.ndarray):
+        # Inside an edit the old knots go into its undo entry; outside one (a new curve)
+        # the history is cleared, as for the points
+        self.history.record_state(self._restore_knots, self.knots, knots)
+        self.knots = knots
+
+    def _restore_knots(self, knots: np.ndarray):
+        self.knots = knots.copy()
+
+    def _rebuild(self):
+        num_segments = self._span_count()
+        self.bezier = np.zeros((3 * num_segments + 1 if num_segments else 0, 2))
+        self._refresh_segments(0, num_segments - 1, upload=False)
+        self.preview_tail = np.empty((0, 2))
+        self.upload_points(self.bezier)
+
+    def _span_count(self) -> int:
+        # n de Boor points give n - 3 cubic segments
+        return max(len(self.control_points) - 3, 0)
+
+    def _refresh_segments(self, first: int, last: int, upload: bool = True):
+        """Recomputes the Bezier points of segments first..last (clamped to the curve)."""
+        first = max(first, 0)
+        last = min(last, self._span_count() - 1)
+        if first > last:
+            return
+
+        segments = np.arange(first, last + 1)
+        a = self.knots[segments + 3]
+        b = self.knots[segments + 4]
+
+        rows = 3 * segments[:, None] + np.arange(4)
+        points, knots = self.points, self.knots
+        self.bezier[rows[:, 0]] = BSpline._blossom(points, knots, segments, a, a, a)
+        self.bezier[rows[:, 1]] = BSpline._blossom(points, knots, segments, a, a, b)
+        self.bezier[rows[:, 2]] = BSpline._blossom(points, knots, segments, a, b, b)
+        self.bezier[rows[:, 3]] = BSpline._blossom(points, knots, segments, b, b, b)
+
+        if upload:
+            self.upload_range(3 * first, self.bezier[3 * first : 3 * last + 4])
+
+    @staticmethod
+    def _blossom(
+        points: np.ndarray, knots: np.ndarray, segments: np.ndarray, *params: np.ndarray
+    ) -> np.ndarray:
+        """Blossom f(u_1, u_2, u_3) of each segment, by de Boor's algorithm."""
+        # Local point j of segment s is de Boor point s + j
+        local = segments[:, None] + np.arange(4)
+        points = points[local].astype(np.float64)
+
+        for r, u in enumerate(params, start=1):
+            i = local[:, r:]
+            lo, hi = knots[i], knots[i + 4 - r]
+            alpha = ((u[:, None] - lo) / (hi - lo))[..., None]
+            points[:, r:] = (1.0 - alpha) * points[:, r - 1 : -1] + alpha * points[:, r:]
+
+        return points[:, 3]
+
+    def _closest_parameter(self, pos: glm.dvec2) -> tuple[int, float]:
+        """(segment, local parameter in (0, 1)) of the curve point closest to `pos`."""
+        segment, tau, _ = self.closest_point(pos)
+
+        # Keep clear of the span ends, where the new knot would repeat an existing one
+        return segment, min(max(tau, 0.01), 0.99)
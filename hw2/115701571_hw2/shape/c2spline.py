@@ -1,80 +1,95 @@
+from typing import Optional
 from OpenGL.GL import *
 import glm
-import copy
-from .glshape import GLShape
+from .patchcurve import PatchCurve
 from .renderable import Renderable
-from util import Shader
-from .bezier_curve import BezierCurve
+from util import C2Interpolation, PointStore, Shader, UndoLog
 
 
-class C2Spline(GLShape, Renderable):
+class C2Spline(PatchCurve, Renderable):
     def __init__(self, shader: Shader):
-        super().__init__(shader)
-        self.interpolation_points = []
-        self.control_points = []
-        self.segments = []
+        # Consecutive cubic segments share their end points
+        super().__init__(shader, stride=3)
+        # Shared with the app and the shapes drawing the control polygon. While drawing,
+        # each new node is derived from the last control points, so no separate list of
+        # interpolation points is kept
+        self.control_points = PointStore()
+        self.history = UndoLog(self.control_points)
         self.selected_node_index = -1
         self.preview_point = None
 
-    def update_points(self, points: list[glm.dvec2]):
-        self.interpolation_points = [glm.vec2(point.x, point.y) for point in points]
-        self.control_points = copy.deepcopy(self.interpolation_points)
-        self._update_segments()
-
-    def update_preview(self, preview_point: glm.dvec2):
-        self.preview_point = glm.vec2(preview_point.x, preview_point.y)
-
-    def get_preview_segments(self) -> list[BezierCurve]:
-        if not self.preview_point or len(self.interpolation_points) < 2:
-            return []
+        # False for curves loaded as they are that are only G1 at their joints (freehand
+        # fits): edits then stay local and keep G1 instead of propagating C2 constraints
+        # the points do not satisfy, until interpolate() makes the curve C2
+        self.c2 = True
 
-        temp_points = copy.deepcopy(self.interpolation_points)
-        temp_points.append(self.preview_point)
+    def update_points(self, points: list[glm.dvec2], c2: bool = True):
+        self.control_points.assign([(point.x, point.y) for point in points])
+        self.c2 = c2
+        self._update_segments()
 
-        preview_control_points = []
+    def interpolate(self, points: list[glm.vec2], end_condition: str = "natural"):
+        """
+        Rebuilds the spline as the global C2 interpolant through `points`
+        (see C2Interpolation; end_condition is "natural", "clamped" or "closed").
+        On a G1 curve this is the conversion to C2, which undo reverts as well.
+        """
+        with self.history.edit(None if self.c2 else "convert"):
+            self._interpolate(points, end_condition)
+
+    def _interpolate(self, points: list[glm.vec2], end_condition: str):
+        control_points = C2Interpolation.bezier_control_points(
+            [(point.x, point.y) for point in points], end_condition
+        )
+        self.control_points.assign(control_points)
+        self.c2 = True
+        self.selected_node_index = -1
+        self._update_segments()
 
-        preview_control_points.extend(self.control_points)
+    def update_preview(self, preview_point: glm.dvec2):
+        preview_point = glm.vec2(preview_point.x, preview_point.y)
+        if preview_point == self.preview_point:
+            return
 
-        if len(temp_points) >= 3:
-            last_3_points = temp_points[-3:]
-            preview_control_points.append(temp_points[-1])
-            preview_control_points.extend(
-                self._add_derived_control_points(last_3_points)
-            )
+        self.preview_point = preview_point
+        self._update_segments()
 
-        preview_segments = []
-        if len(preview_control_points) >= 4:
-            i = 0
-            while i < len(preview_control_points) - 3:
-                segment = BezierCurve(self.shader, preview_control_points[i : i + 4])
-                preview_segments.append(segment)
-                i += 3
+    def _get_preview_tail(self) -> list[glm.vec2]:
+        """Points appended after the committed control points to preview the next node."""
+        if not self.preview_point or len(self.control_points) < 2:
+            return []
 
-        return preview_segments
+        last_3_points = self.control_points[-2:] + [self.preview_point]
+        return [self.preview_point] + self._add_derived_control_points(last_3_points)
 
-    def select_node(self, mouse_pos: glm.dvec2) -> bool:
+    def select_node(self, mouse_pos: glm.dvec2, picked: Optional[int] = None) -> bool:
         THRESHOLD = 10.0  # pixels
-        closest_dist = float("inf")
-        closest_idx = -1
 
-        for i, point in enumerate(self.control_points):
-            # Convert both vectors to the same type (vec2) before subtraction
-            point_vec2 = glm.vec2(point.x, point.y)
-            mouse_vec2 = glm.vec2(mouse_pos.x, mouse_pos.y)
-            diff = point_vec2 - mouse_vec2
-            dist = glm.length(diff)
+        # `picked` comes from the GPU ID pass (-1: nothing there); without it, a grid
+        # lookup: only the points in the cells around the cursor are tested
+        if picked is None:
+            picked = self.control_points.pick(mouse_pos, THRESHOLD)
+        self.selected_node_index = picked
 
-            if dist < THRESHOLD and dist < closest_dist:
-                closest_dist = dist
-                closest_idx = i
-
-        self.selected_node_index = closest_idx
-        return closest_idx != -1
+        # A new selection starts a new undo step even for the same node
+        self.history.seal()
+        return self.selected_node_index != -1
 
     def move_selected_node(self, new_pos: glm.dvec2):
+        # All moves of the same node until the next selection (a drag) undo together
+        with self.history.edit(("move", self.selected_node_index)):
+            self._move_selected_node(new_pos)
+
+    def _move_selected_node(self, new_pos: glm.dvec2):
         if self.selected_node_index == -1:
             return
 
+        if not self.c2:
+            new_pos = glm.vec2(new_pos.x, new_pos.y)
+            self._move_keeping_g1(self.selected_node_index, new_pos)
+            self._update_segments()
+            return
+
         # Update position of selected node
         self.control_points[self.selected_node_index] = glm.vec2(new_pos.x, new_pos.y)
 
@@ -91,6 +106,36 @@ class C2Spline(GLShape, Renderable):
 
         self._update_segments()
 
+    def _move_keeping_g1(self, index: int, new_pos: glm.vec2):
+        """
+        Local edit of a G1 curve: a node drags its tangent handles along; a handle turns
+        the opposite one to stay collinear with it, keeping that one's length.
+        """
+        if self._is_interpolation_point(index):
+            offset = new_pos - self.control_points[index]
+            self.control_points[index] = new_pos
+            for handle in (index - 1, index + 1):
+                if 0 <= handle < len(self.control_points):
+                    self.control_points[handle] = self.control_points[handle] + offset
+            return
+
+        self.control_points[index] = new_pos
+
+        if index % 3 == 1:
+            node, opposite = index - 1, index - 2
+        else:
+            node, opposite = index + 1, index + 2
+        if self._is_endpoint(node):
+            return
+
+        center = self.control_points[node]
+        direction = center - new_pos
+        if glm.length(direction) == 0.0:
+            return
+
+        length = glm.length(self.control_points[opposite] - center)
+        self.control_points[opposite] = center + glm.normalize(direction) * length
+
     def _is_endpoint(self, index: int) -> bool:
         return index == 0 or index == len(self.control_points) - 1
 
@@ -163,9 +208,9 @@ class C2Spline(GLShape, Renderable):
 
         self.control_points[idx] = glm.vec2(2.0 * p1.x - p2.x, 2.0 * p1.y - p2.y)
 
-    def _update_control_points(self):
-        self.control_points.append(self.interpolation_points[-1])
-        last_3_points = self.interpolation_points[-3:]
+    def _update_control_points(self, point: glm.vec2):
+        self.control_points.append(point)
+        last_3_points = self.control_points[-3:]
         self.control_points.extend(self._add_derived_control_points(last_3_points))
 
     def _add_derived_control_points(
@@ -177,17 +222,15 @@ class C2Spline(GLShape, Renderable):
         return [p3, p4]
 
     def _update_segments(self):
-        if len(self.control_points) < 4:
-            return
-
-        self.segments = []
-        i = 0
-        while i < len(self.control_points):
-            segment = BezierCurve(self.shader, self.control_points[i : i + 4])
-            self.segments.append(segment)
-            i += 3
+        # All segments, including the preview ones at the end, live in one buffer;
+        # only the points that moved are re-sent (three, when just the cursor moved)
+        self.upload_store(self.control_points, self._get_preview_tail())
 
     def delete_selected_node(self) -> bool:
+        with self.history.edit():
+            return self._delete_selected_node()
+
+    def _delete_selected_node(self) -> bool:
         if self.selected_node_index == -1:
             return False
 
@@ -201,10 +244,13 @@ class C2Spline(GLShape, Renderable):
         # Clear all points if 4 or fewer points remain
         if len(self.control_points) <= 4:
             self.control_points.clear()
-            self.segments.clear()
+            self._update_segments()
             self.selected_node_index = -1
             return True
 
+        if not self.c2:
+            return self._delete_keeping_g1(self.selected_node_index)
+
         num_segments = (len(self.control_points) - 2) // 3
         deleted_segment = self.selected_node_index // 3
 
@@ -242,6 +288,24 @@ class C2Spline(GLShape, Renderable):
         self._update_segments()
         return True
 
+    def _delete_keeping_g1(self, index: int) -> bool:
+        """
+        Removes the node (or the node of the selected handle) with its two handles, so
+        its segments merge into one with the outer handles and the rest is untouched.
+        """
+        if index % 3 == 1:
+            index -= 1
+        elif index % 3 == 2:
+            index += 1
+        if self._is_endpoint(index):
+            return False
+
+        self.control_points.delete_points(index - 1, index + 2)
+
+        self.selected_node_index = -1
+        self._update_segments()
+        return True
+
     def _propagate_changes_forward_delete(self, start_idx: int):
         """Updates control points forward after deletion."""
         segment = start_idx // 3
@@ -254,6 +318,41 @@ class C2Spline(GLShape, Renderable):
                 self._update_second_control_point(i)
 
     def insert_node(self, new_pos: glm.vec2) -> bool:
+        # A click on the curve splits the segment there; elsewhere the node goes after
+        # the selected one
+        with self.history.edit():
+            return self._split_segment_at(new_pos) or self._insert_node(new_pos)
+
+    def _split_segment_at(self, pos: glm.vec2) -> bool:
+        """
+        Splits the segment closest to `pos` (within a few pixels) at the closest curve
+        point, with de Casteljau's algorithm: the new node lies on the curve and the
+        curve keeps its shape. The new node becomes the selected one.
+        """
+        THRESHOLD = 10.0  # pixels
+
+        hit = self.closest_point(pos, THRESHOLD)
+        if hit is None or hit[0] >= (len(self.control_points) - 1) // 3:
+            # Off the curve, or on a preview segment that is not committed yet
+            return False
+
+        segment, t, _ = hit
+        first = 3 * segment
+        p0, p1, p2, p3 = self.control_points[first : first + 4]
+
+        a, b, c = glm.mix(p0, p1, t), glm.mix(p1, p2, t), glm.mix(p2, p3, t)
+        d, e = glm.mix(a, b, t), glm.mix(b, c, t)
+        node = glm.mix(d, e, t)
+
+        self.control_points[first + 1] = a
+        self.control_points[first + 2] = d
+        self.control_points.insert_points(first + 3, [node, e, c])
+
+        self.selected_node_index = first + 3
+        self._update_segments()
+        return True
+
+    def _insert_node(self, new_pos: glm.vec2) -> bool:
         if self.selected_node_index == -1:
             return False
 
@@ -308,36 +407,46 @@ class C2Spline(GLShape, Renderable):
             self.control_points.insert(insert_idx, new_pos)
             self.control_points.insert(insert_idx, control1)
 
-            # Propagate changes to maintain C2 continuity
-            if insert_idx + 3 < len(self.control_points):
+            # Propagate changes to maintain C2 continuity (a G1 curve stays local)
+            if self.c2 and insert_idx + 3 < len(self.control_points):
                 self._propagate_changes_forward(insert_idx + 3)
-            if insert_idx > 0:
+            if self.c2 and insert_idx > 0:
                 self._propagate_changes_backward(insert_idx - 1)
 
         self._update_segments()
         return True
 
+    def undo(self) -> bool:
+        """Reverts the last edit; only the points it changed are written back."""
+        converted = self.history.peek() == "convert"
+        if not self.history.undo():
+            return False
+
+        if converted:
+            self.c2 = False
+        self.selected_node_index = -1
+        self._update_segments()
+        return True
+
+    def redo(self) -> bool:
+        if self.history.peek(redo=True) == "convert":
+            self.c2 = True
+        if not self.history.redo():
+            return False
+
+        self.selected_node_index = -1
+        self._update_segments()
+        return True
+
     def add_interpolation_point(self, point: glm.dvec2, last_point: bool = False):
         point_vec2 = glm.vec2(point.x, point.y)
 
-        if len(self.interpolation_points) < 3 or last_point:
-            self.interpolation_points.append(point_vec2)
-            self.control_points = copy.deepcopy(self.interpolation_points)
+        if len(self.control_points) < 3 or last_point:
+            self.control_points.append(point_vec2)
             if last_point:
                 self.preview_point = None
         else:
-            self.interpolation_points.append(point_vec2)
-            self._update_control_points()
-            self.interpolation_points = copy.deepcopy(self.control_points)
+            self._update_control_points(point_vec2)
 
         self._update_segments()
         return self.control_points
-
-    def render(self, timeElapsedSinceLastFrame: int, animate: bool) -> None:
-        # Render individual segments
-        for segment in self.segments:
-            segment.render(timeElapsedSinceLastFrame, animate)
-
-        preview_segments = self.get_preview_segments()
-        for segment in preview_segments:
-            segment.render(timeElapsedSinceLastFrame, animate)
@@ -1,112 +1,103 @@
+from typing import Optional
 from OpenGL.GL import *
 import glm
-import copy
-import ctypes
-from .glshape import GLShape
+from .patchcurve import PatchCurve
 from .renderable import Renderable
-from util import Shader
+from util import PointStore, Shader, UndoLog
 
 
-class CatmullRomSpline(GLShape, Renderable):
+class CatmullRomSpline(PatchCurve, Renderable):
+    color_uniform = "splineColor"
+
     def __init__(self, shader: Shader, control_points: list[glm.vec2] = []):
-        super().__init__(shader)
-        self.control_points = copy.deepcopy(control_points)
-        self.vao = glGenVertexArrays(1)
-        self.vbo = glGenBuffers(1)
-        self.selected_node_index = None
+        # Segment i is drawn from points i..i+3
+        super().__init__(shader, stride=1)
+        # Shared with the app and the shapes drawing the control polygon
+        self.control_points = PointStore(control_points)
+        self.history = UndoLog(self.control_points)
+        self.selected_node_index = -1
+        self.update_vbo()
 
     def add_control_point(self, point: glm.vec2):
         self.control_points.append(point)
         self.update_vbo()
 
-    def select_node(self, mouse_pos: glm.dvec2) -> bool:
+    def select_node(self, mouse_pos: glm.dvec2, picked: Optional[int] = None) -> bool:
         THRESHOLD = 10.0  # pixels
-        closest_dist = float("inf")
-        closest_idx = -1
 
-        for i, point in enumerate(self.control_points):
-            # Convert both vectors to the same type (vec2) before subtraction
-            point_vec2 = glm.vec2(point.x, point.y)
-            mouse_vec2 = glm.vec2(mouse_pos.x, mouse_pos.y)
-            diff = point_vec2 - mouse_vec2
-            dist = glm.length(diff)
+        # `picked` comes from the GPU ID pass (-1: nothing there); without it, a grid
+        # lookup: only the points in the cells around the cursor are tested
+        if picked is None:
+            picked = self.control_points.pick(mouse_pos, THRESHOLD)
+        self.selected_node_index = picked
 
-            if dist < THRESHOLD and dist < closest_dist:
-                closest_dist = dist
-                closest_idx = i
-
-        self.selected_node_index = closest_idx
-        return closest_idx != -1
+        # A new selection starts a new undo step even for the same node
+        self.history.seal()
+        return self.selected_node_index != -1
 
     def move_selected_node(self, new_pos: glm.dvec2):
         if self.selected_node_index == -1:
             return
 
-        self.control_points[self.selected_node_index] = glm.vec2(new_pos.x, new_pos.y)
+        # All moves of the same node until the next selection (a drag) undo together
+        with self.history.edit(("move", self.selected_node_index)):
+            self.control_points[self.selected_node_index] = glm.vec2(
+                new_pos.x, new_pos.y
+            )
         self.update_vbo()
 
     def delete_selected_node(self):
         if self.selected_node_index == -1:
             return
 
-        del self.control_points[self.selected_node_index]
+        with self.history.edit():
+            del self.control_points[self.selected_node_index]
         self.selected_node_index = -1
         self.update_vbo()
 
     def add_node_at_index(self, new_pos: glm.dvec2):
-        if self.selected_node_index == -1:
+        THRESHOLD = 10.0  # pixels
+
+        # A click on the curve inserts the node between the two points the segment
+        # under it runs between; elsewhere it goes after the selected node
+        hit = self.closest_point(new_pos, THRESHOLD)
+        if hit is not None:
+            index = hit[0] + 2
+        elif self.selected_node_index != -1:
+            index = self.selected_node_index + 1
+        else:
             return
 
-        self.control_points.insert(
-            self.selected_node_index + 1, glm.vec2(new_pos.x, new_pos.y)
-        )
+        with self.history.edit():
+            self.control_points.insert(index, glm.vec2(new_pos.x, new_pos.y))
+        self.selected_node_index = index
         self.update_vbo()
 
-    def update_points(self, points: list[glm.vec2]):
-        self.control_points = copy.deepcopy(points)
-        self.update_vbo()
+    def undo(self) -> bool:
+        """Reverts the last edit; only the points it changed are written back."""
+        if not self.history.undo():
+            return False
 
-    def update_vbo(self):
-        """Update the VBO with control points data."""
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-        data = glm.array(
-            glm.float32,
-            *[coord for point in self.control_points for coord in (point.x, point.y)]
-        )
-        glBufferData(GL_ARRAY_BUFFER, data.nbytes, data.ptr, GL_DYNAMIC_DRAW)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-
-    def render(self, timeElapsedSinceLastFrame: int, animate: bool) -> None:
-        """Render the Catmull-Rom spline by iterating through control points."""
-        if len(self.control_points) < 4:
-            return
-
-        self.shader.use()
-        self.shader.setMat3("model", self.model)
-
-        glBindVertexArray(self.vao)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        self.selected_node_index = -1
+        self.update_vbo()
+        return True
 
-        glEnableVertexAttribArray(0)
-        glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+    def redo(self) -> bool:
+        if not self.history.redo():
+            return False
 
-        glPatchParameteri(GL_PATCH_VERTICES, 4)  # Ensure patches of 4 vertices
+        self.selected_node_index = -1
+        self.update_vbo()
+        return True
 
-        # Render each segment with overlapping points
-        for i in range(len(self.control_points) - 3):
-            segment_data = glm.array(
-                glm.float32,
-                *[
-                    coord
-                    for point in self.control_points[i : i + 4]
-                    for coord in (point.x, point.y)
-                ]
-            )
-            glBufferData(
-                GL_ARRAY_BUFFER, segment_data.nbytes, segment_data.ptr, GL_DYNAMIC_DRAW
-            )
+    def update_points(self, points: list[glm.vec2]):
+        self.control_points.assign(points)
+        self.update_vbo()
 
-            glDrawArrays(GL_PATCHES, 0, 4)
+    def update_preview(self, preview_point: glm.dvec2):
+        """Draws the curve as if `preview_point` were appended to the control points."""
+        self.upload_store(self.control_points, [preview_point])
 
-        glDisableVertexAttribArray(0)
-        glBindVertexArray(0)
+    def update_vbo(self):
+        """Update the VBO with control points data (only the changed range is sent)."""
+        self.upload_store(self.control_points)
@@ -6,7 +6,7 @@ import glm
 
 from .glshape import GLShape
 from .renderable import Renderable
-from util import Shader
+from util import GLResourcePool, Shader
 
 
 class Circle(GLShape, Renderable):
@@ -33,10 +33,11 @@ class Circle(GLShape, Renderable):
                               3 * glm.sizeof(glm.float32),  # stride between attributes in VBO data
                               None)                         # offset of 1st attribute in VBO data
 
-        glBufferData(GL_ARRAY_BUFFER,
-                     self.parameters.nbytes,
-                     self.parameters.ptr,
-                     GL_STATIC_DRAW)
+        GLResourcePool.bufferData(self.vbo,
+                                  GL_ARRAY_BUFFER,
+                                  self.parameters.nbytes,
+                                  self.parameters.ptr,
+                                  GL_STATIC_DRAW)
         
         glBindBuffer(GL_ARRAY_BUFFER, 0)
         glBindVertexArray(0)
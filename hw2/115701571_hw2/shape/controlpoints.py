@@ -0,0 +1,67 @@
+from OpenGL.GL import *
+import glm
+from .pointbuffer import PointBuffer
+from .renderable import Renderable
+from util import DrawList, PointStore, Shader
+
+
+class ControlPoints(PointBuffer, Renderable):
+    """
+    Control points drawn as point sprites with the pixel shader, from a persistent
+    position-only VBO.
+
+    A PointStore is followed through its tracker, so only the points written since the
+    last frame are sent; an array of points is diffed against what the GPU holds. Every
+    point takes `color` as a constant vertex attribute, and the selected one is picked out
+    in the shader by its index (the selectedIndex uniform), so selecting a node rewrites
+    nothing.
+    """
+
+    def __init__(self, shader: Shader):
+        super().__init__(shader)
+        self.pixel_size = 7.5
+        self.color = glm.vec3(0.0, 1.0, 0.0)
+        self.selected_color = glm.vec3(0.0, 0.0, 1.0)
+        self.selected_index = -1
+
+    def update_points(self, points, selected_index: int = -1):
+        """Makes the VBO hold `points` (a PointStore or an (n, 2) array)."""
+        if isinstance(points, PointStore):
+            self.upload_store(points)
+        else:
+            self.stop_tracking()
+            self.upload_points(points)
+
+        self.selected_index = selected_index
+
+    def submit(self, draw_list: DrawList) -> None:
+        # No color array: attribute 1 reads the color as a constant for every point
+        draw_list.add(
+            self.shader,
+            self.vao,
+            GL_POINTS,
+            0,
+            len(self.uploaded),
+            uniforms=(
+                ("model", self.model),
+                ("pixelSize", self.pixel_size),
+                ("selectedIndex", int(self.selected_index)),
+                ("selectedColor", self.selected_color),
+            ),
+            attributes=((1, self.color),),
+        )
+
+    def submit_ids(self, draw_list: DrawList, shader: Shader, id_base: int) -> None:
+        """Queues the points for the ID pass: point i is drawn as id_base + i."""
+        draw_list.add(
+            shader,
+            self.vao,
+            GL_POINTS,
+            0,
+            len(self.uploaded),
+            uniforms=(
+                ("model", self.model),
+                ("pixelSize", self.pixel_size),
+                ("idBase", id_base),
+            ),
+        )
@@ -7,7 +7,7 @@ import copy
 from OpenGL.GL import *
 import glm
 
-from util import Shader
+from util import GLResourcePool, Shader
 
 
 
@@ -16,18 +16,35 @@ class GLShape:
     Generic Shape object that manages the OpenGL context for a shape.
     All shapes directly interacting with the OpenGL context
     should public-inherit this class.
+
+    The VAO/VBO come from GLResourcePool and go back to it on release(),
+    which runs at the latest when the shape is garbage collected.
+    Short-lived shapes should release explicitly, e.g. `with shape: shape.render(...)`.
     """
     def __init__(self, 
                  shader: Shader, 
                  model: glm.mat3 = glm.mat3(1.0)):
         self.shader: Shader = shader
-        self.vao: int = glGenVertexArrays(1)
-        self.vbo: int = glGenBuffers(1)
+        self.vao: int = GLResourcePool.acquireVertexArray()
+        self.vbo: int = GLResourcePool.acquireBuffer()
         self.model: glm.mat3 = copy.deepcopy(model)
     
     def __del__(self):
-        glDeleteVertexArrays(1, (self.vao,))
-        self.vao = 0
-        glDeleteBuffers(1, (self.vbo,))
-        self.vbo = 0
+        self.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback) -> None:
+        self.release()
+
+    def release(self) -> None:
+        """Returns the VAO/VBO to the pool; the shape must not be rendered afterwards."""
+        if getattr(self, 'vao', 0):
+            GLResourcePool.releaseVertexArray(self.vao)
+            self.vao = 0
+
+        if getattr(self, 'vbo', 0):
+            GLResourcePool.releaseBuffer(self.vbo)
+            self.vbo = 0
 
@@ -0,0 +1,139 @@
+import math
+from typing import Optional
+from OpenGL.GL import *
+import glm
+import numpy as np
+from .pointbuffer import PointBuffer
+from util import ArcLengthTable, DrawList, GLResourcePool, SegmentBVH, Shader
+
+
+class PatchCurve(PointBuffer):
+    """
+    Control points of a whole piecewise-cubic curve in one VBO, drawn as overlapping
+    4-point patches with a single glDrawElements(GL_PATCHES).
+
+    Segment i uses points [i * stride, i * stride + 3]: stride 3 for a Bezier spline
+    (segments share their end points), stride 1 for Catmull-Rom (segments share three points).
+    Points are uploaded through PointBuffer, so only the range that changed is re-sent.
+    """
+
+    # Color uniform of the fragment shader the curve is drawn with
+    color_uniform = "bezierColor"
+
+    def __init__(self, shader: Shader, stride: int):
+        super().__init__(shader)
+        self.stride = stride
+        self.ebo = GLResourcePool.acquireBuffer()
+
+        # How many segments the index buffer holds before regrowing
+        self.segment_capacity = 0
+        self.num_segments = 0
+        self.color = glm.vec4(1.0, 1.0, 1.0, 1.0)
+        self.arc_length_table = None
+
+        # Segment BVH and the point version it describes
+        self.bvh = None
+        self.bvh_version = -1
+
+    def segment_count(self, num_points: int) -> int:
+        if num_points < 4:
+            return 0
+        return (num_points - 4) // self.stride + 1
+
+    def upload_points(self, points) -> None:
+        super().upload_points(points)
+        self.num_segments = self.segment_count(len(self.uploaded))
+        self._reserve_segments(self.num_segments)
+
+    @property
+    def kind(self) -> str:
+        return "bezier" if self.stride == 3 else "catmullrom"
+
+    def arc_length(self) -> ArcLengthTable:
+        """Arc-length table of the uploaded curve; only changed segments are redone."""
+        if self.arc_length_table is None:
+            self.arc_length_table = ArcLengthTable(self.kind)
+
+        self.arc_length_table.update(self.uploaded)
+        return self.arc_length_table
+
+    def segment_bvh(self) -> SegmentBVH:
+        """Segment BVH of the uploaded curve; refitted only after the points changed."""
+        if self.bvh is None:
+            self.bvh = SegmentBVH(self.kind)
+
+        if self.bvh_version != self.version:
+            self.bvh.update(self.uploaded)
+            self.bvh_version = self.version
+        return self.bvh
+
+    def closest_point(
+        self, position, max_distance: float = math.inf
+    ) -> Optional[tuple[int, float, float]]:
+        """(segment, t, distance) of the closest curve point within `max_distance`, or None."""
+        return self.segment_bvh().closest(position, max_distance)
+
+    def _reserve_segments(self, num_segments: int) -> None:
+        # Patch indices only depend on the segment position, so the index buffer
+        # is rebuilt only when it has to grow
+        if num_segments <= self.segment_capacity:
+            return
+
+        self.segment_capacity = max(num_segments, 2 * self.segment_capacity, 16)
+        starts = np.arange(self.segment_capacity, dtype=np.uint32) * self.stride
+        indices = (starts[:, None] + np.arange(4, dtype=np.uint32)).ravel()
+
+        glBindVertexArray(self.vao)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+        GLResourcePool.bufferData(
+            self.ebo, GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW
+        )
+        glBindVertexArray(0)
+
+    def submit(
+        self,
+        draw_list: DrawList,
+        first_segment: int = 0,
+        num_segments: int = -1,
+        color: Optional[glm.vec4] = None,
+    ) -> None:
+        """
+        Queues `num_segments` segments (default: all) starting at `first_segment` as one
+        draw, in `color` (default: the curve's).
+        """
+        if num_segments < 0:
+            num_segments = self.num_segments - first_segment
+        num_segments = min(num_segments, self.num_segments - first_segment)
+
+        draw_list.add(
+            self.shader,
+            self.vao,
+            GL_PATCHES,
+            4 * first_segment,
+            4 * num_segments,
+            indexed=True,
+            patch_vertices=4,
+            uniforms=(
+                ("model", self.model),
+                (self.color_uniform, self.color if color is None else color),
+            ),
+        )
+
+    def submit_ids(self, draw_list: DrawList, shader: Shader, id_base: int) -> None:
+        """Queues the segments for the ID pass: segment i is drawn as id_base + i."""
+        draw_list.add(
+            shader,
+            self.vao,
+            GL_PATCHES,
+            0,
+            4 * self.num_segments,
+            indexed=True,
+            patch_vertices=4,
+            uniforms=(("model", self.model), ("idBase", id_base)),
+        )
+
+    def release(self) -> None:
+        if getattr(self, "ebo", 0):
+            GLResourcePool.releaseBuffer(self.ebo)
+            self.ebo = 0
+        super().release()
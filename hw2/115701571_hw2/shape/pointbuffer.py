@@ -0,0 +1,153 @@
+from OpenGL.GL import *
+import glm
+import numpy as np
+from .glshape import GLShape
+from util import DrawList, GLResourcePool, PointStore, Shader
+
+
+class PointBuffer(GLShape):
+    """
+    A shape whose VBO holds 2D points (attribute 0, two floats), mirrored in `uploaded`.
+
+    upload_points() sends the range that differs from what the GPU already holds,
+    upload_range() a range the caller knows changed, and upload_store() follows a
+    PointStore by reference, sending only the points its tracker reports as written.
+
+    Subclasses queue their draws with submit(); render() draws the shape on its own.
+    """
+
+    def __init__(self, shader: Shader):
+        super().__init__(shader)
+
+        # What the GPU currently holds, and how many points fit before regrowing
+        self.uploaded = np.zeros((0, 2), dtype=np.float32)
+        self.point_capacity = 0
+        self.store_changes = None
+
+        # Bumped whenever the points on the GPU change
+        self.version = 0
+
+        glBindVertexArray(self.vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(
+            0, 2, GL_FLOAT, GL_FALSE, 2 * glm.sizeof(glm.float32), None
+        )
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindVertexArray(0)
+
+    def submit(self, draw_list: DrawList) -> None:
+        """Queues the draws of this shape on `draw_list`."""
+        raise NotImplementedError
+
+    def render(self, timeElapsedSinceLastFrame: int, animate: bool) -> None:
+        draw_list = DrawList()
+        self.submit(draw_list)
+        draw_list.submit()
+
+    @staticmethod
+    def points_array(points) -> np.ndarray:
+        """(n, 2) float32 copy of glm vectors, (x, y) pairs or an array."""
+        if isinstance(points, (np.ndarray, PointStore)):
+            return np.array(points, dtype=np.float32).reshape(-1, 2)
+        return np.asarray(
+            [(point[0], point[1]) for point in points], dtype=np.float32
+        ).reshape(-1, 2)
+
+    def upload_points(self, points) -> None:
+        """Makes the VBO hold `points` (glm vectors or (n, 2) array); sends only what changed."""
+        data = PointBuffer.points_array(points)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+
+        if len(data) > self.point_capacity:
+            # Grow geometrically so appending points does not reallocate every time
+            self.point_capacity = max(len(data), 2 * self.point_capacity, 16)
+            GLResourcePool.bufferData(
+                self.vbo,
+                GL_ARRAY_BUFFER,
+                self.point_capacity * 2 * glm.sizeof(glm.float32),
+                None,
+                GL_DYNAMIC_DRAW,
+            )
+            first, last = 0, len(data)
+        else:
+            first, last = PointBuffer._changed_range(self.uploaded, data)
+
+        if first < last or len(data) != len(self.uploaded):
+            self.version += 1
+
+        if first < last:
+            glBufferSubData(
+                GL_ARRAY_BUFFER,
+                first * 2 * glm.sizeof(glm.float32),
+                data[first:last].nbytes,
+                data[first:last],
+            )
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        self.uploaded = data
+
+    def upload_range(self, first: int, points: np.ndarray) -> None:
+        """Overwrites points [first, first + len(points)); for callers that know what changed."""
+        data = points.astype(np.float32).reshape(-1, 2)
+        self.uploaded[first : first + len(data)] = data
+        self.version += 1
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferSubData(
+            GL_ARRAY_BUFFER, first * 2 * glm.sizeof(glm.float32), data.nbytes, data
+        )
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def upload_store(self, store: PointStore, tail=()) -> None:
+        """
+        Makes the VBO hold the points of `store` followed by `tail` (a few extra points,
+        such as the one under the cursor while drawing). While the length stays the same,
+        only the points written since the last call and a changed tail are sent.
+        """
+        if self.store_changes is None or self.store_changes.store is not store:
+            self.stop_tracking()
+            self.store_changes = store.track()
+
+        first, last = self.store_changes.take()
+        tail = PointBuffer.points_array(tail)
+        count = len(store)
+
+        if count + len(tail) != len(self.uploaded):
+            # Points were added or removed: upload_points diffs and regrows as needed
+            self.upload_points(np.concatenate([store.view(), tail]))
+            return
+
+        if first < last:
+            self.upload_range(first, store.view()[first:last])
+        if len(tail) and np.any(self.uploaded[count:] != tail):
+            self.upload_range(count, tail)
+
+    def stop_tracking(self) -> None:
+        if getattr(self, "store_changes", None) is not None:
+            self.store_changes.close()
+            self.store_changes = None
+
+    @staticmethod
+    def _changed_range(old: np.ndarray, new: np.ndarray) -> tuple[int, int]:
+        """Smallest [first, last) range of points of `new` that differs from `old`."""
+        common = min(len(old), len(new))
+        changed = np.flatnonzero(np.any(old[:common] != new[:common], axis=1))
+
+        first = changed[0] if len(changed) else common
+        last = changed[-1] + 1 if len(changed) else common
+
+        # Points beyond the old length are new
+        if len(new) > common:
+            last = len(new)
+            first = min(first, common)
+
+        return int(first), int(last)
+
+    def release(self) -> None:
+        self.stop_tracking()
+        super().release()
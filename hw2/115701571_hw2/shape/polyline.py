@@ -1,45 +1,118 @@
-import copy
+from typing import Optional
+
 from OpenGL.GL import *
 import glm
-from .glshape import GLShape
+import numpy as np
+from .pointbuffer import PointBuffer
 from .renderable import Renderable
-from util import Shader
+from util import DrawList, GLResourcePool, PointStore, PolylineLOD, Shader
+
+
+class Polyline(PointBuffer, Renderable):
+    """
+    A line strip through points, kept at full resolution in the VBO for editing.
+
+    Long polylines are drawn through a level of detail (PolylineLOD) that leaves out the
+    vertices within `pixel_tolerance` pixels of the simplified line, as an index buffer
+    into the same VBO. While the points keep changing (drawing, dragging) the whole
+    polyline is drawn; the level of detail is rebuilt on the first frame they stay put.
+    """
 
+    # Below this many points simplifying costs more than drawing everything
+    LOD_MIN_POINTS = 512
 
-class Polyline(GLShape, Renderable):
-    def __init__(self, shader: Shader):
+    def __init__(
+        self,
+        shader: Shader,
+        pixel_tolerance: float = 0.5,
+        simplification: Optional[str] = "douglas-peucker",
+    ):
         super().__init__(shader)
-        self.points = []
+        self.store = None
+        self.tail = ()
 
-        glBindVertexArray(self.vao)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        self.pixel_tolerance = pixel_tolerance
+        self.ebo = GLResourcePool.acquireBuffer()
+        self.set_simplification(simplification)
 
-        glEnableVertexAttribArray(0)
-        glVertexAttribPointer(
-            0, 2, GL_FLOAT, GL_FALSE, 2 * glm.sizeof(glm.float32), None
-        )
+    def set_simplification(self, method: Optional[str]) -> None:
+        """Simplifies with "douglas-peucker" or "visvalingam", or not at all (None)."""
+        self.lod = PolylineLOD(method) if method is not None else None
 
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-        glBindVertexArray(0)
+        # Point versions the level of detail was built from and the last frame drew
+        self.lod_version = -1
+        self.drawn_version = -1
+        self.lod_indices = None
 
-    def update_points(self, points):
-        self.points = copy.deepcopy(points)
+    def update_points(self, points, tail=()):
+        """
+        Draws `points` followed by `tail`. A PointStore is followed by reference: edits made
+        to it later show up at the next frame without calling this again.
+        """
+        if isinstance(points, PointStore):
+            self.store = points
+            self.tail = PointBuffer.points_array(tail)
+            self.upload_store(self.store, self.tail)
+        else:
+            self.store = None
+            self.stop_tracking()
+            self.upload_points(list(points) + list(tail))
 
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-        data = glm.array(
-            glm.float32,
-            *[coord for point in self.points for coord in (point.x, point.y)]
-        )
-        glBufferData(GL_ARRAY_BUFFER, data.nbytes, data.ptr, GL_DYNAMIC_DRAW)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
+    def submit(self, draw_list: DrawList) -> None:
+        if self.store is not None:
+            self.upload_store(self.store, self.tail)
 
-    def render(self, timeElapsedSinceLastFrame: int, animate: bool) -> None:
-        if len(self.points) < 2:
+        if len(self.uploaded) < 2:
             return
 
-        self.shader.use()
-        self.shader.setMat3("model", self.model)
+        indices = self._level_of_detail()
+        draw_list.add(
+            self.shader,
+            self.vao,
+            GL_LINE_STRIP,
+            0,
+            len(self.uploaded) if indices is None else len(indices),
+            indexed=indices is not None,
+            uniforms=(("model", self.model),),
+        )
+
+    def _level_of_detail(self) -> Optional[np.ndarray]:
+        """Indices of the vertices to draw, or None for all of them."""
+        if self.lod is None or len(self.uploaded) < Polyline.LOD_MIN_POINTS:
+            return None
+
+        if self.version != self.drawn_version:
+            # Still changing: simplifying every frame would cost more than it saves
+            self.drawn_version = self.version
+            return None
+
+        if self.lod_version != self.version:
+            self.lod.update(self.uploaded)
+            self.lod_version = self.version
+
+        # The tolerance in the units of the points, for a model that scales them
+        scale = abs(glm.determinant(glm.mat2(self.model))) ** 0.5
+        indices = self.lod.indices(self.pixel_tolerance / max(scale, 1e-6))
+        if len(indices) == len(self.uploaded):
+            return None
+
+        if indices is not self.lod_indices:
+            glBindVertexArray(self.vao)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+            GLResourcePool.bufferData(
+                self.ebo,
+                GL_ELEMENT_ARRAY_BUFFER,
+                indices.nbytes,
+                indices,
+                GL_DYNAMIC_DRAW,
+            )
+            glBindVertexArray(0)
+            self.lod_indices = indices
+
+        return indices
 
-        glBindVertexArray(self.vao)
-        glDrawArrays(GL_LINE_STRIP, 0, len(self.points))
-        glBindVertexArray(0)
+    def release(self) -> None:
+        if getattr(self, "ebo", 0):
+            GLResourcePool.releaseBuffer(self.ebo)
+            self.ebo = 0
+        super().release()
@@ -6,7 +6,7 @@ import glm
 
 from .glshape import GLShape
 from .renderable import Renderable
-from util import Shader
+from util import GLResourcePool, Shader
 
 
 class Triangle(GLShape, Renderable):
@@ -43,10 +43,11 @@ class Triangle(GLShape, Renderable):
                               5 * glm.sizeof(glm.float32),
                               ctypes.c_void_p(2 * glm.sizeof(glm.float32)))
 
-        glBufferData(GL_ARRAY_BUFFER,
-                     self.vertices.nbytes,
-                     self.vertices.ptr,
-                     GL_STATIC_DRAW);
+        GLResourcePool.bufferData(self.vbo,
+                                  GL_ARRAY_BUFFER,
+                                  self.vertices.nbytes,
+                                  self.vertices.ptr,
+                                  GL_STATIC_DRAW);
 
         glBindBuffer(GL_ARRAY_BUFFER, 0);
         glBindVertexArray(0);
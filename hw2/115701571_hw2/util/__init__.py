@@ -1,2 +1,18 @@
+from .resourcepool import GLResourcePool
 from .shader import Shader
+from .shaderregistry import ShaderRegistry
 from .splineIO import SplineIO
+from .splinescene import SplineScene
+from .arclength import ArcLengthTable
+from .c2interpolation import C2Interpolation
+from .cubicbasis import CubicBasis
+from .curvefit import CurveFit
+from .drawlist import DrawCommand, DrawList
+from .idbuffer import IDBuffer
+from .png import PNG
+from .pointgrid import PointGrid
+from .pointstore import PointChanges, PointStore
+from .primitivecounter import PrimitiveCounter
+from .segmentbvh import SegmentBVH
+from .simplify import PolylineLOD, PolylineSimplify
+from .undolog import UndoEntry, UndoLog
@@ -0,0 +1,204 @@
+import numpy as np
+
+from .cubicbasis import CubicBasis
+
+
+class ArcLengthTable:
+    """
+    Arc length <-> (segment, parameter) mapping for a piecewise cubic curve.
+
+    Each segment is split into `subdivisions` equal parameter intervals whose lengths
+    are integrated with `order`-point Gauss-Legendre quadrature; the running sums form
+    the per-segment lookup table. update() reuses the tables of every segment whose
+    control points did not change (matched from both ends, so inserting or deleting
+    points in the middle of the curve only recomputes the segments around the edit).
+
+    parameter() maps arc lengths to parameters with one binary search over all tables,
+    a linear guess inside the interval found and `newton_steps` safeguarded Newton
+    iterations on L(t) - s = 0, all vectorized over the queries.
+    """
+
+    def __init__(
+        self,
+        kind: str = "bezier",
+        subdivisions: int = 16,
+        order: int = 5,
+        newton_steps: int = 3,
+    ):
+        self.kind = kind
+        self.subdivisions = subdivisions
+        self.newton_steps = newton_steps
+        nodes, weights = np.polynomial.legendre.leggauss(order)
+
+        # Quadrature nodes and weights mapped from [-1, 1] to [0, 1]
+        self.nodes = 0.5 * (nodes + 1.0)
+        self.weights = 0.5 * weights
+
+        self.segments = np.empty((0, 4, 2))
+        self.coefficients = np.empty((0, 4, 2))
+        self.tables = np.empty((0, subdivisions + 1))
+        self.cumulative = np.zeros(1)
+        self.recomputed = 0
+
+    @property
+    def length(self) -> float:
+        return float(self.cumulative[-1])
+
+    def update(self, points) -> None:
+        """Makes the tables describe the curve through `points` (n, dim)."""
+        segments = CubicBasis.segments(points, self.kind)
+        old = self.segments
+
+        # Segments equal at the start and at the end keep their tables
+        common = min(len(old), len(segments))
+        same = np.all(old[:common] == segments[:common], axis=(1, 2))
+        prefix = common if same.all() else int(np.argmin(same))
+
+        same = np.all(
+            old[len(old) - common :][::-1] == segments[len(segments) - common :][::-1],
+            axis=(1, 2),
+        )
+        suffix = common if same.all() else int(np.argmin(same))
+        suffix = min(suffix, common - prefix)
+
+        changed = segments[prefix : len(segments) - suffix]
+        coefficients = CubicBasis.coefficients(changed, self.kind)
+
+        self.tables = np.concatenate(
+            [
+                self.tables[:prefix],
+                self._integrate(coefficients),
+                self.tables[len(old) - suffix :],
+            ]
+        )
+        self.coefficients = np.concatenate(
+            [
+                self.coefficients[:prefix],
+                coefficients,
+                self.coefficients[len(old) - suffix :],
+            ]
+        )
+        self.segments = segments.copy()
+        self.recomputed = len(changed)
+
+        self.cumulative = np.concatenate([[0.0], np.cumsum(self.tables[:, -1])])
+
+    def _integrate(self, coefficients: np.ndarray) -> np.ndarray:
+        """Running lengths (num_segments, subdivisions + 1) at the subdivisions."""
+        steps = self.subdivisions
+        starts = np.arange(steps) / steps
+
+        if len(coefficients) == 0:
+            return np.empty((0, steps + 1))
+
+        # Quadrature points of every interval, for all segments at once
+        t = (starts[:, None] + self.nodes[None, :] / steps).ravel()
+        speed = np.linalg.norm(CubicBasis.evaluate(coefficients, t, 1), axis=-1)
+        lengths = speed.reshape(len(coefficients), steps, -1) @ self.weights / steps
+
+        tables = np.zeros((len(coefficients), steps + 1))
+        np.cumsum(lengths, axis=1, out=tables[:, 1:])
+        return tables
+
+    def parameter(self, s) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (segment, t) of the points at arc lengths `s` (clamped to the curve), shaped
+        like `s`; a scalar gives 0-d arrays.
+        """
+        shape = np.shape(s)
+        segment, t = self._parameter(s)
+        return segment.reshape(shape), t.reshape(shape)
+
+    def _parameter(self, s) -> tuple[np.ndarray, np.ndarray]:
+        """parameter() for the flattened `s`."""
+        s = np.atleast_1d(np.asarray(s, dtype=np.float64)).ravel()
+        s = np.clip(s, 0.0, self.length)
+        steps = self.subdivisions
+
+        if len(self.tables) == 0:
+            return np.zeros(s.shape, dtype=int), np.zeros_like(s)
+
+        # Running length along the whole curve at every subdivision, so one
+        # binary search covers all tables: the first interval ending at or after s,
+        # which is the first one on a curve (or a stretch of it) of zero length
+        flat = (self.cumulative[:-1, None] + self.tables[:, 1:]).ravel()
+        interval = np.minimum(np.searchsorted(flat, s, side="left"), len(flat) - 1)
+        segment, step = np.divmod(interval, steps)
+
+        local = s - self.cumulative[segment]
+        low = self.tables[segment, step]
+        high = self.tables[segment, step + 1]
+        fraction = np.divide(
+            local - low, high - low, out=np.zeros_like(s), where=high > low
+        )
+
+        # Newton on L(t) - s, safeguarded: L is increasing, so every iterate narrows
+        # a bracket around the root, and steps that leave it bisect instead
+        derivatives = self._derivatives(segment)
+        t0 = step / steps
+        lower, upper = t0, (step + 1) / steps
+        t = (step + fraction) / steps
+        for _ in range(self.newton_steps):
+            error = low + self._length_between(derivatives, t0, t) - local
+            lower = np.where(error < 0.0, t, lower)
+            upper = np.where(error > 0.0, t, upper)
+
+            # Where the speed is 0, bisect, unless t is already exact
+            speed = ArcLengthTable._speed(derivatives, t[:, None])[:, 0]
+            newton = t - np.divide(
+                error, speed, out=np.where(error == 0.0, 0.0, -1.0), where=speed > 0.0
+            )
+            inside = (newton >= lower) & (newton <= upper)
+            t = np.where(inside, newton, 0.5 * (lower + upper))
+
+        return segment, t
+
+    def arc_length(self, segment, t) -> np.ndarray:
+        """Arc length from the start of the curve to (segment, t)."""
+        segment = np.asarray(segment)
+        t = np.asarray(t, dtype=np.float64)
+        step = np.minimum((t * self.subdivisions).astype(int), self.subdivisions - 1)
+        t0 = step / self.subdivisions
+
+        return (
+            self.cumulative[segment]
+            + self.tables[segment, step]
+            + self._length_between(self._derivatives(segment), t0, t)
+        )
+
+    def speed(self, segment, t) -> np.ndarray:
+        """|p'(t)| of segment[i] at t[i]."""
+        t = np.asarray(t, dtype=np.float64).reshape(-1, 1)
+        return ArcLengthTable._speed(self._derivatives(segment), t)[:, 0]
+
+    def _derivatives(self, segment) -> np.ndarray:
+        """Coefficients (m, 3, dim) of p'(t) = c1 + 2 c2 t + 3 c3 t^2 per sample."""
+        coefficients = self.coefficients[np.asarray(segment).ravel(), 1:]
+        return coefficients * [[1.0], [2.0], [3.0]]
+
+    @staticmethod
+    def _speed(derivatives: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """|p'| at t (m, k) for the derivative coefficients of m samples."""
+        t = t[..., None]
+        velocity = derivatives[:, None, 0] + t * (
+            derivatives[:, None, 1] + t * derivatives[:, None, 2]
+        )
+        return np.sqrt(np.sum(velocity * velocity, axis=-1))
+
+    def _length_between(self, derivatives: np.ndarray, t0, t1) -> np.ndarray:
+        """Quadrature of |p'| over [t0, t1] for each sample."""
+        width = np.broadcast_to(t1 - t0, (len(derivatives),))
+        t = np.asarray(t0)[..., None] + width[:, None] * self.nodes
+        return (ArcLengthTable._speed(derivatives, t) @ self.weights) * width
+
+    def evaluate(self, s) -> np.ndarray:
+        """Curve points at arc lengths `s`, shaped like `s` plus a coordinate axis."""
+        segment, t = self._parameter(s)
+        points = CubicBasis.evaluate_at(self.coefficients, segment, t)
+        return points.reshape(np.shape(s) + points.shape[-1:])
+
+    def uniform_samples(self, count: int) -> np.ndarray:
+        """`count` points evenly spaced along the curve, both ends included."""
+        if len(self.coefficients) == 0:
+            return np.empty((0, 2))
+        return self.evaluate(np.linspace(0.0, self.length, count))
@@ -0,0 +1,191 @@
+import math
+from typing import Optional
+
+import numpy as np
+
+
+class C2Interpolation:
+    """
+    Global C2 cubic interpolation through a list of points.
+
+    With uniform parameterization, the tangents D_i at the interpolation points P_i satisfy
+        D_{i-1} + 4 D_i + D_{i+1} = 3 (P_{i+1} - P_{i-1})
+    at every interior point, plus one equation per end:
+        natural:  2 D_0 + D_1 = 3 (P_1 - P_0),  D_{n-1} + 2 D_n = 3 (P_n - P_{n-1})
+        clamped:  D_0 and D_n are given
+        closed:   the interior equation wraps around (cyclic system)
+    Segment i is then the cubic Bezier P_i, P_i + D_i / 3, P_{i+1} - D_{i+1} / 3, P_{i+1}.
+
+    The tridiagonal system is solved with the Thomas algorithm. Its interior rows are all
+    (1, 4, 1), so the elimination factors converge to 2 - sqrt(3) within a few rows; from there on
+    both sweeps are constant-coefficient linear recurrences, evaluated with a few whole-array
+    numpy passes instead of a Python loop. Only the first few rows run element by element.
+    """
+
+    END_CONDITIONS = ("natural", "clamped", "closed")
+
+    # Limit of the elimination factor c'_i = 1 / (4 - c'_{i-1})
+    _GAMMA = 2.0 - math.sqrt(3.0)
+
+    @staticmethod
+    def bezier_control_points(
+        points,
+        end_condition: str = "natural",
+        start_tangent=None,
+        end_tangent=None,
+    ) -> np.ndarray:
+        """
+        Bezier control points (3n + 1, dim) of the C2 spline through `points` (n + 1, dim).
+        For "closed" the spline returns to points[0] and has one more segment; it needs
+        at least 3 points (ValueError otherwise). Open splines through fewer than 2
+        points are just those points.
+        For "clamped", the end tangents default to the first and last chords.
+        """
+        if end_condition not in C2Interpolation.END_CONDITIONS:
+            raise ValueError(f"unknown end condition: {end_condition}")
+
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim != 2:
+            raise ValueError("points should be an (n, dim) array")
+
+        if end_condition == "closed" and len(points) < 3:
+            raise ValueError("a closed spline needs at least 3 points")
+        if len(points) < 2:
+            return points.copy()
+
+        if end_condition == "closed":
+            tangents = C2Interpolation._closed_tangents(points)
+            points = np.concatenate([points, points[:1]])
+            tangents = np.concatenate([tangents, tangents[:1]])
+        else:
+            tangents = C2Interpolation._open_tangents(
+                points, end_condition, start_tangent, end_tangent
+            )
+
+        num_segments = len(points) - 1
+        control_points = np.empty((3 * num_segments + 1, points.shape[1]))
+        control_points[0::3] = points
+        control_points[1::3] = points[:-1] + tangents[:-1] / 3.0
+        control_points[2::3] = points[1:] - tangents[1:] / 3.0
+
+        return control_points
+
+    @staticmethod
+    def _open_tangents(
+        points: np.ndarray,
+        end_condition: str,
+        start_tangent: Optional[np.ndarray],
+        end_tangent: Optional[np.ndarray],
+    ) -> np.ndarray:
+        rhs = np.empty_like(points)
+        rhs[1:-1] = 3.0 * (points[2:] - points[:-2])
+
+        if end_condition == "natural":
+            rhs[0] = 3.0 * (points[1] - points[0])
+            rhs[-1] = 3.0 * (points[-1] - points[-2])
+            return C2Interpolation.solve(2.0, 1.0, 1.0, 2.0, rhs)
+
+        rhs[0] = points[1] - points[0] if start_tangent is None else start_tangent
+        rhs[-1] = points[-1] - points[-2] if end_tangent is None else end_tangent
+        return C2Interpolation.solve(1.0, 0.0, 0.0, 1.0, rhs)
+
+    @staticmethod
+    def _closed_tangents(points: np.ndarray) -> np.ndarray:
+        rhs = 3.0 * (np.roll(points, -1, axis=0) - np.roll(points, 1, axis=0))
+
+        # Sherman-Morrison: the cyclic matrix is a tridiagonal one plus u v^T,
+        # with u = (-4, 0, ..., 0, 1) and v = (1, 0, ..., 0, -1/4)
+        corner = -4.0
+        y = C2Interpolation.solve(4.0 - corner, 1.0, 1.0, 4.0 - 1.0 / corner, rhs)
+
+        u = np.zeros((len(points), 1))
+        u[0], u[-1] = corner, 1.0
+        z = C2Interpolation.solve(4.0 - corner, 1.0, 1.0, 4.0 - 1.0 / corner, u)
+
+        v_dot_y = y[0] + y[-1] / corner
+        v_dot_z = z[0] + z[-1] / corner
+
+        return y - np.outer(z[:, 0], v_dot_y / (1.0 + v_dot_z[0]))
+
+    @staticmethod
+    def solve(
+        first_diag: float,
+        first_upper: float,
+        last_lower: float,
+        last_diag: float,
+        rhs: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Solves the (m, m) tridiagonal system with rows
+            first_diag x_0 + first_upper x_1 = rhs_0
+            x_{i-1} + 4 x_i + x_{i+1} = rhs_i                 (0 < i < m - 1)
+            last_lower x_{m-2} + last_diag x_{m-1} = rhs_{m-1}
+        for every column of `rhs` (m, k) at once.
+        """
+        rhs = np.asarray(rhs, dtype=np.float64)
+        m = len(rhs)
+
+        if m == 1:
+            return rhs / first_diag
+
+        gamma = C2Interpolation._GAMMA
+
+        # Elimination factors c'_0 .. c'_{m-2}: exact until they reach their limit
+        factors = np.full(m - 1, gamma)
+        factors[0] = first_upper / first_diag
+        warmup = 1
+        while warmup < m - 1 and abs(factors[warmup - 1] - gamma) > 1e-15:
+            factors[warmup] = 1.0 / (4.0 - factors[warmup - 1])
+            warmup += 1
+
+        # Forward sweep: d'_i = c'_i (rhs_i - d'_{i-1})
+        forward = np.empty_like(rhs)
+        forward[0] = rhs[0] / first_diag
+        for i in range(1, warmup):
+            forward[i] = factors[i] * (rhs[i] - forward[i - 1])
+
+        if warmup < m - 1:
+            forward[warmup : m - 1] = C2Interpolation._linear_recurrence(
+                -gamma, gamma * rhs[warmup : m - 1], forward[warmup - 1]
+            )
+
+        forward[m - 1] = (rhs[m - 1] - last_lower * forward[m - 2]) / (
+            last_diag - last_lower * factors[m - 2]
+        )
+
+        # Back substitution: x_i = d'_i - c'_i x_{i+1}
+        solution = np.empty_like(rhs)
+        solution[m - 1] = forward[m - 1]
+
+        if warmup < m - 1:
+            solution[warmup : m - 1] = C2Interpolation._linear_recurrence(
+                -gamma, forward[warmup : m - 1][::-1], solution[m - 1]
+            )[::-1]
+
+        for i in range(min(warmup, m - 1) - 1, -1, -1):
+            solution[i] = forward[i] - factors[i] * solution[i + 1]
+
+        return solution
+
+    @staticmethod
+    def _linear_recurrence(
+        alpha: float, beta: np.ndarray, initial: np.ndarray
+    ) -> np.ndarray:
+        """
+        y_j = alpha * y_{j-1} + beta_j with y_{-1} = initial, for |alpha| < 1.
+        Unrolled, y_j = alpha^(j+1) initial + sum_k alpha^k beta_{j-k}; the sum is built by
+        recursive doubling (after pass p it covers 2^p terms) and stops once alpha^(2^p)
+        drops below double precision, i.e. after a handful of whole-array passes.
+        """
+        n = len(beta)
+        result = beta.copy()
+
+        shift, factor = 1, alpha
+        while shift < n and abs(factor) > 1e-18:
+            result[shift:] += factor * result[:-shift]
+            shift, factor = 2 * shift, factor * factor
+
+        # The initial value fades out just as fast (and alpha^j for large j would hit denormals)
+        head = min(n, int(math.log(1e-18) / math.log(abs(alpha))) + 1)
+        result[:head] += np.outer(alpha ** np.arange(1, head + 1), initial)
+        return result
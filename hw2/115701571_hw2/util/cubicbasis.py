@@ -0,0 +1,106 @@
+import numpy as np
+
+
+class CubicBasis:
+    """
+    CPU evaluation of piecewise cubic curves, matching the tessellation evaluation shaders.
+
+    A segment with control points P (4, dim) is p(t) = [1, t, t^2, t^3] M P, where M is the
+    basis matrix of the curve type (BEZIER as in bezier.tese.glsl, CATMULL_ROM as in
+    catmullrom.tese.glsl). coefficients() folds M into the segments once, so evaluating a
+    batch of samples is a single matrix product against the rows of powers of t, and
+    derivatives only change those rows.
+    """
+
+    BEZIER = np.array(
+        [
+            [1.0, 0.0, 0.0, 0.0],
+            [-3.0, 3.0, 0.0, 0.0],
+            [3.0, -6.0, 3.0, 0.0],
+            [-1.0, 3.0, -3.0, 1.0],
+        ]
+    )
+
+    CATMULL_ROM = 0.5 * np.array(
+        [
+            [0.0, 2.0, 0.0, 0.0],
+            [-1.0, 0.0, 1.0, 0.0],
+            [2.0, -5.0, 4.0, -1.0],
+            [-1.0, 3.0, -3.0, 1.0],
+        ]
+    )
+
+    # Points shared by consecutive segments of each curve type
+    STRIDES = {"bezier": 3, "catmullrom": 1}
+    MATRICES = {"bezier": BEZIER, "catmullrom": CATMULL_ROM}
+
+    @staticmethod
+    def segments(points, kind: str = "bezier") -> np.ndarray:
+        """
+        Control points (num_segments, 4, dim) of the curve through `points` (n, dim),
+        laid out the way PatchCurve draws it (segment i starts at point i * stride).
+        """
+        points = np.asarray(points, dtype=np.float64)
+        stride = CubicBasis.STRIDES[kind]
+
+        if len(points) < 4:
+            return np.empty((0, 4, points.shape[-1]))
+
+        windows = np.lib.stride_tricks.sliding_window_view(points, 4, axis=0)
+        return np.swapaxes(windows[::stride], 1, 2)
+
+    @staticmethod
+    def coefficients(segments, kind: str = "bezier") -> np.ndarray:
+        """Power-basis coefficients (num_segments, 4, dim): p(t) = sum_j t^j C[:, j]."""
+        return CubicBasis.MATRICES[kind] @ np.asarray(segments, dtype=np.float64)
+
+    @staticmethod
+    def powers(t, derivative: int = 0) -> np.ndarray:
+        """Rows (..., 4) of d^k/dt^k [1, t, t^2, t^3] for k = `derivative` (0, 1 or 2)."""
+        t = np.asarray(t, dtype=np.float64)
+        one, zero = np.ones_like(t), np.zeros_like(t)
+
+        if derivative == 0:
+            rows = (one, t, t * t, t * t * t)
+        elif derivative == 1:
+            rows = (zero, one, 2.0 * t, 3.0 * t * t)
+        elif derivative == 2:
+            rows = (zero, zero, 2.0 * one, 6.0 * t)
+        else:
+            raise ValueError(f"unsupported derivative order: {derivative}")
+
+        return np.stack(rows, axis=-1)
+
+    @staticmethod
+    def evaluate(coefficients: np.ndarray, t, derivative: int = 0) -> np.ndarray:
+        """Every segment at every parameter of `t` (k,): returns (num_segments, k, dim)."""
+        return CubicBasis.powers(t, derivative) @ coefficients
+
+    @staticmethod
+    def evaluate_at(
+        coefficients: np.ndarray, segment, t, derivative: int = 0
+    ) -> np.ndarray:
+        """Segment segment[i] at parameter t[i] for each sample: returns (m, dim)."""
+        rows = CubicBasis.powers(t, derivative)
+        return np.einsum("mj,mjd->md", rows, coefficients[np.asarray(segment)])
+
+    @staticmethod
+    def sample(points, kind: str = "bezier", samples_per_segment: int = 64):
+        """
+        Evenly spaced samples of a whole curve: (positions, first derivatives,
+        second derivatives), each (num_segments * samples_per_segment + 1, dim).
+        """
+        coefficients = CubicBasis.coefficients(CubicBasis.segments(points, kind), kind)
+        if len(coefficients) == 0:
+            empty = np.empty((0, np.shape(points)[-1]))
+            return empty, empty, empty
+
+        t = np.arange(samples_per_segment) / samples_per_segment
+        results = []
+        for derivative in range(3):
+            values = CubicBasis.evaluate(coefficients, t, derivative)
+            values = values.reshape(-1, values.shape[-1])
+            end = CubicBasis.evaluate(coefficients[-1:], [1.0], derivative)[0]
+            results.append(np.concatenate([values, end]))
+
+        return tuple(results)
@@ -0,0 +1,227 @@
+import numpy as np
+
+from .cubicbasis import CubicBasis
+
+
+class CurveFit:
+    """
+    Fits a piecewise cubic Bezier curve to sampled points (a freehand stroke), after
+    Schneider, "An Algorithm for Automatically Fitting Digitized Curves" (Graphics Gems).
+
+    A run of samples is fitted with one cubic whose end points are the first and last
+    samples and whose end tangents are fixed; the two tangent lengths are solved by least
+    squares at chord-length parameters. While the largest deviation is within a few times
+    the tolerance, the parameters are improved by Newton steps towards the closest points
+    on the curve and the cubic is solved again. Otherwise the run is split at the worst
+    sample, with a shared tangent there, and both halves are fitted the same way.
+    Consecutive segments are therefore G1 (tangent directions match), and every sample
+    lies within `tolerance` of its segment.
+
+    Each fit is a handful of whole-array operations over the samples of the run.
+    """
+
+    # Deviations below this many times the tolerance are worth reparameterizing
+    REPARAMETERIZE_FACTOR = 4.0
+
+    @staticmethod
+    def fit(samples, tolerance: float = 2.0, max_iterations: int = 4) -> np.ndarray:
+        """
+        Bezier control points (3k + 1, 2) of the fitted curve, laid out like C2Spline's
+        (segments share their end points). `tolerance` is in the units of `samples`.
+        """
+        points = np.asarray(samples, dtype=np.float64).reshape(-1, 2)
+        points = CurveFit._distinct(points)
+        if len(points) < 2:
+            return points.copy()
+
+        error = tolerance * tolerance
+        segments = []
+
+        # Runs still to fit, leftmost on top, so segments come out in order
+        pending = [
+            (
+                0,
+                len(points) - 1,
+                CurveFit._direction(points[1] - points[0]),
+                CurveFit._direction(points[-2] - points[-1]),
+            )
+        ]
+        while pending:
+            first, last, left_tangent, right_tangent = pending.pop()
+            run = points[first : last + 1]
+
+            bezier, split = CurveFit._fit_run(
+                run, left_tangent, right_tangent, error, max_iterations
+            )
+            if bezier is not None:
+                segments.append(bezier)
+                continue
+
+            split += first
+            center = CurveFit._direction(points[split - 1] - points[split + 1])
+            pending.append((split, last, -center, right_tangent))
+            pending.append((first, split, left_tangent, center))
+
+        control_points = [segments[0][0]]
+        for bezier in segments:
+            control_points.extend(bezier[1:])
+
+        return np.array(control_points)
+
+    @staticmethod
+    def max_deviation(samples, control_points, samples_per_segment: int = 256) -> float:
+        """Largest distance from a sample to the curve (against a dense polyline)."""
+        dense, _, _ = CubicBasis.sample(control_points, "bezier", samples_per_segment)
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1, 2)
+
+        # Point-to-segment distance to every piece of the polyline, in chunks of samples
+        start, direction = dense[:-1], np.diff(dense, axis=0)
+        length_squared = np.maximum((direction * direction).sum(axis=1), 1e-12)
+
+        deviation = 0.0
+        for chunk in np.array_split(samples, max(1, len(samples) // 64)):
+            offset = chunk[:, None, :] - start[None]
+            t = np.clip((offset * direction).sum(axis=2) / length_squared, 0.0, 1.0)
+            closest = offset - t[..., None] * direction
+            distance = np.sqrt((closest * closest).sum(axis=2)).min(axis=1)
+            deviation = max(deviation, float(distance.max(initial=0.0)))
+
+        return deviation
+
+    @staticmethod
+    def _fit_run(
+        run: np.ndarray,
+        left_tangent: np.ndarray,
+        right_tangent: np.ndarray,
+        error: float,
+        max_iterations: int,
+    ):
+        """(bezier, None) if the run fits within squared `error`, else (None, split)."""
+        if len(run) == 2:
+            # Two samples: a straight segment with the tangents a third of the way in
+            third = np.linalg.norm(run[1] - run[0]) / 3.0
+            bezier = np.array(
+                [
+                    run[0],
+                    run[0] + left_tangent * third,
+                    run[1] + right_tangent * third,
+                    run[1],
+                ]
+            )
+            return bezier, None
+
+        u = CurveFit._chord_lengths(run)
+        bezier = CurveFit._solve(run, u, left_tangent, right_tangent)
+        deviation, split = CurveFit._max_error(run, bezier, u)
+        if deviation < error:
+            return bezier, None
+
+        if deviation < CurveFit.REPARAMETERIZE_FACTOR * error:
+            for _ in range(max_iterations):
+                u = CurveFit._reparameterize(run, bezier, u)
+                bezier = CurveFit._solve(run, u, left_tangent, right_tangent)
+                deviation, split = CurveFit._max_error(run, bezier, u)
+                if deviation < error:
+                    return bezier, None
+
+        return None, split
+
+    @staticmethod
+    def _solve(
+        run: np.ndarray,
+        u: np.ndarray,
+        left_tangent: np.ndarray,
+        right_tangent: np.ndarray,
+    ) -> np.ndarray:
+        """Cubic with fixed ends and end tangent directions, lengths by least squares."""
+        start, end = run[0], run[-1]
+        basis = CurveFit._bernstein(u)
+
+        a1 = basis[:, 1, None] * left_tangent
+        a2 = basis[:, 2, None] * right_tangent
+        rest = run - np.outer(basis[:, 0] + basis[:, 1], start)
+        rest -= np.outer(basis[:, 2] + basis[:, 3], end)
+
+        c00 = (a1 * a1).sum()
+        c01 = (a1 * a2).sum()
+        c11 = (a2 * a2).sum()
+        x0 = (a1 * rest).sum()
+        x1 = (a2 * rest).sum()
+
+        determinant = c00 * c11 - c01 * c01
+        if abs(determinant) > 1e-12:
+            alpha_left = (x0 * c11 - x1 * c01) / determinant
+            alpha_right = (c00 * x1 - c01 * x0) / determinant
+        else:
+            alpha_left = alpha_right = 0.0
+
+        # Degenerate or backwards tangents: fall back to a third of the chord
+        chord = np.linalg.norm(end - start)
+        epsilon = 1e-6 * chord
+        if alpha_left < epsilon or alpha_right < epsilon:
+            alpha_left = alpha_right = chord / 3.0
+
+        return np.array(
+            [
+                start,
+                start + left_tangent * alpha_left,
+                end + right_tangent * alpha_right,
+                end,
+            ]
+        )
+
+    @staticmethod
+    def _reparameterize(
+        run: np.ndarray, bezier: np.ndarray, u: np.ndarray
+    ) -> np.ndarray:
+        """One Newton step per sample towards its closest point on the cubic."""
+        coefficients = CubicBasis.coefficients(bezier[None])
+        position = CubicBasis.evaluate(coefficients, u)[0]
+        first = CubicBasis.evaluate(coefficients, u, 1)[0]
+        second = CubicBasis.evaluate(coefficients, u, 2)[0]
+
+        offset = position - run
+        numerator = (offset * first).sum(axis=1)
+        denominator = (first * first).sum(axis=1) + (offset * second).sum(axis=1)
+
+        step = np.zeros_like(u)
+        np.divide(numerator, denominator, out=step, where=np.abs(denominator) > 1e-12)
+        return np.clip(u - step, 0.0, 1.0)
+
+    @staticmethod
+    def _max_error(run: np.ndarray, bezier: np.ndarray, u: np.ndarray):
+        """Largest squared distance of an interior sample to the cubic, and its index."""
+        offset = CurveFit._bernstein(u) @ bezier - run
+        distances = (offset * offset).sum(axis=1)
+
+        split = int(np.argmax(distances[1:-1])) + 1
+        return float(distances[split]), split
+
+    @staticmethod
+    def _bernstein(u: np.ndarray) -> np.ndarray:
+        """Cubic Bernstein polynomials (k, 4) at each parameter."""
+        v = 1.0 - u
+        return np.stack(
+            [v * v * v, 3.0 * u * v * v, 3.0 * u * u * v, u * u * u], axis=1
+        )
+
+    @staticmethod
+    def _chord_lengths(run: np.ndarray) -> np.ndarray:
+        lengths = np.concatenate(
+            [[0.0], np.cumsum(np.linalg.norm(np.diff(run, axis=0), axis=1))]
+        )
+        return lengths / lengths[-1]
+
+    @staticmethod
+    def _direction(vector: np.ndarray) -> np.ndarray:
+        length = np.linalg.norm(vector)
+        return vector / length if length > 0.0 else vector
+
+    @staticmethod
+    def _distinct(points: np.ndarray) -> np.ndarray:
+        """Drops samples equal to the one before them (the cursor did not move)."""
+        if len(points) < 2:
+            return points
+        moved = np.any(np.diff(points, axis=0) != 0.0, axis=1)
+        keep = np.concatenate([[True], moved])
+        return points[keep]
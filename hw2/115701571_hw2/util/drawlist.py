@@ -0,0 +1,212 @@
+import copy
+import ctypes
+
+from OpenGL.GL import *
+import glm
+
+from .shader import Shader
+
+
+class DrawCommand:
+    """One draw: `count` vertices (or indices, when `indexed`) from `first` of a VAO."""
+
+    __slots__ = (
+        "shader",
+        "vao",
+        "mode",
+        "first",
+        "count",
+        "indexed",
+        "patch_vertices",
+        "uniforms",
+        "attributes",
+    )
+
+    def __init__(
+        self,
+        shader: Shader,
+        vao: int,
+        mode: int,
+        first: int,
+        count: int,
+        indexed: bool,
+        patch_vertices: int,
+        uniforms: tuple,
+        attributes: tuple,
+    ):
+        self.shader = shader
+        self.vao = vao
+        self.mode = mode
+        self.first = first
+        self.count = count
+        self.indexed = indexed
+        self.patch_vertices = patch_vertices
+        self.uniforms = uniforms
+        self.attributes = attributes
+
+    def state(self) -> tuple:
+        return (
+            self.shader.program,
+            self.vao,
+            self.mode,
+            self.indexed,
+            self.patch_vertices,
+            self.uniforms,
+            self.attributes,
+        )
+
+
+class DrawList:
+    """
+    The draws of one frame, collected with add() and issued together by submit().
+
+    Commands are grouped by shader, then by VAO, each in order of first appearance, so
+    a frame whose shaders each draw one layer keeps its layering. Neighbouring commands
+    with the same state whose ranges touch are merged into one draw. While submitting,
+    a program, VAO, uniform, constant attribute or patch size is only set when it differs
+    from what the previous command left behind.
+
+    `stats` holds the counts of the last submitted frame.
+    """
+
+    # Modes whose primitives do not depend on their neighbours, so adjacent ranges can be
+    # drawn as one (joining two line strips would connect them)
+    MERGEABLE = {GL_POINTS, GL_LINES, GL_TRIANGLES, GL_PATCHES}
+
+    SETTERS = {
+        int: Shader.setInt,
+        float: Shader.setFloat,
+        glm.vec3: Shader.setVec3,
+        glm.vec4: Shader.setVec4,
+        glm.mat3: Shader.setMat3,
+    }
+
+    def __init__(self):
+        self.commands: list[DrawCommand] = []
+        self.stats = DrawList._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> dict[str, int]:
+        return {
+            "commands": 0,
+            "draw calls": 0,
+            "program changes": 0,
+            "vao changes": 0,
+            "uniform updates": 0,
+        }
+
+    def add(
+        self,
+        shader: Shader,
+        vao: int,
+        mode: int,
+        first: int,
+        count: int,
+        indexed: bool = False,
+        patch_vertices: int = 0,
+        uniforms: tuple = (),
+        attributes: tuple = (),
+    ) -> None:
+        """
+        Queues a draw. `uniforms` are (name, value) pairs set before it, `attributes`
+        (index, glm.vec3) constants for vertex attributes without an array.
+        """
+        if count <= 0:
+            return
+
+        self.commands.append(
+            DrawCommand(
+                shader,
+                vao,
+                mode,
+                first,
+                count,
+                indexed,
+                patch_vertices,
+                tuple((name, copy.copy(value)) for name, value in uniforms),
+                tuple(attributes),
+            )
+        )
+
+    def submit(self) -> None:
+        stats = DrawList._empty_stats()
+        stats["commands"] = len(self.commands)
+
+        # Uniforms and attribute constants set outside the list are unknown, so the
+        # first command of each program sets its own
+        program = vao = patch_vertices = None
+        uniforms: dict[tuple[int, str], object] = {}
+        attributes: dict[int, glm.vec3] = {}
+
+        for command in DrawList._merge(DrawList._sort(self.commands)):
+            if command.shader.program != program:
+                command.shader.use()
+                program = command.shader.program
+                stats["program changes"] += 1
+
+            if command.vao != vao:
+                glBindVertexArray(command.vao)
+                vao = command.vao
+                stats["vao changes"] += 1
+
+            for name, value in command.uniforms:
+                if (program, name) not in uniforms or uniforms[program, name] != value:
+                    DrawList.SETTERS[type(value)](command.shader, name, value)
+                    uniforms[program, name] = value
+                    stats["uniform updates"] += 1
+
+            for index, value in command.attributes:
+                if attributes.get(index) != value:
+                    glVertexAttrib3f(index, value.x, value.y, value.z)
+                    attributes[index] = value
+
+            if command.patch_vertices and command.patch_vertices != patch_vertices:
+                glPatchParameteri(GL_PATCH_VERTICES, command.patch_vertices)
+                patch_vertices = command.patch_vertices
+
+            if command.indexed:
+                glDrawElements(
+                    command.mode,
+                    command.count,
+                    GL_UNSIGNED_INT,
+                    ctypes.c_void_p(command.first * glm.sizeof(glm.uint32)),
+                )
+            else:
+                glDrawArrays(command.mode, command.first, command.count)
+            stats["draw calls"] += 1
+
+        if vao is not None:
+            glBindVertexArray(0)
+
+        self.commands.clear()
+        self.stats = stats
+
+    @staticmethod
+    def _sort(commands: list[DrawCommand]) -> list[DrawCommand]:
+        programs: dict[int, int] = {}
+        vaos: dict[int, int] = {}
+        for command in commands:
+            programs.setdefault(command.shader.program, len(programs))
+            vaos.setdefault(command.vao, len(vaos))
+
+        return sorted(
+            commands,
+            key=lambda command: (programs[command.shader.program], vaos[command.vao]),
+        )
+
+    @staticmethod
+    def _merge(commands: list[DrawCommand]) -> list[DrawCommand]:
+        merged: list[DrawCommand] = []
+        for command in commands:
+            last = merged[-1] if merged else None
+            if (
+                last is not None
+                and command.mode in DrawList.MERGEABLE
+                and last.first + last.count == command.first
+                and last.state() == command.state()
+            ):
+                last.count += command.count
+            else:
+                merged.append(copy.copy(command))
+
+        return merged
@@ -0,0 +1,239 @@
+from collections import deque
+import ctypes
+from typing import Optional
+
+from OpenGL.GL import *
+import numpy as np
+
+
+class IDBuffer:
+    """
+    Offscreen ID pass for GPU picking. What can be picked (control points, curve
+    segments) is drawn with shader/pick.frag.glsl into an R32UI texture the size of the
+    window, each pixel holding the ID of what covers it (0: nothing). An ID is the kind
+    in the top bits and the index + 1 below, see encode().
+
+    The pass only touches the square of RADIUS pixels around the cursor (a scissor
+    set by begin()), and request() reads back just that square, into a pixel buffer
+    object behind a fence, so nothing waits for the GPU; poll() collects the readbacks
+    that have finished, a frame or so later. Besides the vertices of what is drawn into
+    it, a pick costs a (2 * RADIUS + 1)^2 clear, raster and readback, whatever else is
+    on screen. The closest point wins over the closest segment, like on the CPU, but
+    distances are to the nearest pixel drawn rather than to the point itself.
+
+    Without integer framebuffers (or if the buffer cannot be made complete) `available`
+    is False, and callers pick on the CPU instead.
+    """
+
+    POINT = 1
+    SEGMENT = 2
+    KIND_SHIFT = 28
+
+    # Pick tolerance in pixels, as for the CPU lookups
+    RADIUS = 10
+
+    # Readbacks in flight
+    RING = 3
+
+    def __init__(self, width: int, height: int):
+        self.width, self.height = width, height
+        self.fbo = 0
+        self.texture = 0
+        self.available = False
+
+        # Framebuffer bound before begin(), restored by end(), and the square
+        # (left, bottom, width, height) the pass draws and reads back
+        self.target = 0
+        self.window = None
+        self.cursor = None
+
+        self.free: list[int] = []
+        self.pending = deque()
+
+        # Key of the last request, and (key, kind, index) of the newest readback
+        self.requested = None
+        self.picked = None
+
+        try:
+            self._create()
+        except GLError as error:
+            print(f"ID buffer unavailable, picking on the CPU: {error}")
+            self.release()
+
+    def _create(self) -> None:
+        if glGetIntegerv(GL_MAJOR_VERSION) < 3:
+            print("ID buffer unavailable (needs OpenGL 3), picking on the CPU")
+            return
+
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexImage2D(
+            GL_TEXTURE_2D,
+            0,
+            GL_R32UI,
+            self.width,
+            self.height,
+            0,
+            GL_RED_INTEGER,
+            GL_UNSIGNED_INT,
+            None,
+        )
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        self.fbo = glGenFramebuffers(1)
+        previous = glGetIntegerv(GL_DRAW_FRAMEBUFFER_BINDING)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glFramebufferTexture2D(
+            GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, self.texture, 0
+        )
+        status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
+        glBindFramebuffer(GL_FRAMEBUFFER, previous)
+
+        if status != GL_FRAMEBUFFER_COMPLETE:
+            print(f"ID buffer incomplete ({status:#x}), picking on the CPU")
+            self.release()
+            return
+
+        size = (2 * IDBuffer.RADIUS + 1) ** 2 * 4
+        buffers = np.atleast_1d(glGenBuffers(IDBuffer.RING))
+        self.free = [int(buffer) for buffer in buffers]
+        for buffer in self.free:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, buffer)
+            glBufferData(GL_PIXEL_PACK_BUFFER, size, None, GL_STREAM_READ)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+
+        self.available = True
+
+    @staticmethod
+    def encode(kind: int, index: int) -> int:
+        return (kind << IDBuffer.KIND_SHIFT) | (index + 1)
+
+    @staticmethod
+    def decode(value: int) -> tuple[int, int]:
+        """(kind, index) of an ID; (0, -1) for the background."""
+        index = value & ((1 << IDBuffer.KIND_SHIFT) - 1)
+        return value >> IDBuffer.KIND_SHIFT, index - 1
+
+    def begin(self, x: float, y: float) -> bool:
+        """
+        Binds the ID buffer as the draw target, limited to the square around pixel
+        (x, y) and cleared to 0. False (nothing bound) when the cursor is outside or no
+        readback buffer is free.
+        """
+        self.poll()
+        if not self.free:
+            return False
+
+        x, y = int(x), int(y)
+        left, bottom = max(x - IDBuffer.RADIUS, 0), max(y - IDBuffer.RADIUS, 0)
+        right = min(x + IDBuffer.RADIUS + 1, self.width)
+        top = min(y + IDBuffer.RADIUS + 1, self.height)
+        if left >= right or bottom >= top:
+            return False
+
+        self.window = (left, bottom, right - left, top - bottom)
+        self.cursor = (x - left, y - bottom)
+
+        self.target = glGetIntegerv(GL_DRAW_FRAMEBUFFER_BINDING)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glEnable(GL_SCISSOR_TEST)
+        glScissor(*self.window)
+        glClearBufferuiv(GL_COLOR, 0, np.zeros(4, dtype=np.uint32))
+        return True
+
+    def end(self) -> None:
+        glDisable(GL_SCISSOR_TEST)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.target)
+
+    def request(self, key) -> None:
+        """
+        Starts reading back the square drawn between begin() and end(). `key` says
+        what the pass showed (cursor, curve version); it comes back with the result,
+        see pick().
+        """
+        left, bottom, width, height = self.window
+
+        buffer = self.free.pop()
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.fbo)
+        glReadBuffer(GL_COLOR_ATTACHMENT0)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, buffer)
+        glReadPixels(
+            left,
+            bottom,
+            width,
+            height,
+            GL_RED_INTEGER,
+            GL_UNSIGNED_INT,
+            ctypes.c_void_p(0),
+        )
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.target)
+
+        fence = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        self.pending.append((buffer, fence, key, *self.cursor, width, height))
+        self.requested = key
+
+    def poll(self) -> bool:
+        """Collects every finished readback; True if there is a new result."""
+        updated = False
+        while self.pending:
+            buffer, fence, key, x, y, width, height = self.pending[0]
+            status = glClientWaitSync(fence, 0, 0)
+            if status not in (GL_ALREADY_SIGNALED, GL_CONDITION_SATISFIED):
+                break
+
+            glDeleteSync(fence)
+            self.pending.popleft()
+
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, buffer)
+            data = glGetBufferSubData(GL_PIXEL_PACK_BUFFER, 0, 4 * width * height)
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+            self.free.append(buffer)
+
+            ids = np.frombuffer(data, dtype=np.uint32).reshape(height, width)
+            self.picked = (key, *self._closest(ids, x, y))
+            updated = True
+
+        return updated
+
+    def pick(self, key) -> Optional[tuple[int, int]]:
+        """
+        (kind, index) under the cursor if the newest readback was for `key`, kind 0 when
+        nothing is there; None when there is no such readback (yet), so pick on the CPU.
+        """
+        self.poll()
+        if self.picked is None or self.picked[0] != key:
+            return None
+        return self.picked[1:]
+
+    def _closest(self, ids: np.ndarray, x: int, y: int) -> tuple[int, int]:
+        rows, columns = np.nonzero(ids)
+        distances = (columns - x) ** 2 + (rows - y) ** 2
+        values = ids[rows, columns]
+        kinds = values >> IDBuffer.KIND_SHIFT
+
+        near = distances <= IDBuffer.RADIUS**2
+        for kind in (IDBuffer.POINT, IDBuffer.SEGMENT):
+            candidates = np.flatnonzero(near & (kinds == kind))
+            if len(candidates):
+                closest = candidates[np.argmin(distances[candidates])]
+                return IDBuffer.decode(int(values[closest]))
+
+        return 0, -1
+
+    def release(self) -> None:
+        for _, fence, *_ in self.pending:
+            glDeleteSync(fence)
+        buffers = self.free + [buffer for buffer, *_ in self.pending]
+        if buffers:
+            glDeleteBuffers(len(buffers), buffers)
+        if self.fbo:
+            glDeleteFramebuffers(1, [self.fbo])
+        if self.texture:
+            glDeleteTextures(1, [self.texture])
+
+        self.free, self.pending = [], deque()
+        self.fbo = self.texture = 0
+        self.available = False
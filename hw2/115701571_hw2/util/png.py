@@ -0,0 +1,50 @@
+import os
+import struct
+import zlib
+
+import numpy as np
+
+
+class PNG:
+    """
+    Minimal PNG writer (8-bit RGBA, no filtering), so exporting images needs nothing
+    beyond the standard library and numpy.
+    """
+
+    SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+    @staticmethod
+    def write(filepath: str, pixels: np.ndarray, compression: int = 6) -> bool:
+        """Writes (height, width, 4) uint8 pixels, top row first."""
+        try:
+            height, width, _ = pixels.shape
+
+            # Every row starts with its filter type (0: none)
+            rows = np.zeros((height, 1 + 4 * width), dtype=np.uint8)
+            rows[:, 1:] = np.ascontiguousarray(pixels, dtype=np.uint8).reshape(height, -1)
+
+            header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+            data = zlib.compress(rows.tobytes(), compression)
+
+            directory = os.path.dirname(filepath)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            with open(filepath, "wb") as f:
+                f.write(PNG.SIGNATURE)
+                PNG._write_chunk(f, b"IHDR", header)
+                PNG._write_chunk(f, b"IDAT", data)
+                PNG._write_chunk(f, b"IEND", b"")
+
+            return True
+
+        except Exception as e:
+            print(f"Error writing PNG: {e}")
+            return False
+
+    @staticmethod
+    def _write_chunk(f, kind: bytes, data: bytes) -> None:
+        f.write(struct.pack(">I", len(data)))
+        f.write(kind)
+        f.write(data)
+        f.write(struct.pack(">I", zlib.crc32(kind + data)))
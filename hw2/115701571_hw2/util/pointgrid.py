@@ -0,0 +1,67 @@
+import math
+
+
+class PointGrid:
+    """
+    Uniform grid over 2D points for hit testing.
+
+    Points are identified by handles that stay valid while other points come and go;
+    adding, moving and removing a point only touches the one or two cells involved.
+    With a cell size close to the query radius, a query looks at a few cells only,
+    so its cost depends on the local point density rather than on the number of points.
+    """
+
+    def __init__(self, cell_size: float = 10.0):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], set[int]] = {}
+        self.positions: dict[int, tuple[float, float]] = {}
+        self.next_handle = 0
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def add(self, x: float, y: float) -> int:
+        handle = self.next_handle
+        self.next_handle += 1
+
+        self.positions[handle] = (x, y)
+        self.cells.setdefault(self._cell(x, y), set()).add(handle)
+        return handle
+
+    def move(self, handle: int, x: float, y: float) -> None:
+        old_cell = self._cell(*self.positions[handle])
+        new_cell = self._cell(x, y)
+        self.positions[handle] = (x, y)
+
+        if new_cell != old_cell:
+            self._discard(old_cell, handle)
+            self.cells.setdefault(new_cell, set()).add(handle)
+
+    def remove(self, handle: int) -> None:
+        self._discard(self._cell(*self.positions.pop(handle)), handle)
+
+    def _discard(self, cell: tuple[int, int], handle: int) -> None:
+        members = self.cells[cell]
+        members.discard(handle)
+        if not members:
+            del self.cells[cell]
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.positions.clear()
+
+    def query(self, x: float, y: float, radius: float) -> list[tuple[float, int]]:
+        """(distance, handle) of every point closer than `radius` to (x, y)."""
+        min_cell = self._cell(x - radius, y - radius)
+        max_cell = self._cell(x + radius, y + radius)
+
+        found = []
+        for cx in range(min_cell[0], max_cell[0] + 1):
+            for cy in range(min_cell[1], max_cell[1] + 1):
+                for handle in self.cells.get((cx, cy), ()):
+                    px, py = self.positions[handle]
+                    distance = math.hypot(px - x, py - y)
+                    if distance < radius:
+                        found.append((distance, handle))
+
+        return found
@@ -0,0 +1,247 @@
+import copy
+from typing import Optional
+
+import glm
+import numpy as np
+
+from .pointgrid import PointGrid
+
+
+class PointChanges:
+    """
+    Range of points of a PointStore written since the last take(), kept for one consumer.
+    A new tracker covers every point, so the consumer's first take() sends everything.
+    """
+
+    def __init__(self, store: "PointStore"):
+        self.store = store
+        self.first = 0
+        self.last = len(store)
+
+    def add(self, first: int, last: int) -> None:
+        if self.first >= self.last:
+            self.first, self.last = first, last
+        else:
+            self.first = min(self.first, first)
+            self.last = max(self.last, last)
+
+    def take(self) -> tuple[int, int]:
+        """[first, last) changed since the last call (clamped to the current length)."""
+        first, last = self.first, min(self.last, len(self.store))
+        self.first = self.last = 0
+        return first, max(first, last)
+
+    def close(self) -> None:
+        if self in self.store.changes:
+            self.store.changes.remove(self)
+
+
+class PointStore:
+    """
+    Control points in one growable (n, 2) float32 array, shared by reference between the
+    app, the curve that edits them and the shapes that draw them.
+
+    Writes go through the list-like methods (item assignment, append, extend, insert, pop,
+    clear, assign), which keep a PointGrid in sync for pick() and report the range of
+    points they touched to every tracker from track(); consumers upload just that range
+    instead of copying the whole list. Inserting or removing a point changes everything
+    after it. Reads hand out glm.vec2 values (or a read-only view()), so nobody can change
+    a point behind the trackers' backs.
+
+    Every write also goes to `log` when one is attached (see UndoLog), as a point move or
+    the insertion or removal of a block of points.
+
+    Copies (copy.copy, copy.deepcopy, slicing, +) are plain lists of glm.vec2.
+    """
+
+    def __init__(self, points=(), cell_size: float = 10.0):
+        self.data = np.empty((0, 2), dtype=np.float32)
+        self.count = 0
+        self.grid = PointGrid(cell_size)
+        self.handles: list[int] = []
+        self._index_of: Optional[dict[int, int]] = {}
+        self.changes: list[PointChanges] = []
+        self.log = None
+        self.extend(points)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self):
+        for x, y in self.view().tolist():
+            yield glm.vec2(x, y)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [glm.vec2(x, y) for x, y in self.view()[index].tolist()]
+        return glm.vec2(*self.data[self._index(index)].tolist())
+
+    def __setitem__(self, index, point) -> None:
+        if isinstance(index, slice):
+            points = list(self)
+            points[index] = point
+            self.assign(points)
+            return
+
+        index = self._index(index)
+        if self.log is not None:
+            self.log.record_move(index, self.data[index], (point.x, point.y))
+
+        self.data[index] = (point.x, point.y)
+        self.grid.move(self.handles[index], point.x, point.y)
+        self._changed(index, index + 1)
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            points = list(self)
+            del points[index]
+            self.assign(points)
+            return
+
+        self.pop(index)
+
+    def __iadd__(self, points):
+        self.extend(points)
+        return self
+
+    def __add__(self, points) -> list:
+        return list(self) + list(points)
+
+    def __eq__(self, points) -> bool:
+        if not isinstance(points, (PointStore, list, tuple)):
+            return NotImplemented
+        return list(self) == list(points)
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo) -> list:
+        return list(self)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return np.array(self.view(), dtype=dtype)
+
+    def view(self) -> np.ndarray:
+        """Read-only (n, 2) view of the points; valid until the next insertion or removal."""
+        view = self.data[: self.count]
+        view.flags.writeable = False
+        return view
+
+    def track(self) -> PointChanges:
+        changes = PointChanges(self)
+        self.changes.append(changes)
+        return changes
+
+    def _changed(self, first: int, last: int) -> None:
+        for changes in self.changes:
+            changes.add(first, last)
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("point index out of range")
+        return index
+
+    def _reserve(self, count: int) -> None:
+        if count > len(self.data):
+            # Grow geometrically so appending points does not reallocate every time
+            data = np.empty((max(count, 2 * len(self.data), 16), 2), dtype=np.float32)
+            data[: self.count] = self.data[: self.count]
+            self.data = data
+
+    def append(self, point) -> None:
+        self.insert(self.count, point)
+
+    def extend(self, points) -> None:
+        self.insert_points(self.count, points)
+
+    def insert(self, index: int, point) -> None:
+        # Same position resolution as list.insert (clamped, negative from the end)
+        index = min(index + self.count if index < 0 else index, self.count)
+        self.insert_points(max(index, 0), [point])
+
+    def pop(self, index: int = -1) -> glm.vec2:
+        index = self._index(index)
+        point = self[index]
+        self.delete_points(index, index + 1)
+        return point
+
+    def clear(self) -> None:
+        self.delete_points(0, self.count)
+
+    def insert_points(self, index: int, points) -> None:
+        """Inserts a block of points (vectors or an (n, 2) array) before `index`."""
+        if isinstance(points, np.ndarray):
+            points = points.astype(np.float32).reshape(-1, 2)
+        else:
+            points = np.asarray(
+                [(point[0], point[1]) for point in points], dtype=np.float32
+            ).reshape(-1, 2)
+        if len(points) == 0:
+            return
+
+        if self.log is not None:
+            self.log.record_insert(index, points)
+
+        count = len(points)
+        self._reserve(self.count + count)
+        self.data[index + count : self.count + count] = self.data[index : self.count]
+        self.data[index : index + count] = points
+        self.count += count
+
+        self.handles[index:index] = [self.grid.add(x, y) for x, y in points.tolist()]
+        if index < self.count - count:
+            self._index_of = None
+        elif self._index_of is not None:
+            self._index_of.update(
+                zip(self.handles[index:], range(index, self.count))
+            )
+
+        self._changed(index, self.count)
+
+    def delete_points(self, first: int, last: int) -> np.ndarray:
+        """Removes points [first, last) and returns them."""
+        if first >= last:
+            return np.empty((0, 2), dtype=np.float32)
+
+        removed = self.data[first:last].copy()
+        if self.log is not None:
+            self.log.record_delete(first, removed)
+
+        self.data[first : self.count - (last - first)] = self.data[last : self.count]
+        self.count -= last - first
+
+        if first == 0 and self.count == 0:
+            self.grid.clear()
+            self.handles.clear()
+            self._index_of = {}
+        else:
+            for handle in self.handles[first:last]:
+                self.grid.remove(handle)
+                if self._index_of is not None:
+                    self._index_of.pop(handle)
+            del self.handles[first:last]
+            if first < self.count:
+                self._index_of = None
+
+        self._changed(first, self.count)
+        return removed
+
+    def assign(self, points) -> None:
+        """Replaces every point (the store and its trackers stay the same objects)."""
+        self.clear()
+        self.extend(points)
+
+    def pick(self, position, radius: float) -> int:
+        """Index of the closest point within `radius` of `position` (lowest on ties), or -1."""
+        candidates = self.grid.query(position.x, position.y, radius)
+        if not candidates:
+            return -1
+
+        if self._index_of is None:
+            self._index_of = dict(zip(self.handles, range(len(self.handles))))
+
+        return min(
+            (distance, self._index_of[handle]) for distance, handle in candidates
+        )[1]
@@ -0,0 +1,57 @@
+from collections import deque
+
+from OpenGL.GL import *
+
+
+class PrimitiveCounter:
+    """
+    Counts the primitives the pipeline generates (after tessellation) between begin()
+    and end() with a GL_PRIMITIVES_GENERATED query. For isoline patches that is the
+    number of line segments the tessellator produced.
+
+    Results are read back a frame or two late from a small ring of queries, so reading
+    them never stalls the pipeline; frames that find every query still in flight
+    are not counted.
+    """
+
+    RING = 3
+
+    def __init__(self):
+        self.free = list(glGenQueries(PrimitiveCounter.RING))
+        self.pending = deque()
+        self.active = None
+        self.last_count = 0
+
+    def begin(self) -> None:
+        self.poll()
+        if not self.free:
+            return
+
+        self.active = self.free.pop()
+        glBeginQuery(GL_PRIMITIVES_GENERATED, self.active)
+
+    def end(self) -> None:
+        if self.active is None:
+            return
+
+        glEndQuery(GL_PRIMITIVES_GENERATED)
+        self.pending.append(self.active)
+        self.active = None
+
+    def poll(self) -> int:
+        """Collects every finished query; returns the count of the most recent one."""
+        while self.pending:
+            query = self.pending[0]
+            if not glGetQueryObjectuiv(query, GL_QUERY_RESULT_AVAILABLE):
+                break
+
+            self.last_count = int(glGetQueryObjectuiv(query, GL_QUERY_RESULT))
+            self.free.append(self.pending.popleft())
+
+        return self.last_count
+
+    def release(self) -> None:
+        queries = self.free + list(self.pending)
+        if queries:
+            glDeleteQueries(len(queries), queries)
+        self.free, self.pending = [], deque()
@@ -0,0 +1,110 @@
+from OpenGL.GL import *
+
+
+class GLResourcePool:
+    """
+    Process-wide free lists of vertex array and buffer objects.
+    Shapes acquire their VAO/VBO here instead of calling glGen*() directly and hand them back
+    through release(), so short-lived shapes (preview segments, rebuilt meshes) recycle names
+    instead of generating and deleting them every frame.
+
+    Also keeps live counters (objects handed out, bytes uploaded through bufferData())
+    that make leaks and allocation churn visible; see report().
+    """
+
+    # Free objects kept around per kind; anything beyond is deleted.
+    kMaxFree: int = 64
+
+    # Attribute slots reset when a vertex array is returned (covers every layout in this app).
+    kMaxAttributes: int = 8
+
+    freeVertexArrays: list[int] = []
+    freeBuffers: list[int] = []
+
+    # Bytes currently stored in each live buffer, as uploaded through bufferData().
+    bufferBytes: dict[int, int] = {}
+
+    liveVertexArrays: int = 0
+    liveBuffers: int = 0
+    generated: int = 0
+    recycled: int = 0
+
+    @staticmethod
+    def acquireVertexArray() -> int:
+        GLResourcePool.liveVertexArrays += 1
+
+        if GLResourcePool.freeVertexArrays:
+            GLResourcePool.recycled += 1
+            return GLResourcePool.freeVertexArrays.pop()
+
+        GLResourcePool.generated += 1
+        return glGenVertexArrays(1)
+
+    @staticmethod
+    def acquireBuffer() -> int:
+        GLResourcePool.liveBuffers += 1
+
+        if GLResourcePool.freeBuffers:
+            GLResourcePool.recycled += 1
+            buffer: int = GLResourcePool.freeBuffers.pop()
+        else:
+            GLResourcePool.generated += 1
+            buffer = glGenBuffers(1)
+
+        GLResourcePool.bufferBytes[buffer] = 0
+        return buffer
+
+    @staticmethod
+    def releaseVertexArray(vao: int) -> None:
+        GLResourcePool.liveVertexArrays -= 1
+
+        if len(GLResourcePool.freeVertexArrays) >= GLResourcePool.kMaxFree:
+            glDeleteVertexArrays(1, (vao,))
+            return
+
+        # The next owner expects a pristine vertex array: no enabled attributes,
+        # no instancing divisors and no element buffer.
+        glBindVertexArray(vao)
+
+        for index in range(GLResourcePool.kMaxAttributes):
+            glDisableVertexAttribArray(index)
+            glVertexAttribDivisor(index, 0)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindVertexArray(0)
+
+        GLResourcePool.freeVertexArrays.append(vao)
+
+    @staticmethod
+    def releaseBuffer(buffer: int) -> None:
+        GLResourcePool.liveBuffers -= 1
+        GLResourcePool.bufferBytes.pop(buffer, None)
+
+        if len(GLResourcePool.freeBuffers) >= GLResourcePool.kMaxFree:
+            glDeleteBuffers(1, (buffer,))
+            return
+
+        # Drop the storage; only the name is recycled.
+        glBindBuffer(GL_ARRAY_BUFFER, buffer)
+        glBufferData(GL_ARRAY_BUFFER, 0, None, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        GLResourcePool.freeBuffers.append(buffer)
+
+    @staticmethod
+    def bufferData(buffer: int, target: int, size: int, data, usage: int) -> None:
+        """glBufferData() on `buffer`, which must currently be bound to `target`, with byte accounting."""
+        glBufferData(target, size, data, usage)
+        GLResourcePool.bufferBytes[buffer] = size
+
+    @staticmethod
+    def liveBytes() -> int:
+        return sum(GLResourcePool.bufferBytes.values())
+
+    @staticmethod
+    def report() -> str:
+        return (
+            f'gl resources: {GLResourcePool.liveVertexArrays} vertex arrays, '
+            f'{GLResourcePool.liveBuffers} buffers, {GLResourcePool.liveBytes()} bytes live; '
+            f'{GLResourcePool.generated} generated, {GLResourcePool.recycled} recycled'
+        )
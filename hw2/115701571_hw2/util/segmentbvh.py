@@ -0,0 +1,180 @@
+import heapq
+import math
+from typing import Optional
+
+import numpy as np
+
+from .cubicbasis import CubicBasis
+
+
+class SegmentBVH:
+    """
+    Bounding-volume hierarchy over the segments of a piecewise cubic curve, for
+    closest-point queries (what is under the cursor, where a click lands on the curve).
+
+    Leaves are the segments in curve order, each bounded by the box of its Bezier
+    control hull, which contains the segment (Catmull-Rom segments are converted to
+    their Bezier control points first). Internal nodes form a complete binary tree over
+    the leaves, stored as arrays: node i has children 2i and 2i + 1, leaf s is node
+    size + s. update() refits only the leaves whose control points changed and their
+    ancestors; a change in the number of segments rebuilds the tree, one level at a time.
+
+    closest() visits nodes nearest box first and stops once no box is nearer than the
+    best point found, so on a curve that does not pile up on itself a query touches
+    O(log n) nodes. Inside a segment the parameter is bracketed by sampling and refined
+    with Newton's method on (B(t) - p) . B'(t) = 0, from every sample at once.
+    """
+
+    # Parameter samples per segment before the Newton steps
+    SAMPLES = 8
+    NEWTON_STEPS = 4
+
+    def __init__(self, kind: str = "bezier"):
+        self.kind = kind
+
+        # Maps the control points of a segment of `kind` to its Bezier control points
+        self.to_bezier = np.linalg.solve(CubicBasis.BEZIER, CubicBasis.MATRICES[kind])
+
+        self.hulls = np.empty((0, 4, 2))
+        self.coefficients = np.empty((0, 4, 2))
+        self.size = 1
+        self.lower = np.full((2, 2), np.inf)
+        self.upper = np.full((2, 2), -np.inf)
+
+        # Boxes recomputed by the last update() and nodes visited by the last query
+        self.refitted = 0
+        self.visited = 0
+
+    def __len__(self) -> int:
+        return len(self.hulls)
+
+    def update(self, points) -> None:
+        """Makes the tree describe the curve through `points` (n, 2)."""
+        segments = CubicBasis.segments(points, self.kind)
+        if self.kind == "bezier":
+            # A copy: the segments are a view of the caller's points
+            hulls = np.array(segments)
+        else:
+            hulls = self.to_bezier @ segments
+
+        if len(hulls) != len(self.hulls):
+            self._build(hulls)
+            self.coefficients = CubicBasis.coefficients(segments, self.kind)
+        else:
+            changed = np.flatnonzero(np.any(hulls != self.hulls, axis=(1, 2)))
+            self._refit(hulls, changed)
+            self.coefficients[changed] = CubicBasis.coefficients(
+                segments[changed], self.kind
+            )
+
+        self.hulls = hulls
+
+    def _build(self, hulls: np.ndarray) -> None:
+        count = len(hulls)
+        self.size = 1 << max(count - 1, 0).bit_length()
+        self.lower = np.full((2 * self.size, 2), np.inf)
+        self.upper = np.full((2 * self.size, 2), -np.inf)
+
+        self.lower[self.size : self.size + count] = hulls.min(axis=1)
+        self.upper[self.size : self.size + count] = hulls.max(axis=1)
+
+        level = self.size
+        while level > 1:
+            self._merge_children(np.arange(level // 2, level))
+            level //= 2
+
+        self.refitted = 2 * self.size - 1
+
+    def _refit(self, hulls: np.ndarray, changed: np.ndarray) -> None:
+        nodes = changed + self.size
+        self.lower[nodes] = hulls[changed].min(axis=1)
+        self.upper[nodes] = hulls[changed].max(axis=1)
+        self.refitted = len(nodes)
+
+        nodes = np.unique(nodes // 2)
+        while len(nodes) and nodes[-1] >= 1:
+            self._merge_children(nodes)
+            self.refitted += len(nodes)
+            nodes = np.unique(nodes[nodes > 1] // 2)
+
+    def _merge_children(self, nodes: np.ndarray) -> None:
+        self.lower[nodes] = np.minimum(self.lower[2 * nodes], self.lower[2 * nodes + 1])
+        self.upper[nodes] = np.maximum(self.upper[2 * nodes], self.upper[2 * nodes + 1])
+
+    def bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        """(lower, upper) corners of a box around the whole curve (inf, -inf if empty)."""
+        return self.lower[1].copy(), self.upper[1].copy()
+
+    def closest(
+        self, position, max_distance: float = math.inf
+    ) -> Optional[tuple[int, float, float]]:
+        """
+        (segment, t, distance) of the curve point closest to `position`, or None when
+        the curve is empty or no point is within `max_distance`.
+        """
+        self.visited = 0
+        if len(self.hulls) == 0:
+            return None
+
+        point = np.array([position[0], position[1]], dtype=np.float64)
+        best = None
+        best_distance = max_distance
+
+        heap = [(self._box_distance(1, point), 1)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance >= best_distance:
+                break
+            self.visited += 1
+
+            if node >= self.size:
+                segment = node - self.size
+                t, distance = self._closest_on_segment(segment, point)
+                if distance < best_distance:
+                    best, best_distance = (segment, t, distance), distance
+                continue
+
+            for child in (2 * node, 2 * node + 1):
+                distance = self._box_distance(child, point)
+                if distance < best_distance:
+                    heapq.heappush(heap, (distance, child))
+
+        return best
+
+    def _box_distance(self, node: int, point: np.ndarray) -> float:
+        """Distance from `point` to the box of `node` (inf for an empty node)."""
+        lower, upper = self.lower[node], self.upper[node]
+        if lower[0] > upper[0]:
+            return math.inf
+
+        dx = max(lower[0] - point[0], 0.0, point[0] - upper[0])
+        dy = max(lower[1] - point[1], 0.0, point[1] - upper[1])
+        return math.hypot(dx, dy)
+
+    def _closest_on_segment(
+        self, segment: int, point: np.ndarray
+    ) -> tuple[float, float]:
+        coefficients = self.coefficients[segment]
+        t = np.linspace(0.0, 1.0, SegmentBVH.SAMPLES + 1)
+        samples = t.copy()
+
+        for _ in range(SegmentBVH.NEWTON_STEPS):
+            offset = CubicBasis.powers(t) @ coefficients - point
+            first = CubicBasis.powers(t, 1) @ coefficients
+            second = CubicBasis.powers(t, 2) @ coefficients
+
+            numerator = (offset * first).sum(axis=1)
+            denominator = (first * first).sum(axis=1) + (offset * second).sum(axis=1)
+
+            # Only steps towards a minimum; the rest stay where they are
+            step = np.zeros_like(t)
+            np.divide(numerator, denominator, out=step, where=denominator > 1e-12)
+            t = np.clip(t - step, 0.0, 1.0)
+
+        # Newton can wander off; the samples themselves stay candidates
+        t = np.concatenate([t, samples])
+        offset = CubicBasis.powers(t) @ coefficients - point
+        distances = np.hypot(offset[:, 0], offset[:, 1])
+
+        best = int(np.argmin(distances))
+        return float(t[best]), float(distances[best])
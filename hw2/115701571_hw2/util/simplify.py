@@ -0,0 +1,200 @@
+import heapq
+import math
+
+import numpy as np
+
+
+class PolylineSimplify:
+    """
+    Polyline simplification as a per-vertex importance: the largest tolerance, in the
+    units of the points, at which the vertex is still kept. Simplifying at any tolerance
+    is then the vertices whose importance is above it, so the ranking is computed once
+    and every level of detail after that is a comparison. End points are always kept.
+
+    douglas-peucker: Ramer-Douglas-Peucker. A range is split at the vertex farthest from
+    the segment between its ends, and that distance, capped by the importance of the
+    vertex that split the enclosing range, is the vertex's importance; this gives
+    exactly the vertices the recursive algorithm keeps at every tolerance. All ranges at
+    the same depth are split in one pass over their vertices.
+
+    visvalingam: Visvalingam-Whyatt. The vertex whose triangle with its neighbours has
+    the smallest area is removed first, and the areas of its neighbours are updated; a
+    vertex's area is never less than that of a vertex removed before it. Importance is
+    the square root of that area, so a vertex is kept while its triangle is larger than
+    tolerance^2.
+    """
+
+    METHODS = ("douglas-peucker", "visvalingam")
+
+    @staticmethod
+    def importance(points, method: str = "douglas-peucker") -> np.ndarray:
+        if method == "douglas-peucker":
+            return PolylineSimplify.douglas_peucker_importance(points)
+        if method == "visvalingam":
+            return PolylineSimplify.visvalingam_importance(points)
+        raise ValueError(f"unknown simplification method: {method}")
+
+    @staticmethod
+    def simplify(
+        points, tolerance: float, method: str = "douglas-peucker"
+    ) -> np.ndarray:
+        """Indices of the vertices kept at `tolerance`."""
+        importance = PolylineSimplify.importance(points, method)
+        return np.flatnonzero(importance > tolerance)
+
+    @staticmethod
+    def douglas_peucker_importance(points) -> np.ndarray:
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        importance = np.zeros(len(points))
+        importance[[0, -1]] = np.inf
+        if len(points) < 3:
+            return importance
+
+        # Ranges [start, end] still to split, and the importance of the vertex that
+        # made them
+        starts = np.array([0])
+        ends = np.array([len(points) - 1])
+        bounds = np.array([np.inf])
+
+        while len(starts):
+            interior = ends - starts - 1
+            active = interior > 0
+            starts, ends, bounds, interior = (
+                starts[active],
+                ends[active],
+                bounds[active],
+                interior[active],
+            )
+            if not len(starts):
+                break
+
+            # Interior vertices of every range, back to back
+            offsets = np.concatenate([[0], np.cumsum(interior)[:-1]])
+            ranges = np.repeat(np.arange(len(starts)), interior)
+            indices = np.arange(len(ranges)) - offsets[ranges] + starts[ranges] + 1
+
+            distances = PolylineSimplify._segment_distances(
+                points[indices], points[starts[ranges]], points[ends[ranges]]
+            )
+
+            # First vertex at the largest distance of each range
+            largest = np.maximum.reduceat(distances, offsets)
+            candidates = np.flatnonzero(distances == largest[ranges])
+            _, first = np.unique(ranges[candidates], return_index=True)
+            splits = indices[candidates[first]]
+
+            values = np.minimum(largest, bounds)
+            importance[splits] = values
+
+            starts, ends, bounds = (
+                np.concatenate([starts, splits]),
+                np.concatenate([splits, ends]),
+                np.concatenate([values, values]),
+            )
+
+        return importance
+
+    @staticmethod
+    def visvalingam_importance(points) -> np.ndarray:
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        count = len(points)
+        importance = np.zeros(count)
+        importance[[0, -1]] = np.inf
+        if count < 3:
+            return importance
+
+        areas = np.full(count, np.inf)
+        areas[1:-1] = PolylineSimplify._triangle_areas(
+            points[:-2], points[1:-1], points[2:]
+        )
+        previous = list(range(-1, count - 1))
+        following = list(range(1, count + 1))
+        xs, ys = points[:, 0].tolist(), points[:, 1].tolist()
+        current = areas.tolist()
+
+        heap = [(area, index) for index, area in enumerate(current[1:-1], 1)]
+        heapq.heapify(heap)
+        removed = 0.0
+
+        while heap:
+            area, index = heapq.heappop(heap)
+            if area != current[index]:
+                # Stale entry: the vertex's area changed after it was queued
+                continue
+
+            removed = max(removed, area)
+            importance[index] = math.sqrt(removed)
+            current[index] = -1.0
+
+            before, after = previous[index], following[index]
+            following[before] = after
+            previous[after] = before
+
+            for neighbour in (before, after):
+                if 0 < neighbour < count - 1:
+                    a, b = previous[neighbour], following[neighbour]
+                    current[neighbour] = 0.5 * abs(
+                        (xs[neighbour] - xs[a]) * (ys[b] - ys[a])
+                        - (xs[b] - xs[a]) * (ys[neighbour] - ys[a])
+                    )
+                    heapq.heappush(heap, (current[neighbour], neighbour))
+
+        return importance
+
+    @staticmethod
+    def _segment_distances(points, starts, ends) -> np.ndarray:
+        """Distance of each point to the segment from the matching start to end."""
+        direction = ends - starts
+        offset = points - starts
+        length_squared = (direction * direction).sum(axis=1)
+
+        t = np.zeros(len(points))
+        projection = (offset * direction).sum(axis=1)
+        np.divide(projection, length_squared, out=t, where=length_squared > 0)
+        closest = offset - np.clip(t, 0.0, 1.0)[:, None] * direction
+        return np.sqrt((closest * closest).sum(axis=1))
+
+    @staticmethod
+    def _triangle_areas(a, b, c) -> np.ndarray:
+        return 0.5 * np.abs(
+            (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1])
+            - (c[:, 0] - a[:, 0]) * (b[:, 1] - a[:, 1])
+        )
+
+
+class PolylineLOD:
+    """
+    Levels of detail of one polyline. update() ranks the vertices (see
+    PolylineSimplify); indices() returns the vertices kept at a tolerance, rounded down
+    to a power of two times BASE_TOLERANCE, so nearby tolerances share one cached level.
+    """
+
+    BASE_TOLERANCE = 0.25
+
+    def __init__(self, method: str = "douglas-peucker"):
+        if method not in PolylineSimplify.METHODS:
+            raise ValueError(f"unknown simplification method: {method}")
+
+        self.method = method
+        self.importance = np.zeros(0)
+        self.levels: dict[int, np.ndarray] = {}
+
+    def update(self, points) -> None:
+        self.importance = PolylineSimplify.importance(points, self.method)
+        self.levels.clear()
+
+    def level(self, tolerance: float) -> int:
+        """Largest k with BASE_TOLERANCE * 2^k <= tolerance (-1 below the base)."""
+        if tolerance < PolylineLOD.BASE_TOLERANCE:
+            return -1
+        return int(math.floor(math.log2(tolerance / PolylineLOD.BASE_TOLERANCE)))
+
+    def indices(self, tolerance: float) -> np.ndarray:
+        """uint32 indices of the vertices kept at `tolerance`."""
+        level = self.level(tolerance)
+        if level not in self.levels:
+            threshold = PolylineLOD.BASE_TOLERANCE * 2.0**level if level >= 0 else 0.0
+            self.levels[level] = np.flatnonzero(self.importance > threshold).astype(
+                np.uint32
+            )
+        return self.levels[level]
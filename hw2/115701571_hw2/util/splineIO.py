@@ -1,14 +1,46 @@
 import glm
-from typing import Tuple, List, Optional
+from typing import Iterator, Tuple, List, Optional
 import os
+import struct
+
+import numpy as np
 
 
 class SplineIO:
+    """
+    Spline files come in two formats, told apart by their first bytes:
+
+    Text (the original format): a "dim continuity count" header line, then one
+    "x y" line per point.
+
+    Binary (version 1): a 32-byte little-endian header
+        magic "SPLN", version u16, bytes per coordinate u8 (4 or 8),
+        dim u8, continuity u8 (1 or 2), 3 padding bytes, count u64, 8 padding bytes
+    followed by the count x dim coordinates as one contiguous float32 or float64 array,
+    so load_points() can memory-map it and the array can go straight into a VBO.
+    """
+
+    MAGIC = b"SPLN"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHBBBxxxQ8x")
+    DTYPES = {4: np.dtype("<f4"), 8: np.dtype("<f8")}
+
+    # Points parsed per block by the streaming text reader
+    TEXT_CHUNK = 1 << 16
+
     @staticmethod
-    def save_spline(filepath: str, control_points: List[glm.vec2], is_c2: bool) -> bool:
+    def save_spline(
+        filepath: str,
+        control_points: List[glm.vec2],
+        is_c2: bool,
+        binary: bool = False,
+    ) -> bool:
         """
         Save spline control points to a configuration file.
         """
+        if binary:
+            return SplineIO.save_spline_binary(filepath, control_points, is_c2)
+
         try:
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
@@ -27,32 +59,163 @@ class SplineIO:
             print(f"Error saving spline: {e}")
             return False
 
+    @staticmethod
+    def save_spline_binary(filepath: str, control_points, is_c2: bool) -> bool:
+        """
+        Save control points (glm vectors or an (n, dim) array) in the binary format.
+        Arrays keep float32 or float64 precision; glm vectors are float32 already.
+        """
+        try:
+            points = SplineIO.points_array(control_points)
+            dtype = SplineIO.DTYPES[points.dtype.itemsize]
+
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+            with open(filepath, "wb") as f:
+                f.write(
+                    SplineIO.HEADER.pack(
+                        SplineIO.MAGIC,
+                        SplineIO.VERSION,
+                        dtype.itemsize,
+                        points.shape[1],
+                        2 if is_c2 else 1,
+                        len(points),
+                    )
+                )
+                f.write(np.ascontiguousarray(points, dtype=dtype).tobytes())
+
+            return True
+
+        except Exception as e:
+            print(f"Error saving spline: {e}")
+            return False
+
+    @staticmethod
+    def points_array(control_points) -> np.ndarray:
+        """(n, dim) float32 or float64 array of glm vectors or an array of points."""
+        if hasattr(control_points, "__array__"):
+            # numpy arrays and PointStore
+            control_points = np.asarray(control_points)
+        if isinstance(control_points, np.ndarray):
+            if control_points.dtype == np.float32:
+                return control_points
+            return control_points.astype(np.float64)
+
+        return np.array(
+            [(point.x, point.y) for point in control_points], dtype=np.float32
+        ).reshape(-1, 2)
+
+    @staticmethod
+    def is_binary(filepath: str) -> bool:
+        with open(filepath, "rb") as f:
+            return f.read(len(SplineIO.MAGIC)) == SplineIO.MAGIC
+
     @staticmethod
     def load_spline(
         filepath: str,
     ) -> Tuple[Optional[List[glm.vec2]], Optional[bool], Optional[bool]]:
         """
-        Load spline control points from a configuration file.
+        Load spline control points from a configuration file (either format).
+        """
+        points, is_2d, is_c2 = SplineIO.load_points(filepath)
+        if points is None:
+            return None, None, None
+
+        control_points = [glm.vec2(x, y) for x, y in points[:, :2].tolist()]
+        return control_points, is_2d, is_c2
+
+    @staticmethod
+    def load_points(
+        filepath: str, mmap: bool = True
+    ) -> Tuple[Optional[np.ndarray], Optional[bool], Optional[bool]]:
+        """
+        Load control points as an (n, dim) array. Binary files are memory-mapped
+        (read-only) unless `mmap` is False; text files are parsed in blocks.
         """
         try:
-            control_points = []
+            if SplineIO.is_binary(filepath):
+                return SplineIO._load_binary(filepath, mmap)
 
-            with open(filepath, "r") as f:
-                # Read and parse header
+            with open(filepath, "rb") as f:
                 dim_flag, continuity_flag, num_points = map(
-                    int, f.readline().strip().split()
+                    int, f.readline().split()
                 )
+                points = np.empty((num_points, 2))
 
-                is_2d = dim_flag == 2
-                is_c2 = continuity_flag == 2
-
-                # Read control points
-                for _ in range(num_points):
-                    x, y = map(float, f.readline().strip().split())
-                    control_points.append(glm.vec2(x, y))
+                loaded = 0
+                for block in SplineIO.iter_text_points(f, num_points):
+                    points[loaded : loaded + len(block)] = block
+                    loaded += len(block)
 
-            return control_points, is_2d, is_c2
+            return points, dim_flag == 2, continuity_flag == 2
 
         except Exception as e:
             print(f"Error loading spline: {e}")
             return None, None, None
+
+    @staticmethod
+    def iter_text_points(f, num_points: int) -> Iterator[np.ndarray]:
+        """
+        Parses the "x y" lines that follow the header in the open (binary mode) file `f`.
+        The file is read in blocks of about TEXT_CHUNK lines, each converted in one numpy
+        call, so large files are never held in memory as Python objects.
+        """
+        remaining = num_points
+        carry = b""
+
+        while remaining > 0:
+            block = f.read(SplineIO.TEXT_CHUNK * 32)
+            data = carry + block
+
+            # Only whole lines; the tail waits for the next block (or the end of the file)
+            cut = data.rfind(b"\n") + 1 if block else len(data)
+            data, carry = data[:cut], data[cut:]
+
+            values = np.array(data.split(), dtype=np.float64)
+            if len(values) % 2:
+                raise ValueError("expected two coordinates per line")
+
+            points = values.reshape(-1, 2)[:remaining]
+            remaining -= len(points)
+
+            if len(points):
+                yield points
+            if not block and remaining > 0:
+                raise ValueError(
+                    f"expected {num_points} points, found {num_points - remaining}"
+                )
+
+    @staticmethod
+    def _load_binary(
+        filepath: str, mmap: bool
+    ) -> Tuple[np.ndarray, bool, bool]:
+        with open(filepath, "rb") as f:
+            header = f.read(SplineIO.HEADER.size)
+
+        magic, version, itemsize, dim, continuity, count = SplineIO.HEADER.unpack(
+            header
+        )
+        if version != SplineIO.VERSION:
+            raise ValueError(f"unsupported spline file version {version}")
+        if itemsize not in SplineIO.DTYPES:
+            raise ValueError(f"unsupported coordinate size {itemsize}")
+
+        dtype = SplineIO.DTYPES[itemsize]
+        expected = SplineIO.HEADER.size + count * dim * itemsize
+        if os.path.getsize(filepath) < expected:
+            raise ValueError("spline file is truncated")
+
+        if mmap and count > 0:
+            points = np.memmap(
+                filepath,
+                dtype=dtype,
+                mode="r",
+                offset=SplineIO.HEADER.size,
+                shape=(count, dim),
+            )
+        else:
+            points = np.fromfile(
+                filepath, dtype=dtype, count=count * dim, offset=SplineIO.HEADER.size
+            ).reshape(count, dim)
+
+        return points, dim == 2, continuity == 2
@@ -0,0 +1,196 @@
+from collections import OrderedDict
+from typing import Optional
+import os
+import struct
+
+import numpy as np
+
+from .splineIO import SplineIO
+
+
+class SplineScene:
+    """
+    A file holding many splines, read lazily.
+
+    Layout (little-endian):
+        header (32 bytes): magic "SPSC", version u16, 2 padding bytes,
+                           spline count u64, index offset u64, 8 padding bytes
+        point blocks:      one contiguous (count, dim) float32/float64 array per spline,
+                           each starting at a multiple of 8 bytes
+        index table:       one INDEX_DTYPE record per spline, at the index offset
+
+    Opening a scene reads only the header and the index table. query() finds the splines
+    whose bounding boxes overlap a rectangle with one vectorized test, and points() pages
+    a single spline in from the memory-mapped file, keeping the most recently used ones.
+    append() writes a new spline where the old index was and rewrites the index, so
+    existing point blocks are never touched.
+    """
+
+    MAGIC = b"SPSC"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHxxQQ8x")
+    INDEX_DTYPE = np.dtype(
+        [
+            ("offset", "<u8"),
+            ("count", "<u8"),
+            ("continuity", "u1"),
+            ("itemsize", "u1"),
+            ("dim", "u1"),
+            ("padding", "V5"),
+            ("bbox", "<f8", (4,)),
+        ]
+    )
+
+    def __init__(self, filepath: str, cache_size: int = 256):
+        with open(filepath, "rb") as f:
+            magic, version, count, index_offset = SplineScene.HEADER.unpack(
+                f.read(SplineScene.HEADER.size)
+            )
+
+        if magic != SplineScene.MAGIC:
+            raise ValueError(f"{filepath} is not a spline scene")
+        if version != SplineScene.VERSION:
+            raise ValueError(f"unsupported spline scene version {version}")
+
+        self.filepath = filepath
+        self.index = np.fromfile(
+            filepath, dtype=SplineScene.INDEX_DTYPE, count=count, offset=index_offset
+        )
+        if len(self.index) != count:
+            raise ValueError("spline scene index is truncated")
+
+        self.data = np.memmap(filepath, dtype=np.uint8, mode="r")
+        self.cache: OrderedDict[int, np.ndarray] = OrderedDict()
+        self.cache_size = cache_size
+
+    @staticmethod
+    def open(filepath: str, cache_size: int = 256) -> Optional["SplineScene"]:
+        try:
+            return SplineScene(filepath, cache_size)
+        except Exception as e:
+            print(f"Error loading spline scene: {e}")
+            return None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def is_c2(self, index: int) -> bool:
+        return self.index["continuity"][index] == 2
+
+    def query(self, min_corner, max_corner) -> np.ndarray:
+        """Indices of the splines whose bounding boxes overlap [min_corner, max_corner]."""
+        bbox = self.index["bbox"]
+        overlaps = (
+            (bbox[:, 0] <= max_corner[0])
+            & (bbox[:, 2] >= min_corner[0])
+            & (bbox[:, 1] <= max_corner[1])
+            & (bbox[:, 3] >= min_corner[1])
+        )
+        return np.flatnonzero(overlaps)
+
+    def points(self, index: int) -> np.ndarray:
+        """Control points (count, dim) of one spline, read on first use."""
+        if index in self.cache:
+            self.cache.move_to_end(index)
+            return self.cache[index]
+
+        entry = self.index[index]
+        dtype = SplineIO.DTYPES[int(entry["itemsize"])]
+        size = int(entry["count"]) * int(entry["dim"]) * dtype.itemsize
+        offset = int(entry["offset"])
+
+        points = (
+            self.data[offset : offset + size]
+            .view(dtype)
+            .reshape(int(entry["count"]), int(entry["dim"]))
+            .copy()
+        )
+
+        self.cache[index] = points
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+        return points
+
+    def close(self) -> None:
+        self.cache.clear()
+        self.data = None
+
+    @staticmethod
+    def save(filepath: str, splines: list) -> bool:
+        """Writes `splines`, a list of (control points, is_c2), as a new scene."""
+        try:
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+            with open(filepath, "wb") as f:
+                f.write(bytes(SplineScene.HEADER.size))
+                index = [
+                    SplineScene._write_points(f, points, is_c2)
+                    for points, is_c2 in splines
+                ]
+                SplineScene._write_index(f, np.concatenate(index) if index else [])
+
+            return True
+
+        except Exception as e:
+            print(f"Error saving spline scene: {e}")
+            return False
+
+    @staticmethod
+    def append(filepath: str, control_points, is_c2: bool) -> bool:
+        """Adds one spline to the scene at `filepath`, creating it if needed."""
+        if not os.path.exists(filepath):
+            return SplineScene.save(filepath, [(control_points, is_c2)])
+
+        try:
+            index = SplineScene(filepath).index
+
+            with open(filepath, "r+b") as f:
+                f.seek(SplineScene.HEADER.unpack(f.read(SplineScene.HEADER.size))[3])
+                entry = SplineScene._write_points(f, control_points, is_c2)
+                SplineScene._write_index(f, np.concatenate([index, entry]))
+                f.truncate()
+
+            return True
+
+        except Exception as e:
+            print(f"Error saving spline scene: {e}")
+            return False
+
+    @staticmethod
+    def _write_points(f, control_points, is_c2: bool) -> np.ndarray:
+        points = SplineIO.points_array(control_points)
+        dtype = SplineIO.DTYPES[points.dtype.itemsize]
+
+        # Keep every block aligned for its coordinate type
+        f.write(bytes(-f.tell() % 8))
+
+        entry = np.zeros(1, dtype=SplineScene.INDEX_DTYPE)
+        entry["offset"] = f.tell()
+        entry["count"] = len(points)
+        entry["continuity"] = 2 if is_c2 else 1
+        entry["itemsize"] = dtype.itemsize
+        entry["dim"] = points.shape[1]
+        if len(points):
+            entry["bbox"] = (*points[:, :2].min(axis=0), *points[:, :2].max(axis=0))
+        else:
+            entry["bbox"] = (np.inf, np.inf, -np.inf, -np.inf)
+
+        f.write(np.ascontiguousarray(points, dtype=dtype).tobytes())
+        return entry
+
+    @staticmethod
+    def _write_index(f, index) -> None:
+        index = np.asarray(index, dtype=SplineScene.INDEX_DTYPE)
+
+        f.write(bytes(-f.tell() % 8))
+        index_offset = f.tell()
+        f.write(index.tobytes())
+
+        f.seek(0)
+        f.write(
+            SplineScene.HEADER.pack(
+                SplineScene.MAGIC, SplineScene.VERSION, len(index), index_offset
+            )
+        )
+        f.seek(0, os.SEEK_END)
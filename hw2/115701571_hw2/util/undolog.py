@@ -0,0 +1,201 @@
+from collections import deque
+from contextlib import contextmanager
+
+import glm
+import numpy as np
+
+
+class UndoEntry:
+    """
+    One undoable edit: the point writes it made, in order, as
+        ("move", index, old (x, y), new (x, y))
+        ("insert", index, points (n, 2))
+        ("delete", index, points (n, 2))
+        ("state", restore, old, new)
+
+    A state op is data kept beside the points (e.g. a B-spline's knot vector) that the
+    edit replaced; replaying it calls restore(old) or restore(new). It counts as len(old)
+    points.
+
+    Moves of the same point are folded into one op (first old, last new) as long as no
+    insertion or removal came in between, so dragging a node for a thousand cursor events
+    costs as much as moving it once.
+    """
+
+    def __init__(self, key=None):
+        self.key = key
+        self.ops = []
+        self.size = 0
+
+        # Op position of the last move of each index, while indices are still comparable
+        self.moves: dict[int, int] = {}
+
+    def add(self, op) -> None:
+        if op[0] == "move":
+            index = op[1]
+            if index in self.moves:
+                position = self.moves[index]
+                self.ops[position] = ("move", index, self.ops[position][2], op[3])
+                return
+
+            self.moves[index] = len(self.ops)
+            self.ops.append(op)
+            self.size += 1
+            return
+
+        self.moves.clear()
+        self.ops.append(op)
+        self.size += len(op[2])
+
+
+class UndoLog:
+    """
+    Undo/redo history of a PointStore, kept as deltas rather than snapshots: undoing or
+    redoing an edit replays only the point writes it made, so its cost follows the size
+    of the edit, not the number of points.
+
+    Writes are recorded inside `with log.edit(key):` blocks. An edit with the same key as
+    the one before it (e.g. the next cursor event of a drag) is folded into it, until
+    seal() starts a new entry. Writes made outside any edit (loading, drawing a new curve)
+    cannot be undone and clear the history.
+
+    At most `max_entries` entries and `max_points` recorded points are kept; the oldest
+    entries go first, but the newest one is always kept.
+    """
+
+    def __init__(self, store, max_entries: int = 256, max_points: int = 1 << 16):
+        self.store = store
+        self.max_entries = max_entries
+        self.max_points = max_points
+
+        self.undo_stack: deque[UndoEntry] = deque()
+        self.redo_stack: list[UndoEntry] = []
+        self.size = 0
+
+        self.entry = None
+        self.sealed = True
+        self.replaying = False
+
+        store.log = self
+
+    @contextmanager
+    def edit(self, key=None):
+        if self.entry is not None:
+            # Nested edits belong to the outer one
+            yield
+            return
+
+        self.entry = UndoEntry(key)
+        try:
+            yield
+        finally:
+            entry, self.entry = self.entry, None
+            self._commit(entry)
+
+    def seal(self) -> None:
+        """Makes the next edit a new entry even if its key matches the last one."""
+        self.sealed = True
+
+    def clear(self) -> None:
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.size = 0
+        self.sealed = True
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    def peek(self, redo: bool = False):
+        """Key of the entry the next undo() (or redo()) replays, None if there is none."""
+        stack = self.redo_stack if redo else self.undo_stack
+        return stack[-1].key if stack else None
+
+    def record_move(self, index: int, old, new) -> None:
+        self._record(("move", index, tuple(map(float, old)), tuple(map(float, new))))
+
+    def record_insert(self, index: int, points: np.ndarray) -> None:
+        self._record(("insert", index, points.copy()))
+
+    def record_delete(self, index: int, points: np.ndarray) -> None:
+        self._record(("delete", index, points.copy()))
+
+    def record_state(self, restore, old: np.ndarray, new: np.ndarray) -> None:
+        """Records that the edit replaced `old` by `new`; undo/redo hand them to restore."""
+        self._record(("state", restore, old.copy(), new.copy()))
+
+    def _record(self, op) -> None:
+        if self.replaying:
+            return
+        if self.entry is None:
+            self.clear()
+            return
+
+        self.entry.add(op)
+
+    def _commit(self, entry: UndoEntry) -> None:
+        if not entry.ops:
+            return
+
+        self.redo_stack.clear()
+        top = self.undo_stack[-1] if self.undo_stack else None
+
+        if not self.sealed and top is not None and entry.key == top.key:
+            self.size -= top.size
+            for op in entry.ops:
+                top.add(op)
+            entry = top
+        else:
+            self.undo_stack.append(entry)
+
+        self.size += entry.size
+        self.sealed = entry.key is None
+
+        # The newest entry stays even if it alone is over the budget: an edit that big is
+        # still the one the user expects the next undo to take back
+        while len(self.undo_stack) > 1 and (
+            len(self.undo_stack) > self.max_entries or self.size > self.max_points
+        ):
+            self.size -= self.undo_stack.popleft().size
+
+    def undo(self) -> bool:
+        if not self.undo_stack:
+            return False
+
+        entry = self.undo_stack.pop()
+        self.size -= entry.size
+        self._replay(reversed(entry.ops), undo=True)
+        self.redo_stack.append(entry)
+        self.sealed = True
+        return True
+
+    def redo(self) -> bool:
+        if not self.redo_stack:
+            return False
+
+        entry = self.redo_stack.pop()
+        self._replay(entry.ops, undo=False)
+        self.undo_stack.append(entry)
+        self.size += entry.size
+        self.sealed = True
+        return True
+
+    def _replay(self, ops, undo: bool) -> None:
+        self.replaying = True
+        try:
+            for op in ops:
+                kind, index = op[0], op[1]
+                if kind == "state":
+                    op[1](op[2] if undo else op[3])
+                elif kind == "move":
+                    x, y = op[2] if undo else op[3]
+                    self.store[index] = glm.vec2(x, y)
+                elif (kind == "insert") != undo:
+                    self.store.insert_points(index, op[2])
+                else:
+                    self.store.delete_points(index, index + len(op[2]))
+        finally:
+            self.replaying = False
+
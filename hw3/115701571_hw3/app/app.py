@@ -19,7 +19,14 @@ from shape import (
     Dodecahedron,
     CityScene,
 )
-from util import Camera, Shader
+from util import (
+    Camera,
+    FrameUniforms,
+    GLResourcePool,
+    Shader,
+    ShaderRegistry,
+    ShaderVariants,
+)
 
 
 class DisplayMode(Enum):
@@ -55,28 +62,48 @@ class App(Window):
 
         # Program context.
 
-        # Shaders.
-        self.lineShader: Shader = Shader(
+        # Shaders. All programs are submitted first and collected by registry.finish(),
+        # so the driver compiles them side by side.
+        registry: ShaderRegistry = ShaderRegistry()
+
+        self.lineShader: Shader = registry.add(
+            "line",
             vert="shader/line.vert.glsl",
             tesc=None,
             tese=None,
             frag="shader/line.frag.glsl",
         )
 
-        self.meshShader: Shader = Shader(
+        # Specialized per display mode / shape type at compile time.
+        self.meshShader: ShaderVariants = ShaderVariants(
             vert="shader/mesh.vert.glsl",
             tesc=None,
             tese=None,
             frag="shader/phong.frag.glsl",
+            defines={"DISPLAY_MODE": DisplayMode.FLAT.value},
+            registry=registry,
         )
 
-        self.parametricShader = Shader(
+        self.parametricShader: ShaderVariants = ShaderVariants(
             vert="shader/parametric.vert.glsl",
             tesc="shader/parametric.tesc.glsl",
             tese="shader/parametric.tese.glsl",
             frag="shader/parametric.frag.glsl",
+            defines={"SHAPE_TYPE": 0},
+            registry=registry,
         )
 
+        # Build every variant the app can switch to in the same batch,
+        # rather than stalling on a compile the first time a mode is selected.
+        for mode in DisplayMode:
+            self.meshShader.get(DISPLAY_MODE=mode.value)
+
+        for shapeType in range(4):
+            self.parametricShader.get(SHAPE_TYPE=shapeType)
+
+        registry.finish()
+        shaders = [self.lineShader, self.meshShader, self.parametricShader]
+
         # self.sphereShader: Shader = Shader(
         #     vert="shader/sphere.vert.glsl",
         #     tesc="shader/sphere.tesc.glsl",
@@ -84,8 +111,13 @@ class App(Window):
         #     frag="shader/phong.frag.glsl",
         # )
 
+        # Camera and light data shared by all programs through one uniform buffer.
+        self.frameUniforms: FrameUniforms = FrameUniforms(shaders)
+
         # Objects to render.
-        self.city_scene = CityScene(self.meshShader, self.parametricShader)
+        self.city_scene = CityScene(
+            self.meshShader, self.parametricShader, self.frameUniforms
+        )
         self.shapes: list[Renderable] = []
 
         self.axes = Line(
@@ -374,6 +406,9 @@ class App(Window):
             glfwSwapBuffers(self.window)
             glfwPollEvents()
 
+        # Resource counters at exit, to spot leaks and allocation churn
+        print(GLResourcePool.report())
+
     @staticmethod
     def __cursorPosCallback(window: GLFWwindow, xpos: float, ypos: float) -> None:
         app: App = glfwGetWindowUserPointer(window)
@@ -541,20 +576,18 @@ class App(Window):
             100.0,
         )
 
-        self.lineShader.use()
-        self.lineShader.setMat4("view", self.view)
-        self.lineShader.setMat4("projection", self.projection)
-
-        self.meshShader.use()
-        self.meshShader.setMat4("view", self.view)
-        self.meshShader.setMat4("projection", self.projection)
-        self.meshShader.setVec3("viewPos", self.camera.position)
-        # self.meshShader.setVec3("lightPos", self.camera.position)
-        self.meshShader.setVec3("lightPos", self.lightPos)
-        self.meshShader.setVec3("lightColor", self.lightColor)
-        self.meshShader.setInt(
-            "displayMode", self.displayMode.value
-        )  # Pass display mode to shader
+        # The city scene fills the frame uniforms with its own camera and light.
+        if self.current_mode != 7:
+            self.frameUniforms.update(
+                self.view,
+                self.projection,
+                self.camera.position,
+                self.lightPos,
+                self.lightColor,
+            )
+
+        # Select the mesh program specialized for the display mode
+        self.meshShader.select(DISPLAY_MODE=self.displayMode.value)
 
         if self.showAxes:
             self.axes.render(t)
@@ -584,45 +617,17 @@ class App(Window):
                 self.smooth_ellipsoid.render(t)
 
         elif self.current_mode == 4:
-            self.parametricShader.use()
-            self.parametricShader.setMat4("view", self.view)
-            self.parametricShader.setMat4("projection", self.projection)
-            self.parametricShader.setVec3("viewPos", self.camera.position)
-            self.parametricShader.setVec3("lightPos", self.lightPos)
-            self.parametricShader.setVec3("lightColor", self.lightColor)
-
             for shape in self.parametric_shapes:
                 shape.render(t)
 
         elif self.current_mode == 5:
-            self.meshShader.use()
-            self.meshShader.setMat4("view", self.view)
-            self.meshShader.setMat4("projection", self.projection)
-            self.meshShader.setVec3("viewPos", self.camera.position)
-            self.meshShader.setVec3("lightPos", self.lightPos)
-            self.meshShader.setVec3("lightColor", self.lightColor)
-            self.meshShader.setInt("displayMode", self.displayMode.value)
-
             self.torus.render(t)
 
         elif self.current_mode == 6:
             # Render dodecahedron
-            self.meshShader.use()
-            self.meshShader.setMat4("view", self.view)
-            self.meshShader.setMat4("projection", self.projection)
-            self.meshShader.setVec3("viewPos", self.camera.position)
-            self.meshShader.setVec3("lightPos", self.lightPos)
-            self.meshShader.setVec3("lightColor", self.lightColor)
-            self.meshShader.setInt("displayMode", self.displayMode.value)
             self.dodecahedron.render(t)
 
             # Render superquadric
-            self.parametricShader.use()
-            self.parametricShader.setMat4("view", self.view)
-            self.parametricShader.setMat4("projection", self.projection)
-            self.parametricShader.setVec3("viewPos", self.camera.position)
-            self.parametricShader.setVec3("lightPos", self.lightPos)
-            self.parametricShader.setVec3("lightColor", self.lightColor)
             self.superquadric.render(t)
 
         elif self.current_mode == 7:
@@ -0,0 +1,9 @@
+// Per-frame camera and light data, shared by all programs (see util/frameuniforms.py).
+layout (std140) uniform FrameUniforms
+{
+    mat4 view;
+    mat4 projection;
+    vec3 viewPos;
+    vec3 lightPos;
+    vec3 lightColor;
+};
@@ -0,0 +1,21 @@
+// Blinn-Phong local illumination with the frame light; requires frame.glsl.
+vec3 blinnPhong(vec3 norm, vec3 fragPos, vec3 color)
+{
+    // Ambient
+    float ambientStrength = 0.1;
+    vec3 ambient = ambientStrength * lightColor;
+    
+    // Diffuse
+    vec3 lightDir = normalize(lightPos - fragPos);
+    float diff = max(dot(norm, lightDir), 0.0);
+    vec3 diffuse = diff * lightColor;
+    
+    // Specular
+    float specularStrength = 0.5;
+    vec3 viewDir = normalize(viewPos - fragPos);
+    vec3 halfwayDir = normalize(lightDir + viewDir);
+    float spec = pow(max(dot(norm, halfwayDir), 0.0), 32.0);
+    vec3 specular = specularStrength * spec * lightColor;
+    
+    return (ambient + diffuse + specular) * color;
+}
@@ -10,8 +10,8 @@ layout (location = 1) in vec3 aColor;
 out vec3 ourColor;
 
 uniform mat4 model;
-uniform mat4 view;
-uniform mat4 projection;
+
+#include "frame.glsl"
 
 void main()
 {
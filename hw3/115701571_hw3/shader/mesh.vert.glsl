@@ -10,9 +10,8 @@ out vec3 Color;
 flat out vec3 FlatNormal;
 
 uniform mat4 model;
-uniform mat4 view;
-uniform mat4 projection;
-uniform int displayMode;
+
+#include "frame.glsl"
 
 void main()
 {
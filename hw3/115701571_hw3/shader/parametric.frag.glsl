@@ -5,31 +5,13 @@ in vec3 FragPos;
 
 out vec4 FragColor;
 
-uniform vec3 viewPos;
-uniform vec3 lightPos;
-uniform vec3 lightColor;
 uniform vec3 objectColor;
 
+#include "frame.glsl"
+#include "lighting.glsl"
+
 void main()
 {
     vec3 norm = normalize(Normal);
-    
-    // Ambient
-    float ambientStrength = 0.1;
-    vec3 ambient = ambientStrength * lightColor;
-    
-    // Diffuse
-    vec3 lightDir = normalize(lightPos - FragPos);
-    float diff = max(dot(norm, lightDir), 0.0);
-    vec3 diffuse = diff * lightColor;
-    
-    // Specular
-    float specularStrength = 0.5;
-    vec3 viewDir = normalize(viewPos - FragPos);
-    vec3 halfwayDir = normalize(lightDir + viewDir);
-    float spec = pow(max(dot(norm, halfwayDir), 0.0), 32.0);
-    vec3 specular = specularStrength * spec * lightColor;
-    
-    vec3 result = (ambient + diffuse + specular) * objectColor;
-    FragColor = vec4(result, 1.0);
-}
\ No newline at end of file
+    FragColor = vec4(blinnPhong(norm, FragPos, objectColor), 1.0);
+}
@@ -6,12 +6,17 @@ out vec3 Normal;
 out vec3 FragPos;
 
 uniform mat4 model;
-uniform mat4 view;
-uniform mat4 projection;
-uniform int shapeType;  // 0=sphere, 1=cylinder, 2=cone, 3=superquadric
 uniform float e1;       // North-south exponent for superquadric
 uniform float e2;       // East-west exponent for superquadric
 
+#include "frame.glsl"
+
+// Shape is a compile-time specialization (util/shadervariants.py):
+// 0=sphere, 1=cylinder, 2=cone, 3=superquadric
+#ifndef SHAPE_TYPE
+#define SHAPE_TYPE 0
+#endif
+
 const float PI = 3.14159265359;
 const float TWO_PI = 2.0 * PI;
 
@@ -121,22 +126,19 @@ void main()
     vec4 pos;
     vec3 norm;
 
-    if (shapeType == 0) {
-        pos = getSpherePosition(u, v);
-        norm = getSphereNormal(pos);
-    }
-    else if (shapeType == 1) {
-        pos = getCylinderPosition(u, v);
-        norm = getCylinderNormal(u);
-    }
-    else if (shapeType == 2) {
-        pos = getConePosition(u, v);
-        norm = getConeNormal(u, v);
-    }
-    else {  // superquadric
-        pos = getSuperquadricPosition(u, v);
-        norm = getSuperquadricNormal(u, v);
-    }
+#if SHAPE_TYPE == 0
+    pos = getSpherePosition(u, v);
+    norm = getSphereNormal(pos);
+#elif SHAPE_TYPE == 1
+    pos = getCylinderPosition(u, v);
+    norm = getCylinderNormal(u);
+#elif SHAPE_TYPE == 2
+    pos = getConePosition(u, v);
+    norm = getConeNormal(u, v);
+#else  // superquadric
+    pos = getSuperquadricPosition(u, v);
+    norm = getSuperquadricNormal(u, v);
+#endif
 
     FragPos = vec3(model * pos);
     Normal = mat3(transpose(inverse(model))) * norm;
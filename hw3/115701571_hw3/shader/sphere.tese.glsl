@@ -8,8 +8,8 @@ out vec3 ourFragPos;
 out vec3 ourColor;
 
 uniform mat4 model;
-uniform mat4 view;
-uniform mat4 projection;
+
+#include "frame.glsl"
 
 uniform vec3 center;
 uniform float radius;
@@ -15,15 +15,21 @@ from shape import (
     Superquadric,
     Dodecahedron,
 )
-from util import Shader, Camera
+from util import ShaderVariants, Camera, FrameUniforms
 
 Building = namedtuple("Building", ["model", "shape", "display_mode"])
 
 
 class CityScene:
-    def __init__(self, meshShader: Shader, parametricShader: Shader):
+    def __init__(
+        self,
+        meshShader: ShaderVariants,
+        parametricShader: ShaderVariants,
+        frameUniforms: FrameUniforms,
+    ):
         self.meshShader = meshShader
         self.parametricShader = parametricShader
+        self.frameUniforms = frameUniforms
         self.buildings: List[Building] = []
 
         # Initialize camera with a farther viewing position
@@ -377,33 +383,15 @@ class CityScene:
             1000.0,  # Increased for larger ground plane
         )
 
+        # Camera and light are shared by the mesh and parametric programs
+        self.frameUniforms.update(
+            view, projection, self.camera.position, self.light_pos, self.light_color
+        )
+
         # Render ground first
-        self.meshShader.use()
-        self.meshShader.setMat4("view", view)
-        self.meshShader.setMat4("projection", projection)
-        self.meshShader.setVec3("viewPos", self.camera.position)
-        self.meshShader.setVec3("lightPos", self.light_pos)
-        self.meshShader.setVec3("lightColor", self.light_color)
-        self.meshShader.setInt("displayMode", display_mode)
+        self.meshShader.select(DISPLAY_MODE=display_mode)
         self.ground.render(time_elapsed)
 
-        # Render mesh shader objects
-        self.meshShader.use()
-        self.meshShader.setMat4("view", view)
-        self.meshShader.setMat4("projection", projection)
-        self.meshShader.setVec3("viewPos", self.camera.position)
-        self.meshShader.setVec3("lightPos", self.light_pos)
-        self.meshShader.setVec3("lightColor", self.light_color)
-        self.meshShader.setInt("displayMode", display_mode)
-
-        # Render parametric shader objects
-        self.parametricShader.use()
-        self.parametricShader.setMat4("view", view)
-        self.parametricShader.setMat4("projection", projection)
-        self.parametricShader.setVec3("viewPos", self.camera.position)
-        self.parametricShader.setVec3("lightPos", self.light_pos)
-        self.parametricShader.setVec3("lightColor", self.light_color)
-
         # Render all buildings
         for building in self.buildings:
             if building.display_mode == 1:
@@ -152,5 +152,5 @@ class Dodecahedron(Mesh):
         self.faces = new_faces
         vertices = self.create_mesh()
 
-        # Create new Mesh with updated vertices
-        super().__init__(self.shader, vertices, self.model)
+        # Re-upload into the existing buffer
+        self.updateVertices(vertices)
@@ -58,9 +58,8 @@ class Icosahedron(Mesh):
                     new_floatList.extend([v.x, v.y, v.z])
 
         self.floatList = new_floatList
-        # Create new mesh using parent class
-        self.vertices = self.create_mesh(self.floatList)
-        super().__init__(self.shader, self.vertices, self.model)
+        # Re-upload into the existing buffer
+        self.updateVertices(self.create_mesh(self.floatList))
 
     def create_mesh(self, float_list):
         """Process vertices and return glm.array for mesh creation"""
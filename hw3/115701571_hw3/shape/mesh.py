@@ -6,7 +6,7 @@ import glm
 
 from .glshape import GLShape
 from .renderable import Renderable
-from util import Shader
+from util import GLResourcePool, Shader
 
 
 class Mesh(GLShape, Renderable):
@@ -54,13 +54,29 @@ class Mesh(GLShape, Renderable):
                               9 * glm.sizeof(glm.float32),
                               ctypes.c_void_p(6 * glm.sizeof(glm.float32)))
 
-        glBufferData(GL_ARRAY_BUFFER,
-                     self.vertices.nbytes,
-                     self.vertices.ptr,
-                     GL_STATIC_DRAW)
+        GLResourcePool.bufferData(self.vbo,
+                                  GL_ARRAY_BUFFER,
+                                  self.vertices.nbytes,
+                                  self.vertices.ptr,
+                                  GL_STATIC_DRAW)
 
         glBindBuffer(GL_ARRAY_BUFFER, 0)
         glBindVertexArray(0)
+
+    def updateVertices(self, vertices: glm.array) -> None:
+        """Re-uploads the vertex data into the existing VBO (same layout), e.g. after subdivision."""
+        assert vertices.element_type == glm.float32 and vertices.length % (9 * 3) == 0, \
+               'vertices should be alm.array of dtype glm.float32, nine per vertex, three vertices per facet'
+
+        self.vertices = copy.deepcopy(vertices)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        GLResourcePool.bufferData(self.vbo,
+                                  GL_ARRAY_BUFFER,
+                                  self.vertices.nbytes,
+                                  self.vertices.ptr,
+                                  GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
     
     def render(self, timeElapsedSinceLastFrame: int) -> None:
         self.shader.use()
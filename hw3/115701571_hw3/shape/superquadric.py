@@ -3,13 +3,13 @@ from OpenGL.GL import *
 import glm
 
 from .parametric import Parametric
-from util import Shader
+from util import ShaderVariants
 
 
 class Superquadric(Parametric):
     def __init__(
         self,
-        shader: Shader,
+        shader: ShaderVariants,
         e1: float,  # North-south exponent
         e2: float,  # East-west exponent
         color: glm.vec3,
@@ -76,5 +76,4 @@ class Torus(Mesh):
             self.subdivision_level = 60
 
         # Regenerate mesh with new subdivision level
-        self.vertices = self.create_mesh()
-        super().__init__(self.shader, self.vertices, self.model)
+        self.updateVertices(self.create_mesh())
@@ -1,2 +1,6 @@
 from .camera import Camera
+from .resourcepool import GLResourcePool
 from .shader import Shader
+from .shaderregistry import ShaderRegistry
+from .shadervariants import ShaderVariants
+from .frameuniforms import FrameUniforms
@@ -0,0 +1,65 @@
+from OpenGL.GL import *
+import glm
+
+from .shader import Shader
+
+
+class FrameUniforms:
+    """
+    Per-frame camera and light data shared by all programs through one std140 uniform block.
+    The buffer is bound once to a fixed binding point and refilled with a single
+    glBufferSubData per frame, instead of pushing the same uniforms to every program.
+
+    Matches the block declared in the shaders:
+
+        layout (std140) uniform FrameUniforms
+        {
+            mat4 view;          // offset   0
+            mat4 projection;    // offset  64
+            vec3 viewPos;       // offset 128
+            vec3 lightPos;      // offset 144
+            vec3 lightColor;    // offset 160
+        };
+    """
+
+    kBlockName: str = "FrameUniforms"
+    kBindingPoint: int = 0
+    kSize: int = 176  # std140: each vec3 occupies a 16-byte slot
+
+    def __init__(self, shaders: list[Shader]):
+        self.ubo: int = glGenBuffers(1)
+
+        glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferData(GL_UNIFORM_BUFFER, FrameUniforms.kSize, None, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+
+        glBindBufferBase(GL_UNIFORM_BUFFER, FrameUniforms.kBindingPoint, self.ubo)
+
+        for shader in shaders:
+            shader.bindUniformBlock(FrameUniforms.kBlockName, FrameUniforms.kBindingPoint)
+
+    def __del__(self):
+        glDeleteBuffers(1, (self.ubo,))
+        self.ubo = 0
+
+    def update(
+        self,
+        view: glm.mat4,
+        projection: glm.mat4,
+        viewPos: glm.vec3,
+        lightPos: glm.vec3,
+        lightColor: glm.vec3,
+    ) -> None:
+        data: bytes = b"".join(
+            (
+                view.to_bytes(),
+                projection.to_bytes(),
+                glm.vec4(viewPos, 0.0).to_bytes(),
+                glm.vec4(lightPos, 0.0).to_bytes(),
+                glm.vec4(lightColor, 0.0).to_bytes(),
+            )
+        )
+
+        glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, len(data), data)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
@@ -1,97 +1,241 @@
 """
-STOP. You should not modify this file unless you KNOW what you are doing.
+Shader program wrapper: loads the stages (resolving #include and injecting #defines),
+caches linked program binaries on disk, and can defer compile status checks so several
+programs build at once. hw2's util/shader.py is the same class without
+bindUniformBlock(); keep the two in step when changing either.
 """
 
+import ctypes
+import hashlib
+import os
+import struct
+import time
 from typing import Optional
 
 from OpenGL.GL import *
+from OpenGL.error import GLError
 import glm
 
 
 class Shader:
+    # Linked program binaries are cached here (relative to the working directory),
+    # one file per program, named by a hash of all stage sources and the driver identity.
+    kBinaryCacheDir: str = '.cache/shader'
+
     def __init__(self, 
                  vert: str, 
                  tesc: Optional[str], 
                  tese: Optional[str], 
-                 frag: str):
+                 frag: str,
+                 defines: Optional[dict[str, object]] = None,
+                 deferred: bool = False):
         
         self.program: int = 0
-        
-        # 1. retrieve the vertShader/fragShader source code from filePath
-        
-        with open(vert, 'r') as fin:
-            vertShaderCode: str = fin.read()
-        
-        if tesc is not None:
-            with open(tesc, 'r') as fin:
-                tescShaderCode: str = fin.read()
-        
-        if tese is not None:
-            with open(tese, 'r') as fin:
-                teseShaderCode: str = fin.read()
 
-        with open(frag, 'r') as fin:
-            fragShaderCode: str = fin.read()
+        # Wall time spent building this program, and whether it came from the binary cache.
+        self.buildTime: float = 0.0
+        self.fromCache: bool = False
+
+        # With deferred=True the compile and link are only submitted here; nothing queries
+        # their status until finish(), so the driver can work on several programs at once.
+        self.finished: bool = False
+        self.__start: float = time.perf_counter()
+        self.__pendingShaders: list[tuple[int, str]] = []
+
+        # 1. retrieve the vertShader/fragShader source code from filePath,
+        #    resolving #include directives and injecting the requested #defines
 
-        # 2. compile Shader
+        if defines is None:
+            defines = {}
 
-        # vertex shader
-        vertShader: int = glCreateShader(GL_VERTEX_SHADER)
-        glShaderSource(vertShader, vertShaderCode)
-        glCompileShader(vertShader)
-        self.__checkCompileErrors(vertShader, 'VERTEX')
+        vertShaderCode: str = Shader.__preprocess(vert, defines)
 
-        # tessellation control shader
+        tescShaderCode: Optional[str] = None
         if tesc is not None:
-            tescShader: int = glCreateShader(GL_TESS_CONTROL_SHADER)
-            glShaderSource(tescShader, tescShaderCode)
-            glCompileShader(tescShader)
-            self.__checkCompileErrors(tescShader, 'TESSELLATION CONTROL')
+            tescShaderCode = Shader.__preprocess(tesc, defines)
 
-        # tessellation evaluation shader
+        teseShaderCode: Optional[str] = None
         if tese is not None:
-            teseShader: int = glCreateShader(GL_TESS_EVALUATION_SHADER)
-            glShaderSource(teseShader, teseShaderCode)
-            glCompileShader(teseShader)
-            self.__checkCompileErrors(teseShader, 'TESSELLATION EVALUATION')
+            teseShaderCode = Shader.__preprocess(tese, defines)
 
-        # fragment shader
-        fragShader: int = glCreateShader(GL_FRAGMENT_SHADER)
-        glShaderSource(fragShader, fragShaderCode)
-        glCompileShader(fragShader)
-        self.__checkCompileErrors(fragShader, 'FRAGMENT')
+        fragShaderCode: str = Shader.__preprocess(frag, defines)
+
+        stages: list[tuple[int, str, str]] = [(GL_VERTEX_SHADER, 'VERTEX', vertShaderCode)]
+
+        if tescShaderCode is not None:
+            stages.append((GL_TESS_CONTROL_SHADER, 'TESSELLATION CONTROL', tescShaderCode))
+
+        if teseShaderCode is not None:
+            stages.append((GL_TESS_EVALUATION_SHADER, 'TESSELLATION EVALUATION', teseShaderCode))
+
+        stages.append((GL_FRAGMENT_SHADER, 'FRAGMENT', fragShaderCode))
+
+        # 2. try the program binary cache; on a miss or a rejected binary, compile from source
+
+        self.__cacheFile: str = os.path.join(Shader.kBinaryCacheDir, Shader.__cacheKey(stages) + '.bin')
+
+        self.program = glCreateProgram()
+        self.fromCache = self.__loadBinary(self.__cacheFile)
+
+        if self.fromCache:
+            self.buildTime = time.perf_counter() - self.__start
+        else:
+            self.__submit(stages)
+
+        if not deferred:
+            self.finish()
+
+    def finish(self) -> None:
+        """Waits for the submitted compile and link, reports errors and fills the binary cache."""
+        if self.finished:
+            return
+
+        if not self.fromCache:
+            for shader, typeName in self.__pendingShaders:
+                self.__checkCompileErrors(shader, typeName)
+
+            self.__checkCompileErrors(self.program, 'PROGRAM')
+
+            # delete the Shader as they're linked into our program now and no longer necessary
+            for shader, _ in self.__pendingShaders:
+                glDetachShader(self.program, shader)
+                glDeleteShader(shader)
+
+            self.__pendingShaders.clear()
+            self.__saveBinary(self.__cacheFile)
+            self.buildTime = time.perf_counter() - self.__start
+
+        self.finished = True
+
+    def __submit(self, stages: list[tuple[int, str, str]]) -> None:
+        # No status queries in here: each of them would block until the driver is done.
+        for shaderType, typeName, code in stages:
+            shader: int = glCreateShader(shaderType)
+            glShaderSource(shader, code)
+            glCompileShader(shader)
+            self.__pendingShaders.append((shader, typeName))
 
         # shader program
-        self.program: int = glCreateProgram()
-        glAttachShader(self.program, vertShader)
-        
-        if tesc is not None:
-            glAttachShader(self.program, tescShader)
-        
-        if tese is not None:
-            glAttachShader(self.program, teseShader)
-        
-        glAttachShader(self.program, fragShader)
-        
+        for shader, _ in self.__pendingShaders:
+            glAttachShader(self.program, shader)
+
+        # ask the driver to keep a retrievable binary around for the cache
+        glProgramParameteri(self.program, GL_PROGRAM_BINARY_RETRIEVABLE_HINT, GL_TRUE)
+
         glLinkProgram(self.program)
-        self.__checkCompileErrors(self.program, 'PROGRAM')
 
-        # delete the Shader as they're linked into our program now and no longer necessary
-        glDeleteShader(vertShader)
-        
-        if tesc:
-            glDeleteShader(tescShader)
-        
-        if tese:
-            glDeleteShader(teseShader)
-        
-        glDeleteShader(fragShader)
-        
+    def __loadBinary(self, cacheFile: str) -> bool:
+        if not os.path.isfile(cacheFile):
+            return False
+
+        try:
+            with open(cacheFile, 'rb') as fin:
+                binaryFormat, = struct.unpack('<I', fin.read(4))
+                binary: bytes = fin.read()
+
+            glProgramBinary(self.program, binaryFormat, binary, len(binary))
+
+        except (OSError, struct.error, GLError):
+            return False
+
+        # The driver may reject a binary at any time (e.g. after an update); fall back to source.
+        if not glGetProgramiv(self.program, GL_LINK_STATUS):
+            glDeleteProgram(self.program)
+            self.program = glCreateProgram()
+            return False
+
+        return True
+
+    def __saveBinary(self, cacheFile: str) -> None:
+        if not glGetProgramiv(self.program, GL_LINK_STATUS):
+            return
+
+        length: int = glGetProgramiv(self.program, GL_PROGRAM_BINARY_LENGTH)
+
+        if length <= 0:
+            return
+
+        written = GLsizei(0)
+        binaryFormat = GLenum(0)
+        binary = (ctypes.c_ubyte * length)()
+
+        try:
+            glGetProgramBinary(self.program, length, ctypes.byref(written), ctypes.byref(binaryFormat), binary)
+            os.makedirs(Shader.kBinaryCacheDir, exist_ok=True)
+
+            # write-then-rename so a crash never leaves a truncated binary behind
+            with open(cacheFile + '.tmp', 'wb') as fout:
+                fout.write(struct.pack('<I', binaryFormat.value))
+                fout.write(bytes(binary)[:written.value])
+
+            os.replace(cacheFile + '.tmp', cacheFile)
+
+        except (OSError, GLError) as e:
+            print(f'WARNING::SHADER_BINARY_CACHE: could not write {cacheFile}: {e}')
+
+    @staticmethod
+    def __preprocess(path: str, defines: dict[str, object], included: Optional[set[str]] = None) -> str:
+        """
+        Minimal preprocessor run before the GLSL compiler sees the source:
+        `#include "file"` is replaced by that file (resolved relative to the including file,
+        each file pasted at most once), and every entry of `defines` becomes a
+        `#define NAME VALUE` right after the top-level `#version` line.
+        """
+        isTopLevel: bool = included is None
+
+        if included is None:
+            included = set()
+
+        included.add(os.path.abspath(path))
+        lines: list[str] = []
+
+        with open(path, 'r') as fin:
+            for line in fin:
+                directive: str = line.strip()
+
+                if directive.startswith('#include'):
+                    target: str = os.path.join(os.path.dirname(path), directive[len('#include'):].strip().strip('"'))
+
+                    if os.path.abspath(target) not in included:
+                        lines.append(Shader.__preprocess(target, defines, included))
+
+                    continue
+
+                lines.append(line if line.endswith('\n') else line + '\n')
+
+                if isTopLevel and directive.startswith('#version'):
+                    lines.extend(f'#define {name} {value}\n' for name, value in defines.items())
+
+        return ''.join(lines)
+
+    @staticmethod
+    def __cacheKey(stages: list[tuple[int, str, str]]) -> str:
+        digest = hashlib.sha256()
+
+        # A binary is only valid for the exact driver that produced it.
+        for name in (GL_VENDOR, GL_RENDERER, GL_VERSION):
+            digest.update(glGetString(name) or b'')
+            digest.update(b'\0')
+
+        for shaderType, _, code in stages:
+            digest.update(struct.pack('<I', shaderType))
+            digest.update(code.encode())
+            digest.update(b'\0')
+
+        return digest.hexdigest()
+
     def __del__(self):
         glDeleteProgram(self.program)
         
     def use(self) -> None:
         glUseProgram(self.program)
+
+    def bindUniformBlock(self, name: str, binding: int) -> None:
+        index: int = glGetUniformBlockIndex(self.program, name)
+
+        # Blocks optimized out of (or never declared in) this program are silently skipped.
+        if index != GL_INVALID_INDEX:
+            glUniformBlockBinding(self.program, index, binding)
     
     def setBool(self, name: str, val: bool) -> None:
         glUniform1i(glGetUniformLocation(self.program, name), val)
@@ -0,0 +1,110 @@
+import time
+from typing import Optional
+
+from OpenGL.GL import *
+from OpenGL.GL.KHR.parallel_shader_compile import glMaxShaderCompilerThreadsKHR, GL_COMPLETION_STATUS_KHR
+from OpenGL.GL.ARB.parallel_shader_compile import glMaxShaderCompilerThreadsARB
+
+from .shader import Shader
+
+
+class ShaderRegistry:
+    """
+    Builds the startup programs as one batch.
+    add() only submits the compile and link of a program; finish() then collects all of them,
+    so the driver overlaps the work instead of finishing every program before the next one starts.
+    With GL_KHR_parallel_shader_compile (or the ARB variant) the driver compiles on its own threads
+    and finish() polls GL_COMPLETION_STATUS_KHR, collecting whichever program is ready first.
+
+    Programs added after finish() are built immediately, so late (lazily compiled) programs
+    still show up in the per-program log.
+    """
+
+    # Let the driver pick the number of compiler threads.
+    kDriverThreads: int = 0xFFFFFFFF
+
+    def __init__(self):
+        self.shaders: dict[str, Shader] = {}
+        self.pending: list[tuple[str, Shader]] = []
+        self.finished: bool = False
+        self.start: float = time.perf_counter()
+        self.parallel: bool = ShaderRegistry.__enableParallelCompile()
+
+    def add(self,
+            name: str,
+            vert: str,
+            tesc: Optional[str],
+            tese: Optional[str],
+            frag: str,
+            defines: Optional[dict[str, object]] = None) -> Shader:
+
+        shader: Shader = Shader(vert, tesc, tese, frag, defines, deferred=not self.finished)
+        self.shaders[name] = shader
+
+        if self.finished:
+            ShaderRegistry.__log(name, shader)
+        else:
+            self.pending.append((name, shader))
+
+        return shader
+
+    def finish(self) -> dict[str, Shader]:
+        """Waits for every submitted program and prints its build time; returns all programs by name."""
+        pending: list[tuple[str, Shader]] = self.pending
+
+        while pending:
+            waiting: list[tuple[str, Shader]] = []
+
+            for name, shader in pending:
+                # Without the extension any status query blocks, so just collect in order.
+                if not self.parallel or shader.fromCache or ShaderRegistry.__isComplete(shader):
+                    shader.finish()
+                    ShaderRegistry.__log(name, shader)
+                else:
+                    waiting.append((name, shader))
+
+            if len(waiting) == len(pending):
+                time.sleep(0.0005)
+
+            pending = waiting
+
+        built: list[Shader] = [shader for _, shader in self.pending]
+        print(
+            f'shaders: {len(built)} programs in {(time.perf_counter() - self.start) * 1000.0:.1f} ms wall '
+            f'({sum(shader.fromCache for shader in built)} from binary cache, '
+            f'{"parallel" if self.parallel else "serial"} compile)'
+        )
+
+        self.pending = []
+        self.finished = True
+
+        return self.shaders
+
+    def __getitem__(self, name: str) -> Shader:
+        return self.shaders[name]
+
+    @staticmethod
+    def __log(name: str, shader: Shader) -> None:
+        source: str = 'binary cache' if shader.fromCache else 'compiled'
+        print(f'shader {name}: {shader.buildTime * 1000.0:.1f} ms ({source})')
+
+    @staticmethod
+    def __isComplete(shader: Shader) -> bool:
+        # Non-blocking; PyOpenGL has no output size for this enum, so pass the result explicitly.
+        status = GLint(0)
+        glGetProgramiv(shader.program, GL_COMPLETION_STATUS_KHR, status)
+        return bool(status.value)
+
+    @staticmethod
+    def __enableParallelCompile() -> bool:
+        extensions: set[bytes] = {glGetStringi(GL_EXTENSIONS, i) for i in range(glGetIntegerv(GL_NUM_EXTENSIONS))}
+
+        if b'GL_KHR_parallel_shader_compile' in extensions:
+            glMaxShaderCompilerThreadsKHR(ShaderRegistry.kDriverThreads)
+            return True
+
+        if b'GL_ARB_parallel_shader_compile' in extensions:
+            glMaxShaderCompilerThreadsARB(ShaderRegistry.kDriverThreads)
+            return True
+
+        return False
@@ -0,0 +1,75 @@
+import os
+from typing import Optional
+
+from .shader import Shader
+from .shaderregistry import ShaderRegistry
+
+
+class ShaderVariants:
+    """
+    One set of stage sources specialized at compile time through #define sets.
+    Each distinct define set is compiled on first use into its own Shader and reused afterwards,
+    so per-vertex/per-fragment branches on "uniform mode" ints become branch-free programs.
+
+    Shapes may hold a ShaderVariants wherever they expect a Shader:
+    use() and the set*() helpers act on the currently selected variant.
+
+    With a registry, variants are built through it (and so deferred while its startup batch is open);
+    get() calls made before registry.finish() pre-build variants alongside the other programs.
+    """
+
+    def __init__(self,
+                 vert: str,
+                 tesc: Optional[str],
+                 tese: Optional[str],
+                 frag: str,
+                 defines: Optional[dict[str, object]] = None,
+                 registry: Optional[ShaderRegistry] = None):
+
+        self.name: str = os.path.basename(vert).split('.')[0]
+        self.registry: Optional[ShaderRegistry] = registry
+        self.stages: tuple[str, Optional[str], Optional[str], str] = (vert, tesc, tese, frag)
+        self.defines: dict[str, object] = dict(defines) if defines is not None else {}
+        self.variants: dict[frozenset, Shader] = {}
+        self.blockBindings: dict[str, int] = {}
+        self.current: Shader = self.get()
+
+    def get(self, **defines: object) -> Shader:
+        """Returns the program specialized for these defines (on top of the defaults)."""
+        merged: dict[str, object] = {**self.defines, **defines}
+        key: frozenset = frozenset(merged.items())
+
+        shader: Optional[Shader] = self.variants.get(key)
+
+        if shader is None:
+            if self.registry is not None:
+                label: str = ','.join(f'{name}={value}' for name, value in sorted(merged.items()))
+                shader = self.registry.add(f'{self.name}[{label}]', *self.stages, defines=merged)
+            else:
+                shader = Shader(*self.stages, defines=merged)
+
+            for name, binding in self.blockBindings.items():
+                shader.bindUniformBlock(name, binding)
+
+            self.variants[key] = shader
+
+        return shader
+
+    def select(self, **defines: object) -> Shader:
+        """Makes the variant for these defines the target of use() and set*()."""
+        self.current = self.get(**defines)
+        return self.current
+
+    def bindUniformBlock(self, name: str, binding: int) -> None:
+        # Remembered so that variants compiled later get the same binding.
+        self.blockBindings[name] = binding
+
+        for shader in self.variants.values():
+            shader.bindUniformBlock(name, binding)
+
+    def use(self) -> None:
+        self.current.use()
+
+    def __getattr__(self, name: str):
+        # setInt(), setMat4(), program, ... of the selected variant
+        return getattr(self.current, name)